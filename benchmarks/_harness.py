@@ -0,0 +1,159 @@
+"""Shared helpers to run the integration outside a full Home Assistant setup."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import random
+import tempfile
+
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.nestore.const import (
+    CONF_CONTROL,
+    CONF_FULL_LOGGING,
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_TOKEN,
+    CONF_UPDATE_INTERVAL,
+    CONF_USERNAME,
+    DEFAULT_INTERVAL,
+    DEFAULT_LOC_ACTIVE,
+    DEFAULT_LOC_CONTROLLER,
+    DEFAULT_LOC_DATA,
+    DEFAULT_LOC_FLAG,
+    DEFAULT_LOC_INPUT,
+    DEFAULT_PORT,
+    DOMAIN,
+)
+from custom_components.nestore.coordinator import NestoreCoordinator
+from custom_components.nestore.fleet import NestoreFleet
+from custom_components.nestore.sensor import NestoreSensor, sensor_descriptions
+from custom_components.nestore.snapshot import NestoreControlState, NestoreSnapshot
+
+
+# interval of the ticker that measures event loop lag
+LAG_TICK = 0.01
+
+
+async def async_measure_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late a short sleep wakes up until stop is set."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_TICK)
+        lags.append(loop.time() - start - LAG_TICK)
+
+
+async def async_create_hass() -> HomeAssistant:
+    """Create a bare Home Assistant instance in a temporary config dir."""
+    hass = HomeAssistant(tempfile.mkdtemp(prefix="nestore-bench-"))
+    hass.config.skip_pip = True
+    return hass
+
+
+def create_config_entry(
+    host: str = "127.0.0.1", port: int = DEFAULT_PORT, **options
+) -> ConfigEntry:
+    """Create a config entry with the default options, or the ones given."""
+    return ConfigEntry(
+        data={CONF_TOKEN: "", CONF_CONTROL: False},
+        domain=DOMAIN,
+        minor_version=1,
+        options={
+            CONF_HOST: host,
+            CONF_PORT: port,
+            CONF_UPDATE_INTERVAL: DEFAULT_INTERVAL,
+            CONF_FULL_LOGGING: True,
+            CONF_CONTROL: False,
+            CONF_USERNAME: "",
+            CONF_PASSWORD: "",
+            **options,
+        },
+        source=config_entries.SOURCE_USER,
+        title="Nestore Device",
+        unique_id=None,
+        version=1,
+    )
+
+
+def create_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, fleet: NestoreFleet | None = None
+) -> NestoreCoordinator:
+    """Create a coordinator the same way async_setup_entry does."""
+    api_keys = {
+        "HOST": entry.options[CONF_HOST],
+        "PORT": entry.options[CONF_PORT],
+        "DATA": DEFAULT_LOC_DATA,
+        "CONTROL": DEFAULT_LOC_CONTROLLER,
+        "INPUT": DEFAULT_LOC_INPUT,
+        "FLAGS": DEFAULT_LOC_FLAG,
+        "CONTROLLER": DEFAULT_LOC_CONTROLLER,
+        "ACTIVE": DEFAULT_LOC_ACTIVE,
+    }
+    config_entries.current_entry.set(entry)
+    return NestoreCoordinator(hass, entry, api_keys, fleet=fleet)
+
+
+def sample_engineering_payload(extra_fields: int = 0, seed: int = 0) -> dict:
+    """Build an engineering payload shaped like the one the device returns."""
+    rng = random.Random(seed)
+    base = {
+        "TEMP_HTR_OUT": round(rng.uniform(40, 90), 2),
+        "PRES_SYS": round(rng.uniform(1.5, 3.0), 3),
+    }
+    for zone in range(1, 6):
+        base[f"TEMP_VES_INT_{zone}"] = round(rng.uniform(20, 90), 2)
+    derived = {
+        "SOC_VES": round(rng.uniform(0, 100), 1),
+        "SOC_VES_TOTAL": round(rng.uniform(0, 100), 1),
+        "FLOW_DHW": round(rng.uniform(0, 12), 2),
+        "POWER_HEATER": rng.choice([0, 1000, 2200, 3400]),
+        "TE": round(rng.uniform(0, 12000), 1),
+    }
+    counters = {
+        "ENERGY_DHW_THERMAL_THEORETICAL": round(rng.uniform(0, 1e7), 1),
+        "ENERGY_CRG_ELECTRICAL": round(rng.uniform(0, 1e7), 1),
+        "VOL_DHW_THEORETICAL": round(rng.uniform(0, 1e8), 1),
+    }
+    # unused engineering channels the device reports as well
+    for idx in range(extra_fields):
+        base[f"AUX_{idx:04d}"] = round(rng.uniform(-100, 100), 3)
+    return {
+        "HEADER": {"VERSION": 3, "TYPE": "ENGINEERING"},
+        "PAYLOAD": {"BASE": base, "DERIVED": derived, "COUNTERS": counters},
+    }
+
+
+def sample_control_payload(name: str = "Idle") -> dict:
+    """Build a control_state payload."""
+    return {
+        "HEADER": {"VERSION": 3, "TYPE": "CONTROL_STATE"},
+        "PAYLOAD": {"NAME": name},
+    }
+
+
+def load_payloads(coordinator: NestoreCoordinator, data: dict, control: dict) -> None:
+    """Store payloads in the coordinator as a completed update cycle would."""
+    coordinator.snapshot = NestoreSnapshot.from_payload(data)
+    coordinator.control_state = NestoreControlState.from_payload(control)
+
+
+async def async_add_sensors(
+    hass: HomeAssistant, coordinator: NestoreCoordinator, count: int | None = None
+) -> list[NestoreSensor]:
+    """Add the sensors, repeating the descriptions when more are asked."""
+    descriptions = sensor_descriptions()
+    if count is None:
+        count = len(descriptions)
+    entities = []
+    for index, description in zip(range(count), itertools.cycle(descriptions)):
+        entity = NestoreSensor(coordinator, description)
+        entity.hass = hass
+        entity.entity_id = f"sensor.bench_{index}"
+        await entity.async_added_to_hass()
+        entities.append(entity)
+    return entities
@@ -0,0 +1,109 @@
+"""Event loop load of polling many Nestore devices.
+
+Serves simulated devices from a separate thread, each on its own port,
+and polls them with one coordinator per device, once with every client
+scheduled on its own and once as a fleet with staggered polls and a
+shared connection pool. Reports the event loop lag measured by a ticker
+task, the peak number of requests in flight and the CPU time spent.
+
+    python -m benchmarks.fleet_load [--devices 48] [--interval 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from custom_components.nestore.const import (
+    CONF_HISTORY_STORE,
+    CONF_MIN_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.nestore.fleet import NestoreFleet
+from simulator import Faults, SimulatorThread
+
+from ._harness import (
+    async_create_hass,
+    async_measure_lag,
+    create_config_entry,
+    create_coordinator,
+)
+
+
+async def _async_run(server: SimulatorThread, args, fleet_mode: bool) -> dict:
+    hass = await async_create_hass()
+    fleet = NestoreFleet.async_get(hass) if fleet_mode else None
+    coordinators = []
+    for port in server.ports:
+        entry = create_config_entry(
+            port=port,
+            **{
+                CONF_UPDATE_INTERVAL: args.interval,
+                CONF_MIN_INTERVAL: args.interval,
+                CONF_HISTORY_STORE: False,
+            },
+        )
+        coordinators.append(create_coordinator(hass, entry, fleet))
+
+    stats = server.stats
+    requests = stats.requests
+    stats.reset_peak()
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(async_measure_lag(stop, lags))
+    cpu = time.process_time()
+    # a listener starts the polling schedule like an entity would
+    unsubs = [
+        coordinator.async_add_listener(lambda: None) for coordinator in coordinators
+    ]
+    await asyncio.sleep(args.duration)
+    cpu = time.process_time() - cpu
+    stop.set()
+    await ticker
+
+    for unsub in unsubs:
+        unsub()
+    for coordinator in coordinators:
+        await coordinator.async_release()
+    await hass.async_stop(force=True)
+
+    lags.sort()
+    return {
+        "mode": "fleet" if fleet_mode else "independent",
+        "requests": stats.requests - requests,
+        "peak_in_flight": stats.peak_in_flight,
+        "lag_mean_ms": 1000 * statistics.fmean(lags),
+        "lag_p99_ms": 1000 * lags[int(0.99 * (len(lags) - 1))],
+        "lag_max_ms": 1000 * lags[-1],
+        "cpu_s": cpu,
+    }
+
+
+async def _async_main(args) -> None:
+    faults = Faults(latency=args.latency)
+    with SimulatorThread(args.devices, faults=faults) as server:
+        print(
+            f"{args.devices} devices, {args.interval:g} s interval, "
+            f"{args.duration:g} s run, {1000 * args.latency:g} ms device latency"
+        )
+        for fleet_mode in (False, True):
+            result = await _async_run(server, args, fleet_mode)
+            print(
+                f"  {result['mode']:>11}: {result['requests']} requests, "
+                f"peak {result['peak_in_flight']} in flight, "
+                f"lag mean {result['lag_mean_ms']:.2f} ms "
+                f"p99 {result['lag_p99_ms']:.2f} ms "
+                f"max {result['lag_max_ms']:.2f} ms, "
+                f"cpu {result['cpu_s']:.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=48)
+    parser.add_argument("--interval", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    asyncio.run(_async_main(parser.parse_args()))
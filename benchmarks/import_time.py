@@ -0,0 +1,88 @@
+"""Cold import cost of the integration modules.
+
+Runs ``python -X importtime`` in a fresh interpreter per module, with the
+Home Assistant modules every integration pays for anyway imported first,
+and reports the modules the Nestore module adds on top of that.
+
+    python -m benchmarks.import_time [--max-ms 150]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+
+MODULES = (
+    "custom_components.nestore",
+    "custom_components.nestore.config_flow",
+    "custom_components.nestore.sensor",
+    "custom_components.nestore.number",
+    "custom_components.nestore.switch",
+    "custom_components.nestore.button",
+)
+
+# already loaded by Home Assistant before any custom integration
+BASELINE = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.sensor",
+    "homeassistant.components.number",
+    "homeassistant.components.switch",
+    "homeassistant.components.button",
+)
+
+
+def _run_importtime(code: str) -> dict[str, int]:
+    """Run code with -X importtime and return the self time per module in us."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+
+def _import_time(module: str, baseline: set[str]) -> list[tuple[float, str]]:
+    """Return the self time in ms of every module importing module adds."""
+    times = _run_importtime(f"import {', '.join(BASELINE)}; import {module}")
+    return [
+        (self_us / 1000, name)
+        for name, self_us in times.items()
+        if name not in baseline
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-ms", type=float, help="fail above this import time")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = set(_run_importtime(f"import {', '.join(BASELINE)}"))
+
+    failed = False
+    for module in MODULES:
+        pulled = _import_time(module, baseline)
+        total_ms = sum(self_ms for self_ms, _ in pulled)
+        print(f"{module}: {total_ms:.1f} ms, {len(pulled)} modules")
+        for self_ms, name in sorted(pulled, reverse=True)[: args.top]:
+            print(f"    {self_ms:7.2f} ms  {name}")
+        if args.max_ms is not None and total_ms > args.max_ms:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Parse time and memory of the engineering payload.
+
+Compares decoding the full body with the standard json module, as
+``response.json()`` does, against the selective parse used by the
+coordinator. Recorded payloads can be passed as files, otherwise
+synthetic payloads of increasing size are used.
+
+    python -m benchmarks.parse_payload [recorded.json ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from homeassistant.util.json import json_loads
+
+from custom_components.nestore.const import DEFAULT_LOC_DATA
+from custom_components.nestore.snapshot import (
+    ENDPOINT_FIELDS,
+    NestoreSnapshot,
+    select_fields,
+)
+
+from ._harness import sample_engineering_payload
+
+
+def _parse_full(body: bytes):
+    data = json.loads(body.decode("utf-8"))
+    return data, NestoreSnapshot.from_payload(data)
+
+
+def _parse_selective(body: bytes):
+    data = select_fields(json_loads(body), ENDPOINT_FIELDS[DEFAULT_LOC_DATA])
+    return NestoreSnapshot.from_payload(data)
+
+
+def _measure(parse: Callable[[bytes], object], body: bytes, rounds: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse(body)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = parse(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {
+        "us_per_parse": 1e6 * elapsed / rounds,
+        "peak_kib": peak / 1024,
+        "retained_kib": retained / 1024,
+    }
+
+
+def _payloads(paths: list[str]) -> list[tuple[str, bytes]]:
+    if paths:
+        return [(Path(path).name, Path(path).read_bytes()) for path in paths]
+    return [
+        (
+            f"synthetic +{extra} fields",
+            json.dumps(sample_engineering_payload(extra)).encode(),
+        )
+        for extra in (0, 200, 2000)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payloads", nargs="*", help="recorded engineering payloads")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, body in _payloads(args.payloads):
+        print(f"{name} ({len(body) / 1024:.1f} KiB)")
+        for mode, parse in (("full", _parse_full), ("selective", _parse_selective)):
+            result = _measure(parse, body, args.rounds)
+            print(
+                f"  {mode:>9}: {result['us_per_parse']:8.1f} us/parse, "
+                f"peak {result['peak_kib']:8.1f} KiB, "
+                f"retained {result['retained_kib']:8.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
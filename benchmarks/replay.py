@@ -0,0 +1,185 @@
+"""Replay captured device payloads through the coordinator.
+
+Reads the files written with the "Capture payloads" option, groups the
+bodies into update cycles and feeds them to a coordinator in place of the
+device. Every body goes through the same fingerprint, decode and parse
+path as a live poll, followed by the snapshot processing and the sensor
+fan-out, with the receive times of the capture. Cycles run back to back,
+or at a multiple of the captured pace with --speed.
+
+Reports the cycle latency, the cycles per second and the speed-up over the
+captured time span, and the final energy totals. Replays of the same
+capture give the same totals, so a change in them points at a change in
+behaviour rather than in speed.
+
+    python -m benchmarks.replay config/nestore/<entry_id>/capture
+    python -m benchmarks.replay payloads.2.gz payloads.1.gz --output replay.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from custom_components.nestore.capture import capture_files, read_capture
+from custom_components.nestore.const import (
+    CONF_CAPTURE,
+    CONF_HISTORY_STORE,
+    CONF_MIN_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.nestore.coordinator import NestoreCoordinator
+
+from ._harness import (
+    async_add_sensors,
+    async_create_hass,
+    create_config_entry,
+    create_coordinator,
+)
+
+# polling far apart, so only the replayed cycles run
+IDLE_INTERVAL = 3600
+
+
+def _group_cycles(
+    records: Iterable[tuple[float, str, bytes]],
+) -> Iterator[dict[str, tuple[float, bytes]]]:
+    """Group bodies into cycles, a cycle ends when an endpoint repeats."""
+    cycle: dict[str, tuple[float, bytes]] = {}
+    for received, endpoint, body in records:
+        if endpoint in cycle:
+            yield cycle
+            cycle = {}
+        cycle[endpoint] = (received, body)
+    if cycle:
+        yield cycle
+
+
+class _ReplayDevice:
+    """Answer the requests of a client with the captured bodies."""
+
+    def __init__(self, coordinator: NestoreCoordinator) -> None:
+        self.bodies: dict[str, bytes] = {}
+        self.now = 0.0
+        client = coordinator.client
+        client._async_request = self._async_request
+        client.clock = lambda: self.now
+
+    def load(self, cycle: dict[str, tuple[float, bytes]]) -> None:
+        """Serve the bodies of a cycle, endpoints not in it repeat."""
+        for endpoint, (_, body) in cycle.items():
+            self.bodies[endpoint] = body
+        self.now = min(received for received, _ in cycle.values())
+
+    async def _async_request(self, method: str, url: str, **kwargs) -> bytes:
+        endpoint = urlsplit(url).path.strip("/")
+        if (body := self.bodies.get(endpoint)) is None:
+            raise aiohttp.ClientError(f"{endpoint} not in the capture yet")
+        return body
+
+
+async def _async_replay(args, paths: list[Path]) -> dict:
+    records = sorted(read_capture(paths), key=lambda record: record[0])
+    if not records:
+        raise SystemExit("No captured payloads found")
+    cycles = list(_group_cycles(records))
+
+    hass = await async_create_hass()
+    entry = create_config_entry(
+        **{
+            CONF_UPDATE_INTERVAL: IDLE_INTERVAL,
+            CONF_MIN_INTERVAL: IDLE_INTERVAL,
+            CONF_HISTORY_STORE: False,
+            CONF_CAPTURE: False,
+        }
+    )
+    coordinator = create_coordinator(hass, entry)
+    await coordinator.async_prepare()
+    await async_add_sensors(hass, coordinator, args.entities)
+    device = _ReplayDevice(coordinator)
+
+    durations = []
+    previous = None
+    cpu = time.process_time()
+    start = time.perf_counter()
+    for cycle in cycles:
+        device.load(cycle)
+        if args.speed and previous is not None:
+            await asyncio.sleep((device.now - previous) / args.speed)
+        previous = device.now
+        began = time.perf_counter()
+        await coordinator.async_refresh()
+        durations.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+
+    captured = records[-1][0] - records[0][0]
+    result = {
+        "benchmark": "replay",
+        "files": [str(path) for path in paths],
+        "records": len(records),
+        "cycles": len(cycles),
+        "captured_s": captured,
+        "replay_s": elapsed,
+        "speedup": captured / elapsed if elapsed else None,
+        "cycles_per_s": len(cycles) / elapsed,
+        "cycle_ms_p50": 1000 * statistics.median(durations),
+        "cycle_ms_max": 1000 * max(durations),
+        "cpu_ms_per_cycle": 1000 * cpu / len(cycles),
+        "unchanged_payloads": coordinator.get_unchanged_payloads(),
+        "history_samples": len(coordinator.history),
+        "heater_energy_total": coordinator.energy.heater.total,
+        "dhw_volume_total": coordinator.energy.dhw.total,
+    }
+
+    await coordinator.async_release()
+    await hass.async_stop(force=True)
+    return result
+
+
+async def _async_main(args) -> None:
+    paths = []
+    for path in args.paths:
+        paths.extend(capture_files(path) if path.is_dir() else [path])
+    result = await _async_replay(args, paths)
+    print(
+        f"{result['records']} bodies in {result['cycles']} cycles, "
+        f"{result['captured_s']:.0f} s captured, replayed in "
+        f"{result['replay_s']:.2f} s ({result['speedup']:.0f}x), "
+        f"{result['cycles_per_s']:.0f} cycles/s, "
+        f"cycle p50 {result['cycle_ms_p50']:.2f} ms "
+        f"max {result['cycle_ms_max']:.2f} ms"
+    )
+    print(
+        f"  {result['unchanged_payloads']} unchanged payloads, "
+        f"{result['history_samples']} history samples, "
+        f"heater energy {result['heater_energy_total']:.3f}, "
+        f"hot water volume {result['dhw_volume_total']:.3f}"
+    )
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "paths", type=Path, nargs="+", help="capture files or directories"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="multiple of the captured pace, 0 runs the cycles back to back",
+    )
+    parser.add_argument("--entities", type=int, help="sensors listening")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    asyncio.run(_async_main(parser.parse_args()))
@@ -0,0 +1,92 @@
+"""Count state machine writes per poll for the Nestore sensors.
+
+Compares the old behaviour, where a separate timer called
+``async_update_ha_state`` on every sensor next to the coordinator push,
+with the coordinator-push-only path.
+
+    python -m benchmarks.state_writes --polls 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from custom_components.nestore.sensor import NestoreSensor, sensor_descriptions
+
+from ._harness import (
+    async_create_hass,
+    create_config_entry,
+    create_coordinator,
+    load_payloads,
+    sample_control_payload,
+    sample_engineering_payload,
+)
+
+
+async def _async_run(polls: int, legacy: bool) -> dict:
+    hass = await async_create_hass()
+    coordinator = create_coordinator(hass, create_config_entry())
+
+    writes = 0
+    write_state = NestoreSensor._async_write_ha_state
+
+    def _counting_write(entity: NestoreSensor) -> None:
+        nonlocal writes
+        writes += 1
+        write_state(entity)
+
+    NestoreSensor._async_write_ha_state = _counting_write
+    try:
+        load_payloads(
+            coordinator, sample_engineering_payload(), sample_control_payload()
+        )
+        entities = []
+        for description in sensor_descriptions():
+            entity = NestoreSensor(coordinator, description)
+            entity.hass = hass
+            entity.entity_id = f"sensor.bench_{description.key.replace(' ', '_')}"
+            await entity.async_added_to_hass()
+            entities.append(entity)
+
+        start = time.perf_counter()
+        for poll in range(polls):
+            load_payloads(
+                coordinator,
+                sample_engineering_payload(seed=poll),
+                sample_control_payload(),
+            )
+            coordinator.async_update_listeners()
+            if legacy:
+                # the removed sensor timer wrote every entity a second time
+                for entity in entities:
+                    await entity.async_update_ha_state()
+        elapsed = time.perf_counter() - start
+    finally:
+        NestoreSensor._async_write_ha_state = write_state
+        await hass.async_stop(force=True)
+
+    return {
+        "mode": "timer + push" if legacy else "push only",
+        "entities": len(entities),
+        "writes_per_poll": writes / polls,
+        "ms_per_poll": 1000 * elapsed / polls,
+    }
+
+
+async def _async_main(polls: int) -> None:
+    for legacy in (True, False):
+        result = await _async_run(polls, legacy)
+        print(
+            f"{result['mode']:>13}: {result['entities']} sensors, "
+            f"{result['writes_per_poll']:.1f} writes/poll, "
+            f"{result['ms_per_poll']:.3f} ms/poll"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(_async_main(args.polls))
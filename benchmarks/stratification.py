@@ -0,0 +1,63 @@
+"""Time of the stratification analytics over long histories.
+
+Compares computing the stratification sample by sample, as the coordinator
+does for each new snapshot, against the vectorized pass used by the
+``get_nestore_values`` service.
+
+    python -m benchmarks.stratification [--days 365] [--interval 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from custom_components.nestore.analytics import (
+    stratification,
+    stratification_columns,
+)
+from custom_components.nestore.snapshot import VESSEL_ZONES
+
+
+def _columns(samples: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    top = rng.uniform(45, 75, samples)
+    drop = rng.uniform(0, 40, (VESSEL_ZONES - 1, samples))
+    temps = top - np.vstack([np.zeros(samples), np.cumsum(drop / 4, axis=0)])
+    return {
+        f"temp_vessel_{zone}": temps[zone - 1] for zone in range(1, VESSEL_ZONES + 1)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--interval", type=float, default=30, help="seconds")
+    parser.add_argument("--loop-samples", type=int, default=10_000)
+    args = parser.parse_args()
+
+    samples = int(args.days * 86400 / args.interval)
+    columns = _columns(samples)
+    print(f"{samples} samples ({args.days:g} days at {args.interval:g} s)")
+
+    start = time.perf_counter()
+    stratification_columns(columns, 40, 200)
+    vectorized = time.perf_counter() - start
+    print(f"  vectorized: {vectorized:8.3f} s")
+
+    count = min(args.loop_samples, samples)
+    temps = np.vstack([columns[f"temp_vessel_{z}"] for z in range(1, VESSEL_ZONES + 1)])
+    start = time.perf_counter()
+    for index in range(count):
+        stratification(temps[:, index], 40, 200)
+    per_sample = (time.perf_counter() - start) / count
+    print(
+        f"  per sample: {per_sample * 1e6:8.1f} us, "
+        f"{per_sample * samples:8.3f} s extrapolated"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Cost of a full coordinator update cycle against a simulated device.
+
+Each cycle fetches the engineering and control state payloads from the
+simulator over HTTP, parses them into a snapshot and fans the result out
+to the sensor entities. Every combination of payload size, device latency
+and entity count is run as a separate scenario, and for each the cycle
+latency, requests per second, memory allocated per cycle and the time
+the event loop was blocked are reported.
+
+The results are written as JSON, and a previous result file can be given
+to print the change of every scenario, so a regression between releases
+shows up in one run:
+
+    python -m benchmarks.update_cycle --output update_cycle.json
+    python -m benchmarks.update_cycle --compare update_cycle.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from custom_components.nestore.const import (
+    CONF_HISTORY_STORE,
+    CONF_MIN_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+)
+from simulator import SimulatorProcess
+
+from ._harness import (
+    async_add_sensors,
+    async_create_hass,
+    async_measure_lag,
+    create_config_entry,
+    create_coordinator,
+)
+
+# polling far apart, so only the cycles driven by the benchmark run
+IDLE_INTERVAL = 3600
+MANIFEST = Path(__file__).parent.parent / "custom_components/nestore/manifest.json"
+
+
+def _percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(share * (len(ordered) - 1))]
+
+
+async def _async_run(port: int, entities: int, cycles: int, warmup: int) -> dict:
+    hass = await async_create_hass()
+    entry = create_config_entry(
+        port=port,
+        **{
+            CONF_UPDATE_INTERVAL: IDLE_INTERVAL,
+            CONF_MIN_INTERVAL: IDLE_INTERVAL,
+            CONF_HISTORY_STORE: False,
+        },
+    )
+    coordinator = create_coordinator(hass, entry)
+    await coordinator.async_prepare()
+    await async_add_sensors(hass, coordinator, entities)
+
+    # time the entity fan-out apart from the whole cycle
+    fanout: list[float] = []
+    update_listeners = coordinator.async_update_listeners
+
+    def _timed_update_listeners() -> None:
+        start = time.perf_counter()
+        update_listeners()
+        fanout.append(time.perf_counter() - start)
+
+    coordinator.async_update_listeners = _timed_update_listeners
+
+    for _ in range(warmup):
+        await coordinator.async_refresh()
+    fanout.clear()
+
+    durations = []
+    fetches = []
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(async_measure_lag(stop, lags))
+    cpu = time.process_time()
+    start = time.perf_counter()
+    for _ in range(cycles):
+        cycle = time.perf_counter()
+        await coordinator.async_refresh()
+        durations.append(time.perf_counter() - cycle)
+        fetches.append(max(coordinator.fetch_timings.values()))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    stop.set()
+    await ticker
+
+    # tracing slows everything down, so allocations get their own cycles
+    allocated = []
+    tracemalloc.start()
+    retained = tracemalloc.get_traced_memory()[0]
+    for _ in range(cycles):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await coordinator.async_refresh()
+        allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    retained = tracemalloc.get_traced_memory()[0] - retained
+    tracemalloc.stop()
+
+    success = coordinator.last_update_success
+    await coordinator.async_release()
+    await hass.async_stop(force=True)
+
+    requests = cycles * len(coordinator.cycle_endpoints)
+    return {
+        "success": success,
+        "cycle_ms_p50": 1000 * statistics.median(durations),
+        "cycle_ms_p99": 1000 * _percentile(durations, 0.99),
+        "fetch_ms_p50": 1000 * statistics.median(fetches),
+        "fanout_ms_p50": 1000 * statistics.median(fanout) if fanout else None,
+        "requests_per_s": requests / elapsed,
+        "cpu_ms_per_cycle": 1000 * cpu / cycles,
+        "alloc_kib_per_cycle": statistics.fmean(allocated) / 1024,
+        "retained_kib_per_cycle": retained / cycles / 1024,
+        "loop_blocked_ms_per_cycle": 1000 * sum(lags) / cycles,
+        "loop_lag_ms_max": 1000 * max(lags, default=0.0),
+    }
+
+
+def _scenario_key(scenario: dict) -> str:
+    return (
+        f"fields={scenario['payload_fields']} "
+        f"latency={scenario['latency_ms']:g}ms "
+        f"entities={scenario['entities']}"
+    )
+
+
+def _compare(results: dict, previous: dict) -> None:
+    """Print the change of the cycle latency and allocations per scenario."""
+    before = {_scenario_key(s): s for s in previous["scenarios"]}
+    print(f"Compared with {previous['version']} ({previous['created']}):")
+    for scenario in results["scenarios"]:
+        key = _scenario_key(scenario)
+        if (old := before.get(key)) is None:
+            continue
+        changes = ", ".join(
+            f"{name} {100 * (scenario[name] / old[name] - 1):+.1f}%"
+            for name in ("cycle_ms_p50", "cpu_ms_per_cycle", "alloc_kib_per_cycle")
+            if old[name]
+        )
+        print(f"  {key}: {changes}")
+
+
+async def _async_main(args) -> None:
+    results = {
+        "benchmark": "update_cycle",
+        "version": json.loads(MANIFEST.read_text())["version"],
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cycles": args.cycles,
+        "scenarios": [],
+    }
+    for fields, latency in itertools.product(args.payload_fields, args.latency):
+        with SimulatorProcess(1, extra_fields=fields, latency=latency) as simulator:
+            for entities in args.entities:
+                scenario = {
+                    "payload_fields": fields,
+                    "latency_ms": 1000 * latency,
+                    "entities": entities,
+                }
+                scenario.update(
+                    await _async_run(
+                        simulator.ports[0], entities, args.cycles, args.warmup
+                    )
+                )
+                results["scenarios"].append(scenario)
+                print(
+                    f"{_scenario_key(scenario)}: "
+                    f"cycle p50 {scenario['cycle_ms_p50']:.2f} ms "
+                    f"p99 {scenario['cycle_ms_p99']:.2f} ms, "
+                    f"{scenario['requests_per_s']:.0f} req/s, "
+                    f"cpu {scenario['cpu_ms_per_cycle']:.2f} ms, "
+                    f"{scenario['alloc_kib_per_cycle']:.0f} KiB allocated, "
+                    f"loop blocked {scenario['loop_blocked_ms_per_cycle']:.2f} ms"
+                    "/cycle"
+                )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+    if args.compare:
+        _compare(results, json.loads(args.compare.read_text()))
+
+
+def _numbers(kind):
+    return lambda text: [kind(value) for value in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--payload-fields",
+        type=_numbers(int),
+        default=[0, 500, 5000],
+        help="extra engineering channels per payload, comma separated",
+    )
+    parser.add_argument(
+        "--latency",
+        type=_numbers(float),
+        default=[0.0, 0.02],
+        help="device latency in seconds, comma separated",
+    )
+    parser.add_argument(
+        "--entities",
+        type=_numbers(int),
+        default=[40, 400],
+        help="sensor entities listening, comma separated",
+    )
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="earlier JSON results")
+    asyncio.run(_async_main(parser.parse_args()))
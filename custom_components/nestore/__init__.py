@@ -3,32 +3,32 @@
 from __future__ import annotations
 
 import logging
-import socket
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     DOMAIN,
     CONF_HOST,
-    CONF_API_KEY,
     CONF_PORT,
-    CONF_USERNAME,
-    CONF_PASSWORD,
     CONF_UPDATE_INTERVAL,
-    CONF_FULL_LOGGING,
-    CONF_CONTROL,
+    CONF_MIN_INTERVAL,
     DEFAULT_LOC_ACTIVE,
     DEFAULT_LOC_FLAG,
     DEFAULT_LOC_CONTROLLER,
     DEFAULT_LOC_INPUT,
     DEFAULT_LOC_DATA,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_HOSTNAME,
 )
 
 from .services import async_setup_services
 from .coordinator import NestoreCoordinator
+from .fleet import NestoreFleet
+from .resolver import NestoreResolver
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +39,9 @@ PLATFORMS: list[Platform] = [
     Platform.BUTTON,
 ]
 
+# options applied to the running coordinator, any other change reloads
+LIVE_OPTIONS = (CONF_UPDATE_INTERVAL, CONF_MIN_INTERVAL)
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up services."""
@@ -47,25 +50,49 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     return True
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version > 1:
+        return False
+
+    if entry.minor_version < 2:
+        # unique ids were the same for every device, scope them to the entry
+        prefix = f"{entry.entry_id}_"
+
+        @callback
+        def _scope_unique_id(entity_entry: er.RegistryEntry) -> dict | None:
+            if entity_entry.unique_id.startswith(prefix):
+                return None
+            return {"new_unique_id": f"{prefix}{entity_entry.unique_id}"}
+
+        await er.async_migrate_entries(hass, entry.entry_id, _scope_unique_id)
+        hass.config_entries.async_update_entry(entry, minor_version=2)
+        _LOGGER.debug("Migrated unique ids of %s", entry.entry_id)
+
+    if entry.minor_version < 3:
+        # every entry had the same title, which names its device
+        title = entry.title
+        if title == "Nestore Device":
+            title = f"Nestore {entry.options.get(CONF_HOST) or DEFAULT_HOSTNAME}"
+        hass.config_entries.async_update_entry(entry, title=title, minor_version=3)
+        _LOGGER.debug("Migrated title of %s to %s", entry.entry_id, title)
+
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up nestore from a config entry."""
 
     _LOGGER.debug(f"Setup config data: {entry.data}")
     _LOGGER.debug(f"Setup config options: {entry.options}")
 
-    hostname = entry.options[CONF_HOST]
     port = entry.options[CONF_PORT]
 
-    if len(hostname.split(".")) == 4:
+    # resolve the device name off the event loop, a fixed IP is used as is
+    resolver = NestoreResolver(hass, entry.options[CONF_HOST] or DEFAULT_HOSTNAME)
+    hostname = await resolver.async_resolve()
+    if resolver.is_fixed:
         _LOGGER.info("Using fixed IP address %s at port %s ", hostname, port)
-    else:
-        hostID = "nestore.home"  # Replace with your target hostname TBD
-        try:
-            hostname = socket.gethostbyname(hostID)
-            _LOGGER.info("The IP address of %s is %s", hostID, hostname)
-            # You can now use this IP address for further configuration
-        except socket.gaierror:
-            _LOGGER.error("Unable to resolve hostname: %s", hostID)
 
     # list of api keys and locations
     api_keys = {}
@@ -83,11 +110,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass,
         entry,
         api_keys,
+        resolver,
+        NestoreFleet.async_get(hass),
     )
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = nestore_coordinator
 
-    # fetch initial data
-    await nestore_coordinator.async_config_entry_first_refresh()
+    try:
+        await nestore_coordinator.async_prepare()
+
+        # fetch initial data
+        await nestore_coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # a retried setup creates a new coordinator, let go of this one
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await nestore_coordinator.async_release()
+        raise
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_update_options))
 
@@ -101,13 +138,32 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    hass.data[DOMAIN].pop(entry.entry_id, None)
+    # settle the commands while the switches can still show the outcome
+    if (coordinator := hass.data[DOMAIN].get(entry.entry_id)) is not None:
+        coordinator.setpoints.async_cancel()
+        await coordinator.commands.async_stop()
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+    coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+    if coordinator is not None:
+        await coordinator.async_release()
     return True
 
 
+def _reload_options(options) -> dict:
+    """Get the options only read when the coordinator is created."""
+    return {key: value for key, value in options.items() if key not in LIVE_OPTIONS}
+
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update options."""
-    # await hass.config_entries.async_reload(entry.entry_id)
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    await coordinator.async_update_interval(entry.options[CONF_UPDATE_INTERVAL])
+    if _reload_options(entry.options) != _reload_options(coordinator.options):
+        _LOGGER.debug("Options of %s changed, reloading", entry.title)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    await coordinator.async_update_interval(
+        entry.options[CONF_UPDATE_INTERVAL],
+        entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+    )
     _LOGGER.debug("Updating polling interval")
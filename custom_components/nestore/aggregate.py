@@ -0,0 +1,137 @@
+"""Site totals over all Nestore devices of the fleet."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import CONF_VESSEL_VOLUME, DEFAULT_VESSEL_VOLUME
+
+if TYPE_CHECKING:
+    from .coordinator import NestoreCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# snapshot attributes stacked into the site matrix, one column each
+AGGREGATE_FIELDS = ("energy_stored", "power_heater", "soc", "pressure")
+
+
+def aggregate(rows: list[tuple[float, ...]], capacities: list[float]) -> dict:
+    """Compute the site totals of a device by field matrix in one pass."""
+    import numpy as np
+
+    values = np.asarray(rows, dtype=np.float64)
+    weights = np.asarray(capacities, dtype=np.float64)
+    energy, power, soc, pressure = values.T
+    lowest = int(np.argmin(pressure))
+    return {
+        "energy_stored": float(energy.sum()) / 1000.0,
+        "power_heater": float(power.sum()),
+        "soc": float(np.average(soc, weights=weights)),
+        "pressure_min": float(pressure[lowest]),
+        "pressure_min_device": lowest,
+    }
+
+
+class NestoreAggregateCoordinator(DataUpdateCoordinator):
+    """Recompute the site totals whenever a device has a new snapshot.
+
+    This coordinator does not poll, it listens to the device coordinators
+    of the fleet and only sees their changed snapshots.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init the site coordinator without an update interval."""
+        super().__init__(hass, _LOGGER, name="Nestore site")
+        self.members: dict[NestoreCoordinator, Callable[[], None]] = {}
+        self.owner: str | None = None
+        self._site_adders: dict[str, Callable[[], None]] = {}
+
+    @callback
+    def async_track(self, coordinator: NestoreCoordinator) -> None:
+        """Include a device in the site totals."""
+        self.members[coordinator] = coordinator.async_add_listener(
+            self._async_handle_member_update
+        )
+
+    @callback
+    def async_untrack(self, coordinator: NestoreCoordinator) -> None:
+        """Leave a device out of the site totals."""
+        if (unsub := self.members.pop(coordinator, None)) is not None:
+            unsub()
+        entry_id = coordinator.config_entry.entry_id
+        self._site_adders.pop(entry_id, None)
+        if entry_id == self.owner:
+            # another entry takes over the site entities
+            self.owner = None
+            if self._site_adders:
+                self._async_claim(next(iter(self._site_adders)))
+        self._async_handle_member_update()
+
+    @callback
+    def async_offer(self, entry_id: str, add_site_entities: Callable[[], None]) -> None:
+        """Offer an entry to own the site entities, the first one adds them.
+
+        The offer stands while the device is tracked, so the site entities
+        move to another entry when the owner is unloaded.
+        """
+        self._site_adders[entry_id] = add_site_entities
+        if self.owner is None:
+            self._async_claim(entry_id)
+
+    @callback
+    def _async_claim(self, entry_id: str) -> None:
+        """Make an entry the owner and add the site entities to it."""
+        self.owner = entry_id
+        _LOGGER.debug("Site entities owned by %s", entry_id)
+        self._site_adders[entry_id]()
+
+    @callback
+    def _async_handle_member_update(self) -> None:
+        """Recompute the totals with the latest snapshot of every device."""
+        members = [c for c in self.members if c.snapshot is not None]
+        if not members:
+            # no device to total, the site entities become unavailable
+            if self.data is not None:
+                self.async_set_updated_data(None)
+            return
+        data = aggregate(
+            [
+                tuple(getattr(c.snapshot, name) for name in AGGREGATE_FIELDS)
+                for c in members
+            ],
+            [
+                c.config_entry.options.get(CONF_VESSEL_VOLUME, DEFAULT_VESSEL_VOLUME)
+                for c in members
+            ],
+        )
+        data["pressure_min_device"] = members[data["pressure_min_device"]].host
+        data["devices"] = len(members)
+        self.async_set_updated_data(data)
+
+    def get_site_energy_stored(self) -> float:
+        """Get the energy stored in all devices in kWh."""
+        return self.data["energy_stored"]
+
+    def get_site_power_heater(self) -> float:
+        """Get the combined heater power."""
+        return self.data["power_heater"]
+
+    def get_site_soc(self) -> float:
+        """Get the state of charge weighted by vessel volume."""
+        return self.data["soc"]
+
+    def get_site_pressure_min(self) -> float:
+        """Get the lowest pressure of all devices."""
+        return self.data["pressure_min"]
+
+    def get_site_attributes(self) -> dict[str, Any]:
+        """Get the device count and the device with the lowest pressure."""
+        return {
+            "devices": self.data["devices"],
+            "lowest_pressure_device": self.data["pressure_min_device"],
+        }
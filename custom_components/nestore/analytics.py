@@ -0,0 +1,140 @@
+"""Thermal stratification analytics of the vessel zone temperatures.
+
+numpy is imported when the analytics first run, so it stays out of the
+integration's import time.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from .snapshot import VESSEL_ZONES
+
+if TYPE_CHECKING:
+    import numpy as np
+
+STRATIFICATION_COLUMNS = (
+    "gradient",
+    "thermocline",
+    "mixing_index",
+    "usable_volume",
+)
+
+
+def load() -> None:
+    """Import numpy, run in the executor before the first snapshot."""
+    import numpy  # noqa: F401
+
+
+@cache
+def _zone_heights(zones: int) -> np.ndarray:
+    """Return the zone centres as a fraction of the vessel height.
+
+    Zone 1 is the top of the vessel.
+    """
+    import numpy as np
+
+    return (zones - 0.5 - np.arange(zones)) / zones
+
+
+def stratification(
+    temps: Any, hot_water_temp: float, vessel_volume: float
+) -> dict[str, np.ndarray]:
+    """Compute stratification quantities for samples of zone temperatures.
+
+    temps has one row per zone, top zone first, and one column per sample.
+    Returned per sample:
+    - gradient: top minus bottom zone temperature per vessel height [K]
+    - thermocline: height of the steepest temperature drop [fraction], NaN
+      for a fully mixed vessel without any drop
+    - mixing_index: MIX number from the moment of energy, 0 is perfectly
+      stratified and 1 is fully mixed
+    - usable_volume: volume above hot_water_temp on the linear profile
+    """
+    import numpy as np
+
+    temps = np.asarray(temps, dtype=np.float64)
+    if temps.ndim == 1:
+        temps = temps[:, None]
+    zones = temps.shape[0]
+    heights = _zone_heights(zones)
+
+    gradient = (temps[0] - temps[-1]) / (heights[0] - heights[-1])
+
+    drops = temps[:-1] - temps[1:]
+    steepest = np.argmax(np.abs(drops), axis=0)
+    thermocline = (heights[steepest] + heights[steepest + 1]) / 2
+    thermocline[~drops.any(axis=0)] = np.nan
+
+    # moment of energy of the actual, fully mixed and fully stratified
+    # vessel with the same stored energy
+    coldest = temps.min(axis=0)
+    span = temps.max(axis=0) - coldest
+    excess = temps.mean(axis=0) - coldest
+    actual = (heights @ temps - coldest * heights.sum()) / zones
+    mixed = excess / 2
+    hot_fraction = np.divide(excess, span, out=np.zeros_like(span), where=span > 0)
+    stratified = span * (1 - (1 - hot_fraction) ** 2) / 2
+    spread = stratified - mixed
+    mixing_index = np.clip(
+        np.divide(
+            stratified - actual, spread, out=np.ones_like(spread), where=spread > 1e-9
+        ),
+        0.0,
+        1.0,
+    )
+
+    # the profile is linear between zone centres and flat beyond the outer
+    # ones, add up the height of every piece that is above the set point
+    warmest = np.maximum(temps[:-1], temps[1:])
+    coolest = np.minimum(temps[:-1], temps[1:])
+    sloped = warmest > coolest
+    above = np.where(
+        sloped,
+        np.clip(
+            (warmest - hot_water_temp) / np.where(sloped, warmest - coolest, 1.0),
+            0.0,
+            1.0,
+        ),
+        warmest >= hot_water_temp,
+    )
+    usable_height = (
+        (heights[:-1] - heights[1:]) @ above
+        + (temps[0] >= hot_water_temp) * (1 - heights[0])
+        + (temps[-1] >= hot_water_temp) * heights[-1]
+    )
+
+    return {
+        "gradient": gradient,
+        "thermocline": thermocline,
+        "mixing_index": mixing_index,
+        "usable_volume": usable_height * vessel_volume,
+    }
+
+
+def column_values(column: np.ndarray) -> list[float | None]:
+    """Get a stratification column as a list, None where it is undefined."""
+    import numpy as np
+
+    return np.where(np.isnan(column), None, column).tolist()
+
+
+def stratification_columns(
+    columns: Mapping[str, Sequence[float]],
+    hot_water_temp: float,
+    vessel_volume: float,
+) -> dict[str, np.ndarray]:
+    """Compute stratification for history columns in one vectorized pass."""
+    import numpy as np
+
+    temps = np.vstack(
+        [
+            np.asarray(columns[f"temp_vessel_{zone}"], dtype=np.float64)
+            for zone in range(1, VESSEL_ZONES + 1)
+        ]
+    )
+    if not temps.shape[1]:
+        return {name: np.empty(0) for name in STRATIFICATION_COLUMNS}
+    return stratification(temps, hot_water_temp, vessel_volume)
@@ -2,24 +2,39 @@
 
 from __future__ import annotations
 
-from config.custom_components.entsoe.api_client import URL
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util.json import json_loads
 import aiohttp
 import asyncio
 
+import base64
 import logging
 import hashlib
-
-import requests
+import time
+from collections import Counter
+from typing import Any
+from urllib.parse import urlsplit
 
 from .const import (
     MAX_POWER_LEVEL,
-    MIN_POWER_LEVEL,
     MIN_DURATION,
-    MAX_DURATION,
-    CONF_USERNAME,
-    CONF_PASSWORD,
+    DEFAULT_LOC_DATA,
+    DEFAULT_LOC_CONTROLLER,
+    DEFAULT_LOC_TOKEN,
+    TOKEN_LIFETIME,
+    TOKEN_REFRESH_MARGIN,
+    REQUEST_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BUDGET,
+    TASK_CHARGE_START,
+    TASK_CHARGE_STOP,
 )
+from .capture import NestoreCapture
+from .instrumentation import RequestInstrumentation
+from .resilience import CircuitBreaker, CircuitOpenError, backoff_delay, is_transient
+from .snapshot import NestoreControlState, NestoreSnapshot, select_fields
+from .tracing import CAT_COMMAND, CAT_REQUEST, NestoreTracer
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,14 +42,51 @@ _LOGGER = logging.getLogger(__name__)
 class NestoreClient:
     """Main integration class."""
 
-    def __init__(self, hass, host, port, token: str):
-        """Init function with host address."""
-
-        self._session = async_get_clientsession(hass)
+    def __init__(
+        self,
+        hass,
+        host,
+        port,
+        token: str,
+        store_key: str | None = None,
+        session: aiohttp.ClientSession | None = None,
+        tracer: NestoreTracer | None = None,
+        capture: NestoreCapture | None = None,
+    ):
+        """Init function with host address.
+
+        When store_key is given, refreshed tokens are persisted under that
+        storage key instead of in the config entry. A session shared by
+        several clients can be passed, the default is the one of HA.
+        Polled bodies are handed to capture when it is given.
+        """
+
+        self._session = session or async_get_clientsession(hass)
         self.host = host
         self.port = port
         self.header = {"Content-Type": "application/json"}
-        if token != "":
+        self.token = None
+        self.token_expiry: float | None = None
+        self.username: str | None = None
+        self.password: str | None = None
+        self.token_refreshes = 0
+        self._refresh_task: asyncio.Task | None = None
+        self.breaker = CircuitBreaker()
+        self.retries: Counter[str] = Counter()
+        self.instrumentation = RequestInstrumentation()
+        self.tracer = tracer or NestoreTracer()
+        self.capture = capture
+        # receive time of bodies, a replay substitutes the captured times
+        self.clock = time.time
+        # fingerprint and parse result of the last body per endpoint
+        self._payloads: dict[str, tuple[bytes, Any]] = {}
+        self.last_seen: dict[str, float] = {}
+        self.fingerprint_hits: Counter[str] = Counter()
+        self.fingerprint_misses: Counter[str] = Counter()
+        self._token_store: Store[dict[str, Any]] | None = None
+        if store_key is not None:
+            self._token_store = Store(hass, 1, store_key)
+        if token:
             self.set_token(token)
 
     @property
@@ -45,25 +97,185 @@ class NestoreClient:
         """Set the password for the client."""
         self.password = password
 
-    def set_token(self, token: str):
-        """Set the token for the client."""
+    def set_credentials(self, username: str, password: str):
+        """Set the credentials used to refresh the token."""
+        self.username = username
+        self.password = password
+
+    def set_token(self, token: str, expiry: float | None = None):
+        """Set the token for the client, expiry as a unix timestamp."""
         self.token = token
+        self.token_expiry = expiry if expiry is not None else _token_expiry(token)
         self.header = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.token}",
         }
 
+    @property
+    def can_refresh_token(self) -> bool:
+        """Return whether a token can be requested with stored credentials."""
+        return bool(self.password)
+
+    def token_expires_soon(self) -> bool:
+        """Return whether the token is missing or about to expire."""
+        if self.token is None:
+            return True
+        if self.token_expiry is None:
+            return False
+        return time.time() >= self.token_expiry - TOKEN_REFRESH_MARGIN
+
+    async def async_load_token(self) -> None:
+        """Restore the token persisted by an earlier refresh."""
+        if self._token_store is None:
+            return
+        if (data := await self._token_store.async_load()) is None:
+            return
+        self.set_token(data["token"], data.get("expiry"))
+
+    async def async_ensure_token(self) -> None:
+        """Refresh the token ahead of its expiry."""
+        if self.can_refresh_token and self.token_expires_soon():
+            await self.async_refresh_token()
+
+    async def async_refresh_token(self) -> bool:
+        """Request a new token, callers arriving meanwhile share the request."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._async_refresh_token())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _async_refresh_token(self) -> bool:
+        """Request a new token and persist it."""
+        response = await self.async_get_token(
+            DEFAULT_LOC_TOKEN, self.username, self.password
+        )
+        token, expiry = parse_token(response)
+        if token is None:
+            _LOGGER.warning("Unable to refresh the Nestore token")
+            return False
+
+        self.set_token(token, expiry)
+        self.token_refreshes += 1
+        _LOGGER.debug("Refreshed token, valid until %s", self.token_expiry)
+        if self._token_store is not None:
+            await self._token_store.async_save(
+                {"token": self.token, "expiry": self.token_expiry}
+            )
+        return True
+
+    async def _async_request(self, method: str, url: str, **kwargs) -> bytes:
+        """Send an authorized request and return the body.
+
+        A request that is rejected with 401 is sent once more after the
+        token has been refreshed.
+        """
+        await self.async_ensure_token()
+        try:
+            return await self._async_call(method, url, **kwargs)
+        except aiohttp.ClientResponseError as err:
+            if err.status != 401 or not self.can_refresh_token:
+                raise
+            _LOGGER.debug("Token rejected by %s, refreshing", url)
+            if not await self.async_refresh_token():
+                raise
+        return await self._async_call(method, url, **kwargs)
+
+    async def _async_call(self, method: str, url: str, **kwargs) -> bytes:
+        """Send a request through the circuit breaker, retrying transient errors.
+
+        Retries back off exponentially with jitter and stop once another
+        attempt would not fit in the retry budget, so a cycle is not
+        cancelled halfway. The recovery probe of the breaker is not retried.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open, not sending {method} {url}")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + RETRY_BUDGET
+        attempt = 0
+        answered = False
+        try:
+            while True:
+                try:
+                    body = await self._async_send(method, url, **kwargs)
+                except aiohttp.ClientResponseError as err:
+                    if not is_transient(err):
+                        # the device answered, it is up
+                        answered = True
+                        self.breaker.record_success()
+                        raise
+                    delay = self._retry_delay(attempt, deadline, loop)
+                    if delay is None:
+                        raise
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    delay = self._retry_delay(attempt, deadline, loop)
+                    if delay is None:
+                        raise
+                else:
+                    self.breaker.record_success()
+                    return body
+
+                attempt += 1
+                self.retries[_endpoint(url)] += 1
+                _LOGGER.debug(
+                    "Retrying %s %s in %.2f seconds (attempt %s)",
+                    method,
+                    url,
+                    delay,
+                    attempt + 1,
+                )
+                await asyncio.sleep(delay)
+        except BaseException:
+            # also when the cycle cancels the request
+            if not answered:
+                self.breaker.record_failure()
+            raise
+
+    def _retry_delay(
+        self, attempt: int, deadline: float, loop: asyncio.AbstractEventLoop
+    ) -> float | None:
+        """Get the delay before the next attempt, None when giving up."""
+        if attempt >= RETRY_ATTEMPTS or self.breaker.is_probing:
+            return None
+        delay = backoff_delay(attempt)
+        if loop.time() + delay + REQUEST_TIMEOUT > deadline:
+            return None
+        return delay
+
+    async def _async_send(self, method: str, url: str, headers=None, **kwargs) -> bytes:
+        """Send a request with the current headers and return the body."""
+        path = _endpoint(url)
+        start = time.monotonic()
+        try:
+            async with self._session.request(
+                method,
+                url,
+                timeout=REQUEST_TIMEOUT,
+                headers=self.header if headers is None else headers,
+                **kwargs,
+            ) as response:
+                response.raise_for_status()  # Raise an exception for HTTP errors
+                body = await response.read()
+        except BaseException as err:
+            self.instrumentation.record_error(path, err)
+            raise
+        self.instrumentation.record(path, time.monotonic() - start)
+        return body
+
+    def get_resilience_diagnostics(self) -> dict[str, Any]:
+        """Get the circuit breaker state and retries per endpoint."""
+        return {
+            "circuit": self.breaker.get_diagnostics(),
+            "retries": dict(self.retries),
+        }
+
     async def async_query_host(self, api_key) -> str:
         """Query the host to see if response is OK"""
         URL = f"{self.base_url}/{api_key}/"
 
         try:
-            async with self._session.get(
-                URL, timeout=10
-            ) as response:  # Timeout set to 10 seconds
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                _LOGGER.debug(f"Successfully connected to {URL}")
-                return True
+            await self._async_call("GET", URL, headers={})
+            _LOGGER.debug(f"Successfully connected to {URL}")
+            return True
         except aiohttp.ClientResponseError as err:
             _LOGGER.debug(f"HTTP error from {URL}: {err.status}")
             return False
@@ -87,12 +299,9 @@ class NestoreClient:
         payload = {"password": my_pass}
 
         try:
-            async with self._session.post(
-                URL, timeout=10, headers=self.header, json=payload
-            ) as response:  # noqa: PLE1142
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                _LOGGER.debug(f"Successfully retrieved token from {URL}")
-                return await response.json()
+            body = await self._async_call("POST", URL, json=payload)
+            _LOGGER.debug(f"Successfully retrieved token from {URL}")
+            return json_loads(body)
         except aiohttp.ClientResponseError as err:
             _LOGGER.debug(f"HTTP error from {URL}: {err.status}")
             return None
@@ -105,35 +314,53 @@ class NestoreClient:
             _LOGGER.debug(f"Connection error to {URL}: {err}")
             return None
 
-    async def async_query_data(self, api_key) -> str:
-        """Query data using the api key."""
+    async def async_query_data(self, api_key, fields=None) -> str:
+        """Query data using the api key.
+
+        When fields is given, only those payload paths are kept from the
+        response and the rest of the decoded body is dropped right away.
+        A body identical to the previous one of the endpoint is not parsed
+        again, the previous result is returned and only last_seen moves.
+        """
 
         # get URL
         URL = f"{self.base_url}/{api_key}"
 
         try:
-            async with self._session.get(
-                URL, timeout=10, headers=self.header
-            ) as response:
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                _LOGGER.debug(f"Successfully retrieved data from {URL}")
-                try:
-                    data = await response.json()
-                    series = self.parse_data(data)
-                    return series
-                except Exception as exc:
-                    _LOGGER.debug(f"Failed to retrieve data: {response.status}")
-                    return None
+            with self.tracer.span("request", CAT_REQUEST, endpoint=api_key):
+                body = await self._async_request("GET", URL)
+            _LOGGER.debug("Successfully retrieved data from %s", URL)
+            received = self.last_seen[api_key] = self.clock()
+            if self.capture is not None:
+                self.capture.add(received, api_key, body)
+            fingerprint = hashlib.blake2b(body, digest_size=16).digest()
+            cached = self._payloads.get(api_key)
+            if cached is not None and cached[0] == fingerprint:
+                self.fingerprint_hits[api_key] += 1
+                return cached[1]
+            self.fingerprint_misses[api_key] += 1
+            try:
+                with self.tracer.span("decode", CAT_REQUEST, bytes=len(body)):
+                    data = json_loads(body)
+                    if fields is not None:
+                        data = select_fields(data, fields)
+                with self.tracer.span("parse", CAT_REQUEST, endpoint=api_key):
+                    series = self.parse_data(data, api_key, received)
+                self._payloads[api_key] = (fingerprint, series)
+                return series
+            except Exception as exc:
+                _LOGGER.debug("Failed to parse data from %s: %s", URL, exc)
+                return None
         except aiohttp.ClientResponseError as err:
-            _LOGGER.debug(f"HTTP error from {URL}: {err.status}")
+            _LOGGER.debug("HTTP error from %s: %s", URL, err.status)
             return None
 
         except asyncio.TimeoutError:
-            _LOGGER.debug(f"Timeout connecting to {URL}")
+            _LOGGER.debug("Timeout connecting to %s", URL)
             return None
 
         except aiohttp.ClientError as err:
-            _LOGGER.debug(f"Connection error to {URL}: {err}")
+            _LOGGER.debug("Connection error to %s: %s", URL, err)
             return None
 
     async def async_post_request(self, api_key, settings) -> str:
@@ -142,7 +369,7 @@ class NestoreClient:
         # get URL
         URL = f"{self.base_url}/{api_key}"
 
-        if settings["task"] == "ControlTask_ChargingElectrical_Start":
+        if settings["task"] == TASK_CHARGE_START:
             if (
                 settings["power_level"] <= MAX_POWER_LEVEL
                 and settings["duration"] >= MIN_DURATION
@@ -155,7 +382,7 @@ class NestoreClient:
                     "persistent": True,
                     "lifetime": settings["duration"],
                 }
-        elif settings["task"] == "ControlTask_ChargingElectrical_Stop":
+        elif settings["task"] == TASK_CHARGE_STOP:
             data_json = {
                 "TASK": settings["task"],
                 "spin": settings["spin"],
@@ -167,24 +394,66 @@ class NestoreClient:
             return None
 
         try:
-            async with self._session.post(
-                URL, timeout=10, headers=self.header, json=data_json
-            ) as response:
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                _LOGGER.debug("Successfully posted data to %s", URL)
+            with self.tracer.span("post", CAT_COMMAND, task=settings["task"]):
+                await self._async_request("POST", URL, json=data_json)
+            _LOGGER.debug("Successfully posted data to %s", URL)
+            return True
 
         except aiohttp.ClientResponseError as err:
-            _LOGGER.debug(f"HTTP error from {URL}: {err.status}")
+            _LOGGER.warning(
+                "Command %s rejected by %s: %s", settings["task"], URL, err.status
+            )
 
         except asyncio.TimeoutError:
-            _LOGGER.debug(f"Timeout connecting to {URL}")
+            _LOGGER.warning("Timeout posting %s to %s", settings["task"], URL)
 
         except aiohttp.ClientError as err:
-            _LOGGER.debug(f"Connection error to {URL}: {err}")
+            _LOGGER.warning("Unable to post %s to %s: %s", settings["task"], URL, err)
+
+        return False
+
+    def parse_data(self, data: dict, api_key=None, received: float | None = None):
+        """Convert a decoded payload into a snapshot for known endpoints."""
+        # formatted by the logger only when debug logging is on
+        _LOGGER.debug("JSON PAYLOAD BASE: %s", data)
+        if api_key == DEFAULT_LOC_DATA:
+            return NestoreSnapshot.from_payload(data, received)
+        if api_key == DEFAULT_LOC_CONTROLLER:
+            return NestoreControlState.from_payload(data, received)
+        return data
 
-        return None
 
-    def parse_data(self, data: dict) -> str:
-        """Function to perform some data parsing in the future."""
-        _LOGGER.debug(f"JSON PAYLOAD BASE: {data}")
-        return data
+def _endpoint(url: str) -> str:
+    """Get the endpoint of a url, the key of the request statistics."""
+    return urlsplit(url).path.strip("/")
+
+
+def parse_token(response: Any) -> tuple[str | None, float | None]:
+    """Get the token and its expiry from a token response."""
+    if isinstance(response, str):
+        return response or None, None
+    if not isinstance(response, dict):
+        return None, None
+
+    token = response.get("token") or response.get("access_token")
+    if "expires_in" in response:
+        return token, time.time() + float(response["expires_in"])
+    if "exp" in response:
+        return token, float(response["exp"])
+    return token, None
+
+
+def _token_expiry(token: Any) -> float:
+    """Get the expiry of a token, from its exp claim when it is a JWT."""
+    if not isinstance(token, str):
+        # not a usable token, have it refreshed before the first request
+        return 0.0
+    try:
+        payload = token.split(".")[1]
+        claims = json_loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        # opaque token, assume the usual lifetime from now
+        return time.time() + TOKEN_LIFETIME
@@ -1,8 +1,7 @@
 # custom_components/my_custom_integration/button.py
 import logging
-import asyncio
 from homeassistant.components.button import ButtonEntity
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
@@ -11,13 +10,9 @@ from homeassistant.helpers.device_registry import DeviceEntryType
 
 
 from .coordinator import NestoreCoordinator
-from .api_client import NestoreClient
 
 from .const import (
     DOMAIN,
-    MIN_POWER_LEVEL,
-    MIN_DURATION,
-    UPDATE_DELAY,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -36,6 +31,8 @@ async def async_setup_entry(
 class NestoreRefreshTokenButton(ButtonEntity):
     """Button to manually refresh the Nestore token."""
 
+    _attr_has_entity_name = True
+
     def __init__(
         self,
         coordinator: NestoreCoordinator,
@@ -54,7 +51,7 @@ class NestoreRefreshTokenButton(ButtonEntity):
 
     @property
     def unique_id(self):
-        return f"nestore_button_{self._attr_name}"
+        return f"{self._coordinator.config_entry.entry_id}_nestore_button_{self._attr_name}"
 
     async def async_press(self) -> None:
         """Handle button press."""
@@ -80,5 +77,5 @@ class NestoreRefreshTokenButton(ButtonEntity):
             },
             manufacturer="Nestore",
             model="",
-            name="Nestore",
+            name=self._coordinator.config_entry.title,
         )
@@ -0,0 +1,152 @@
+"""Capture of raw response bodies, for offline analysis and replay."""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from homeassistant.core import HomeAssistant
+
+from .const import CAPTURE_BACKUPS, CAPTURE_MAX_BYTES
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_NAME = "payloads"
+CAPTURE_SUFFIX = ".gz"
+
+
+def capture_files(directory: Path) -> list[Path]:
+    """Get the capture files in a directory, the oldest first."""
+    files = sorted(
+        directory.glob(f"{CAPTURE_NAME}.*{CAPTURE_SUFFIX}"),
+        key=lambda path: int(path.name.split(".")[1]),
+        reverse=True,
+    )
+    current = directory / f"{CAPTURE_NAME}{CAPTURE_SUFFIX}"
+    if current.exists():
+        files.append(current)
+    return files
+
+
+def read_capture(paths: Iterable[Path]) -> Iterator[tuple[float, str, bytes]]:
+    """Read the receive time, endpoint and body of every captured response.
+
+    A file that ends in a partly written record, e.g. after a crash, is
+    read up to the last complete one.
+    """
+    for path in paths:
+        with gzip.open(path, "rb") as file:
+            try:
+                while header := file.readline():
+                    received, endpoint, size = header.split()
+                    body = file.read(int(size))
+                    if len(body) < int(size) or file.read(1) != b"\n":
+                        break
+                    yield float(received), endpoint.decode(), body
+            except (EOFError, ValueError):
+                _LOGGER.debug("Capture %s ends in a partial record", path)
+
+
+class NestoreCapture:
+    """Write raw response bodies with their receive time to gzip files.
+
+    Every record is a text header with the receive time, endpoint and
+    body size, followed by the body exactly as received, so a replay sees
+    the same bytes as the client did. Bodies are collected in the event
+    loop and written in the executor once per update cycle. When the
+    current file holds max_bytes of compressed data it is rotated, the
+    oldest of the backups is removed.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        """Init a capture writing into directory."""
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.records = 0
+        self.rotations = 0
+        self._pending: list[tuple[float, str, bytes]] = []
+        self._raw: BinaryIO | None = None
+        self._file: gzip.GzipFile | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        """Get the file written to."""
+        return self.directory / f"{CAPTURE_NAME}{CAPTURE_SUFFIX}"
+
+    def add(self, received: float, endpoint: str, body: bytes) -> None:
+        """Queue a body for the next write."""
+        self._pending.append((received, endpoint, body))
+
+    async def async_flush(self, hass: HomeAssistant) -> None:
+        """Write the queued bodies."""
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        await hass.async_add_executor_job(self._write, records)
+
+    def _write(self, records: list[tuple[float, str, bytes]]) -> None:
+        """Append records to the current file, rotating it when full."""
+        with self._lock:
+            if self._file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._raw = self.path.open("ab")
+                self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+            for received, endpoint, body in records:
+                self._file.write(f"{received:.3f} {endpoint} {len(body)}\n".encode())
+                self._file.write(body)
+                self._file.write(b"\n")
+            # readable up to here should Home Assistant stop unexpectedly
+            self._file.flush()
+            self.records += len(records)
+            if self._raw.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        """Move the current file to the first backup."""
+        self._close_file()
+        for index in range(self.backups, 0, -1):
+            older = self.directory / f"{CAPTURE_NAME}.{index}{CAPTURE_SUFFIX}"
+            if index == self.backups:
+                older.unlink(missing_ok=True)
+            else:
+                newer = self.directory / f"{CAPTURE_NAME}.{index + 1}{CAPTURE_SUFFIX}"
+                if older.exists():
+                    older.rename(newer)
+        if self.backups:
+            self.path.rename(self.directory / f"{CAPTURE_NAME}.1{CAPTURE_SUFFIX}")
+        else:
+            self.path.unlink()
+        self.rotations += 1
+        _LOGGER.debug("Rotated payload capture in %s", self.directory)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+        self._file = None
+        self._raw = None
+
+    def close(self) -> None:
+        """Close the current file."""
+        with self._lock:
+            self._close_file()
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the records written and the files kept."""
+        return {
+            "directory": str(self.directory),
+            "records": self.records,
+            "pending": len(self._pending),
+            "rotations": self.rotations,
+        }
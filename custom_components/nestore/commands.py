@@ -0,0 +1,264 @@
+"""Control commands sent in the background and confirmed by polling."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CONFIRM_POLL_INTERVAL,
+    CONFIRM_TIMEOUT,
+    SETPOINT_DEBOUNCE,
+    STATE_CHARGING,
+    TASK_CHARGE_START,
+)
+
+from .tracing import CAT_COMMAND
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from .coordinator import NestoreCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+OUTCOME_CONFIRMED = "confirmed"
+OUTCOME_POSTED = "posted"
+OUTCOME_FAILED = "failed"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_SUPERSEDED = "superseded"
+
+
+class NestoreCommand:
+    """A control task and the device state that confirms it."""
+
+    __slots__ = ("settings", "expect", "on_done", "submitted", "outcome", "latency")
+
+    def __init__(
+        self,
+        settings: dict[str, Any],
+        expect: Callable[[str | None], bool] | None = None,
+        on_done: Callable[[NestoreCommand], Awaitable[None]] | None = None,
+    ) -> None:
+        """Init the command, expect tells whether a device state confirms it."""
+        self.settings = settings
+        self.expect = expect
+        self.on_done = on_done
+        self.submitted = time.monotonic()
+        self.outcome: str | None = None
+        self.latency: float | None = None
+
+
+class NestoreCommandPipeline:
+    """Send control commands in order without holding up the caller.
+
+    Each command is posted, then control_state is polled every
+    CONFIRM_POLL_INTERVAL seconds until the expected state shows up or
+    CONFIRM_TIMEOUT passes. A newer command waiting in the queue ends the
+    confirmation of the current one.
+    """
+
+    def __init__(self, coordinator: NestoreCoordinator) -> None:
+        """Init the pipeline for a coordinator."""
+        self.coordinator = coordinator
+        self.outcomes: Counter[str] = Counter()
+        self.last: NestoreCommand | None = None
+        self.last_latency: float | None = None
+        self._queue: asyncio.Queue[NestoreCommand] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self._current: NestoreCommand | None = None
+
+    @callback
+    def submit(self, command: NestoreCommand) -> None:
+        """Queue a command and return at once."""
+        self._queue.put_nowait(command)
+        if self._worker is None or self._worker.done():
+            entry = self.coordinator.config_entry
+            self._worker = entry.async_create_background_task(
+                self.coordinator.hass,
+                self._async_run(),
+                f"{entry.title} control commands",
+            )
+
+    async def async_stop(self) -> None:
+        """Cancel the worker and fail the current and the queued commands."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        pending = []
+        if (command := self._current) is not None:
+            self._current = None
+            if command.outcome is None:
+                _LOGGER.debug("Cancelling %s", command.settings["task"])
+                command.outcome = OUTCOME_FAILED
+                self.outcomes[command.outcome] += 1
+            pending.append(command)
+        while not self._queue.empty():
+            command = self._queue.get_nowait()
+            _LOGGER.debug("Dropping queued %s", command.settings["task"])
+            command.outcome = OUTCOME_FAILED
+            self.outcomes[command.outcome] += 1
+            pending.append(command)
+        for command in pending:
+            if command.on_done is not None:
+                await command.on_done(command)
+
+    async def _async_run(self) -> None:
+        """Work through the queued commands."""
+        while not self._queue.empty():
+            command = self._current = self._queue.get_nowait()
+            try:
+                with self.coordinator.tracer.span(
+                    "command", CAT_COMMAND, task=command.settings["task"]
+                ) as span:
+                    await self._async_execute(command)
+                    span.set(outcome=command.outcome)
+            except Exception:
+                _LOGGER.exception("Error executing %s", command.settings["task"])
+                command.outcome = OUTCOME_FAILED
+
+            self.outcomes[command.outcome] += 1
+            self.last = command
+            if command.latency is not None:
+                self.last_latency = command.latency
+            await self.coordinator.async_request_refresh()
+            self._current = None
+            if command.on_done is not None:
+                await command.on_done(command)
+
+    async def _async_execute(self, command: NestoreCommand) -> None:
+        """Post a command and poll until the device confirms it."""
+        task = command.settings["task"]
+        if not await self.coordinator.async_post_state(command.settings):
+            command.outcome = OUTCOME_FAILED
+            return
+        if command.expect is None:
+            command.outcome = OUTCOME_POSTED
+            return
+
+        # the device gets the full timeout however long the post took
+        deadline = time.monotonic() + CONFIRM_TIMEOUT
+        while time.monotonic() < deadline:
+            if not self._queue.empty():
+                _LOGGER.debug("Confirmation of %s superseded", task)
+                command.outcome = OUTCOME_SUPERSEDED
+                return
+            await asyncio.sleep(CONFIRM_POLL_INTERVAL)
+            state = await self.coordinator.async_poll_control_state()
+            if command.expect(state):
+                command.outcome = OUTCOME_CONFIRMED
+                command.latency = time.monotonic() - command.submitted
+                _LOGGER.debug("%s confirmed after %.1f s", task, command.latency)
+                return
+
+        _LOGGER.warning(
+            "Nestore did not confirm %s within %s seconds", task, CONFIRM_TIMEOUT
+        )
+        command.outcome = OUTCOME_TIMEOUT
+
+    def get_last_latency(self) -> float | None:
+        """Get how long the device took to confirm the last confirmed command."""
+        return self.last_latency
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the last command and the outcomes so far."""
+        last = self.last
+        return {
+            "last_task": None if last is None else last.settings["task"],
+            "last_outcome": None if last is None else last.outcome,
+            "pending": self._queue.qsize(),
+            **{f"{outcome}_total": count for outcome, count in self.outcomes.items()},
+        }
+
+
+def expect_state(name: str, present: bool = True) -> Callable[[str | None], bool]:
+    """Return a check for the device entering, or leaving, a state."""
+    if present:
+        return lambda state: state == name
+    return lambda state: state is not None and state != name
+
+
+def charge_task_key(settings: dict[str, Any]) -> tuple | None:
+    """Return what identifies a running charge task, None for other tasks."""
+    if settings["task"] != TASK_CHARGE_START or not settings.get("spin"):
+        return None
+    return (
+        settings["power_level"],
+        settings["soc_level"],
+        settings["duration"],
+    )
+
+
+class NestoreSetpoints:
+    """Coalesce setpoint changes into one charge task.
+
+    Changes of the power level, target SoC and duration are merged until
+    none came in for SETPOINT_DEBOUNCE seconds. While a manual charge is
+    running the merged setpoints are then sent as a single start task,
+    unless the device already runs that exact task.
+    """
+
+    def __init__(self, coordinator: NestoreCoordinator) -> None:
+        """Init the coalescer for a coordinator."""
+        self.coordinator = coordinator
+        self.changes = 0
+        self.posts = 0
+        self.skipped = 0
+        self._unsub_apply: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_changed(self) -> None:
+        """Register a setpoint change, restarting the wait for more changes."""
+        self.changes += 1
+        self.async_cancel()
+        self._unsub_apply = async_call_later(
+            self.coordinator.hass, SETPOINT_DEBOUNCE, self._async_handle_settled
+        )
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop a pending change."""
+        if self._unsub_apply is not None:
+            self._unsub_apply()
+            self._unsub_apply = None
+
+    async def _async_handle_settled(self, _now: datetime) -> None:
+        """Apply the setpoints once no change came in for a while."""
+        self._unsub_apply = None
+        await self._async_apply()
+
+    async def _async_apply(self) -> None:
+        """Send the merged setpoints when they change the running charge."""
+        coordinator = self.coordinator
+        if coordinator.get_operation_mode() != "MANUAL_HEATER":
+            # the setpoints are picked up when the heater is enabled
+            return
+        settings = coordinator.build_charge_settings()
+        if not coordinator.is_valid_charge(settings):
+            _LOGGER.debug("Ignoring setpoints outside the charge limits: %s", settings)
+            return
+        if (
+            coordinator.get_device_state() == STATE_CHARGING
+            and charge_task_key(settings) == coordinator.active_task
+        ):
+            _LOGGER.debug("Charge task already active, not posting %s", settings)
+            self.skipped += 1
+            return
+
+        self.posts += 1
+        coordinator.async_submit_command(settings, expect_state(STATE_CHARGING))
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the setpoint changes, posts and skipped posts."""
+        return {
+            "setpoint_changes": self.changes,
+            "setpoint_posts": self.posts,
+            "setpoint_skipped": self.skipped,
+        }
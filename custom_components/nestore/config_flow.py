@@ -7,7 +7,7 @@ from typing import Any, Optional
 
 import voluptuous as vol
 
-from .api_client import NestoreClient
+from .api_client import NestoreClient, parse_token
 
 from homeassistant.config_entries import (
     ConfigEntry,
@@ -17,22 +17,10 @@ from homeassistant.config_entries import (
     callback,
 )
 
-from homeassistant import config_entries
-
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.schema_config_entry_flow import (
-    SchemaCommonFlowHandler,
-    SchemaFlowError,
-    SchemaFlowFormStep,
-    SchemaOptionsFlowHandler,
-)
 from .const import (
     DOMAIN,
     CONF_HOST,
     CONF_PORT,
-    CONF_API_KEY,
     CONF_TOKEN,
     CONF_USERNAME,
     CONF_PASSWORD,
@@ -44,12 +32,26 @@ from .const import (
     DEFAULT_LOC_CONTROLLER,
     DEFAULT_INTERVAL,
     CONF_FULL_LOGGING,
+    CONF_TRACING,
+    CONF_CAPTURE,
     CONF_CONTROL,
     DEFAULT_LOGGING,
     DEFAULT_CONTROL,
-    CONF_ENTITY_NAME,
-    UNIQUE_ID,
+    DEFAULT_TRACING,
+    DEFAULT_CAPTURE,
     CONF_UPDATE_INTERVAL,
+    CONF_MIN_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    CONF_HISTORY_HOURS,
+    CONF_HISTORY_SAMPLES,
+    DEFAULT_HISTORY_HOURS,
+    DEFAULT_HISTORY_SAMPLES,
+    CONF_HISTORY_STORE,
+    DEFAULT_HISTORY_STORE,
+    CONF_HOT_WATER_TEMP,
+    CONF_VESSEL_VOLUME,
+    DEFAULT_HOT_WATER_TEMP,
+    DEFAULT_VESSEL_VOLUME,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -61,7 +63,25 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_UPDATE_INTERVAL, default=DEFAULT_INTERVAL): vol.All(
             vol.Coerce(int), vol.Range(min=30, max=3600)
         ),
+        vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_MIN_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=10, max=3600)
+        ),
+        vol.Optional(CONF_HISTORY_HOURS, default=DEFAULT_HISTORY_HOURS): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=8760)
+        ),
+        vol.Optional(CONF_HISTORY_SAMPLES, default=DEFAULT_HISTORY_SAMPLES): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=500000)
+        ),
+        vol.Required(CONF_HISTORY_STORE, default=DEFAULT_HISTORY_STORE): bool,
+        vol.Optional(CONF_HOT_WATER_TEMP, default=DEFAULT_HOT_WATER_TEMP): vol.All(
+            vol.Coerce(float), vol.Range(min=20, max=90)
+        ),
+        vol.Optional(CONF_VESSEL_VOLUME, default=DEFAULT_VESSEL_VOLUME): vol.All(
+            vol.Coerce(float), vol.Range(min=10, max=5000)
+        ),
         vol.Required(CONF_FULL_LOGGING, default=DEFAULT_LOGGING): bool,
+        vol.Required(CONF_TRACING, default=DEFAULT_TRACING): bool,
+        vol.Required(CONF_CAPTURE, default=DEFAULT_CAPTURE): bool,
         vol.Required(CONF_CONTROL, default=DEFAULT_CONTROL): bool,
         vol.Optional(CONF_USERNAME, default=DEFAULT_USERNAME): str,
         vol.Optional(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
@@ -73,6 +93,7 @@ class NestoreConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for the Heater integration."""
 
     VERSION = 1
+    MINOR_VERSION = 3
 
     async def async_step_user(
         self, user_input: Optional[dict[str, Any]] = None
@@ -97,14 +118,19 @@ class NestoreConfigFlow(ConfigFlow, domain=DOMAIN):
                     # successfully connected, get token when needed and store in user_input
                     if user_input[CONF_CONTROL] & len(user_input[CONF_PASSWORD]) > 0:
                         client.set_password(CONF_PASSWORD)
-                        data_input[CONF_TOKEN] = await client.async_get_token(
+                        response = await client.async_get_token(
                             DEFAULT_LOC_TOKEN,
                             user_input[CONF_USERNAME],
                             user_input[CONF_PASSWORD],
                         )
+                        # the device may answer with the token or an object
+                        token, _ = parse_token(response)
+                        data_input[CONF_TOKEN] = token or ""
 
                     return self.async_create_entry(
-                        title="Nestore Device", data=data_input, options=user_input
+                        title=f"Nestore {host}",
+                        data=data_input,
+                        options=user_input,
                     )
             except Exception as error:
                 errors["base"] = "cannot_connect"
@@ -127,7 +153,7 @@ class NestoreOptionsFlowHandler(OptionsFlow):
 
     def __init__(self, config_entry: ConfigEntry) -> None:
         """Initialize options flow."""
-        self.min_interval = config_entry.options[CONF_UPDATE_INTERVAL]
+        self.current_options = dict(config_entry.options)
 
     async def async_step_init(
         self, user_input: Optional[dict[str, Any]] = None
@@ -137,21 +163,13 @@ class NestoreOptionsFlowHandler(OptionsFlow):
 
         if user_input is not None:
             # Update the config entry
-            return self.async_create_entry(title="", options=user_input)
-
-        OPTIONS_SCHEMA = vol.Schema(
-            {
-                vol.Optional(CONF_UPDATE_INTERVAL, default=self.min_interval): vol.All(
-                    vol.Coerce(int), vol.Range(min=30, max=3600)
-                ),
-                vol.Required(CONF_FULL_LOGGING, default=DEFAULT_LOGGING): bool,
-                vol.Required(CONF_CONTROL, default=DEFAULT_CONTROL): bool,
-                vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
-            }
-        )
+            return self.async_create_entry(title="", data=user_input)
 
         return self.async_show_form(
             step_id="init",
-            data_schema=STEP_USER_DATA_SCHEMA,
+            # show the saved options instead of the defaults
+            data_schema=self.add_suggested_values_to_schema(
+                STEP_USER_DATA_SCHEMA, self.current_options
+            ),
             errors=errors,
         )
@@ -13,16 +13,33 @@ CONF_PORT = "port"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_UPDATE_INTERVAL = "Interval"
+CONF_MIN_INTERVAL = "Active interval"
+CONF_HISTORY_HOURS = "History hours"
+CONF_HISTORY_SAMPLES = "History samples"
+CONF_HISTORY_STORE = "Persistent history"
+CONF_HOT_WATER_TEMP = "Hot water temperature"
+CONF_VESSEL_VOLUME = "Vessel volume"
 CONF_FULL_LOGGING = "All sensor logging"
 CONF_CONTROL = "Allow control"
+CONF_TRACING = "Update tracing"
+CONF_CAPTURE = "Capture payloads"
 
 DEFAULT_HOST = "192.168.1.197"
+DEFAULT_HOSTNAME = "nestore.home"
 DEFAULT_PORT = 4805
 DEFAULT_USERNAME = ""
 DEFAULT_PASSWORD = ""
 DEFAULT_INTERVAL = 300
+DEFAULT_MIN_INTERVAL = 30
+DEFAULT_HISTORY_HOURS = 48
+DEFAULT_HISTORY_SAMPLES = 0
+DEFAULT_HISTORY_STORE = True
+DEFAULT_HOT_WATER_TEMP = 40
+DEFAULT_VESSEL_VOLUME = 200
 DEFAULT_LOGGING = True
 DEFAULT_CONTROL = True
+DEFAULT_TRACING = False
+DEFAULT_CAPTURE = False
 
 DEFAULT_LOC_DATA = "api/v3/data/engineering"
 DEFAULT_LOC_MEAS = "api/v3/data/measured"
@@ -37,5 +54,41 @@ MIN_POWER_LEVEL = 1000
 MIN_DURATION = 1799
 MAX_DURATION = 18001
 
-UPDATE_DELAY = 30
+STATE_CHARGING = "Charging Electrical Main"
+TASK_CHARGE_START = "ControlTask_ChargingElectrical_Start"
+TASK_CHARGE_STOP = "ControlTask_ChargingElectrical_Stop"
+
+CYCLE_TIMEOUT = 15
+CONTROL_BOOST_WINDOW = 300
+IDLE_BACKOFF_FACTOR = 2
+RESOLVE_TTL = 3600
+RESOLVE_AFTER_FAILURES = 3
+TOKEN_LIFETIME = 3600
+TOKEN_REFRESH_MARGIN = 300
+REQUEST_TIMEOUT = 5
+RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4
+RETRY_BUDGET = 12
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 60
+# response time histogram bounds in seconds, and the quantile shown as state
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+LATENCY_QUANTILE = 0.95
+# spans kept for the trace export, the oldest are dropped first
+TRACE_BUFFER_SIZE = 20000
+# profiling service, window when no duration is given and report length
+PROFILE_DEFAULT_SECONDS = 60
+PROFILE_REPORT_LINES = 60
+# raw payload capture, compressed bytes per file and rotated files kept
+CAPTURE_MAX_BYTES = 10 * 1024 * 1024
+CAPTURE_BACKUPS = 5
+CONFIRM_TIMEOUT = 60
+CONFIRM_POLL_INTERVAL = 2
+SETPOINT_DEBOUNCE = 5
+FLEET_CONNECTION_LIMIT = 64
+FLEET_CONNECTIONS_PER_DEVICE = 4
+STORE_RAW_MONTHS = 2
+ENERGY_MAX_GAP = 900
+ENERGY_SAVE_DELAY = 60
 DATETIMEFORMAT = "%Y%m%d%H00"
@@ -2,14 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from requests.exceptions import HTTPError
 
+from . import analytics
 from .api_client import NestoreClient
+from .capture import NestoreCapture
+from .commands import (
+    NestoreCommand,
+    NestoreCommandPipeline,
+    NestoreSetpoints,
+    charge_task_key,
+)
+from .energy import NestoreEnergy
+from .fleet import NestoreFleet
+from .history import NestoreHistory
+from .store import NestoreStore
+from .resolver import NestoreResolver
+from .snapshot import ENDPOINT_FIELDS, NestoreControlState, NestoreSnapshot
+from .tracing import CAT_ENTITY, CAT_REQUEST, NestoreTracer, write_trace
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,15 +37,34 @@ from .const import (
     CONF_USERNAME,
     CONF_PASSWORD,
     CONF_UPDATE_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_HISTORY_HOURS,
+    CONF_HISTORY_SAMPLES,
+    CONF_HISTORY_STORE,
+    CONF_HOT_WATER_TEMP,
+    CONF_VESSEL_VOLUME,
     CONF_FULL_LOGGING,
     CONF_CONTROL,
-    DEFAULT_LOC_TOKEN,
-    DEFAULT_LOC_ACTIVE,
-    DEFAULT_LOC_FLAG,
-    DEFAULT_LOC_CONTROLLER,
-    DEFAULT_LOC_INPUT,
-    DEFAULT_LOC_DATA,
-    UPDATE_DELAY,
+    CYCLE_TIMEOUT,
+    CONTROL_BOOST_WINDOW,
+    DEFAULT_MIN_INTERVAL,
+    IDLE_BACKOFF_FACTOR,
+    RESOLVE_AFTER_FAILURES,
+    DEFAULT_HISTORY_HOURS,
+    DEFAULT_HISTORY_SAMPLES,
+    DEFAULT_HISTORY_STORE,
+    DOMAIN,
+    ENERGY_MAX_GAP,
+    LATENCY_QUANTILE,
+    CONF_TRACING,
+    DEFAULT_TRACING,
+    CONF_CAPTURE,
+    DEFAULT_CAPTURE,
+    DEFAULT_HOT_WATER_TEMP,
+    DEFAULT_VESSEL_VOLUME,
+    MIN_DURATION,
+    MIN_POWER_LEVEL,
+    TASK_CHARGE_START,
 )
 
 
@@ -38,6 +76,8 @@ class NestoreCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         config_entry,
         api_keys,
+        resolver: NestoreResolver | None = None,
+        fleet: NestoreFleet | None = None,
     ) -> None:
         """Initialize the data object."""
         self.hass = hass
@@ -45,8 +85,21 @@ class NestoreCoordinator(DataUpdateCoordinator):
         self.api_keys = api_keys
         self.host = api_keys["HOST"]
         self.port = api_keys["PORT"]
+        self.resolver = resolver
+        self.fleet = fleet
+        self.failed_cycles = 0
+        # options the coordinator was created with
+        self.options = dict(self.config_entry.options)
 
         self.min_interval = self.config_entry.options[CONF_UPDATE_INTERVAL]
+        # adaptive polling: fast while the device is active, back off to the
+        # configured interval when idle
+        self.interval_floor = min(
+            self.config_entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            self.min_interval,
+        )
+        self.interval_ceiling = self.min_interval
+        self._boost_until = 0.0
         self.full_logging = self.config_entry.options[CONF_FULL_LOGGING]
         self.control_enabled = self.config_entry.options[CONF_CONTROL]
         self.control_token = self.config_entry.data[CONF_TOKEN]
@@ -60,13 +113,94 @@ class NestoreCoordinator(DataUpdateCoordinator):
         self.operation_mode = "AUTO"
 
         # initiate data containers
-        self.data_base = None
-        self.data_derived = None
-        self.data_counters = None
+        self.snapshot: NestoreSnapshot | None = None
+        self.control_state: NestoreControlState | None = None
         self.active = {"MODE": False, "ONLINE": False}
 
+        # endpoints fetched every update cycle and their last fetch durations
+        self.cycle_endpoints = {
+            "DATA": api_keys["DATA"],
+            "CONTROL": api_keys["CONTROL"],
+        }
+        self.fetch_timings: dict[str, float] = {}
+
+        # recent snapshots for range queries, sized in samples or in hours
+        # of polling at the fastest rate
+        history_samples = self.config_entry.options.get(
+            CONF_HISTORY_SAMPLES, DEFAULT_HISTORY_SAMPLES
+        )
+        if history_samples > 0:
+            self.history = NestoreHistory(history_samples)
+        else:
+            self.history = NestoreHistory.from_hours(
+                self.config_entry.options.get(
+                    CONF_HISTORY_HOURS, DEFAULT_HISTORY_HOURS
+                ),
+                self.interval_floor,
+            )
+
+        # heater energy and hot water volume integrated from the samples
+        self.energy = NestoreEnergy(hass, self.config_entry.entry_id)
+        self._update_energy_gap()
+
+        # stratification of the vessel, updated with every snapshot
+        self.hot_water_temp = self.config_entry.options.get(
+            CONF_HOT_WATER_TEMP, DEFAULT_HOT_WATER_TEMP
+        )
+        self.vessel_volume = self.config_entry.options.get(
+            CONF_VESSEL_VOLUME, DEFAULT_VESSEL_VOLUME
+        )
+        self.stratification: dict[str, float | None] = {}
+
+        # long range history on disk under the config dir
+        self.store: NestoreStore | None = None
+        if self.config_entry.options.get(CONF_HISTORY_STORE, DEFAULT_HISTORY_STORE):
+            self.store = NestoreStore(
+                hass.config.path(DOMAIN, self.config_entry.entry_id)
+            )
+
+        # called after polls that did not change the data, the regular
+        # listeners are only called for a new snapshot or control state
+        self._unchanged_listeners: list[CALLBACK_TYPE] = []
+        self._listeners_notified = False
+
+        # sensor state writes done and skipped by the deadband filter
+        self.written_states: Counter[str] = Counter()
+        self.suppressed_writes: Counter[str] = Counter()
+
+        # spans of the update cycle, only recorded when tracing is enabled
+        self.tracer = NestoreTracer(
+            self.config_entry.options.get(CONF_TRACING, DEFAULT_TRACING)
+        )
+
+        # raw bodies of every poll, written next to the history store
+        self.capture: NestoreCapture | None = None
+        if self.config_entry.options.get(CONF_CAPTURE, DEFAULT_CAPTURE):
+            self.capture = NestoreCapture(
+                hass.config.path(DOMAIN, self.config_entry.entry_id, "capture")
+            )
+
         # create api client
-        self.client = NestoreClient(self.hass, self.host, self.port, self.control_token)
+        self.client = NestoreClient(
+            self.hass,
+            self.host,
+            self.port,
+            self.control_token,
+            store_key=f"{DOMAIN}.{self.config_entry.entry_id}.token",
+            session=None if fleet is None else fleet.session,
+            tracer=self.tracer,
+            capture=self.capture,
+        )
+        if self.control_enabled:
+            self.client.set_credentials(self.control_username, self.control_password)
+        self._circuit_state = self.client.breaker.state
+
+        # control commands are posted and confirmed in the background
+        self.commands = NestoreCommandPipeline(self)
+        # charge task last accepted by the device, and setpoint changes
+        # merged into a new one
+        self.active_task: tuple | None = None
+        self.setpoints = NestoreSetpoints(self)
 
         logger = logging.getLogger(__name__)
         super().__init__(
@@ -75,76 +209,532 @@ class NestoreCoordinator(DataUpdateCoordinator):
             name="Nestore coordinator",
             update_method=self._async_update_data,
             update_interval=timedelta(seconds=self.min_interval),
+            # unchanged payloads do not notify the entities
+            always_update=False,
         )
+        if fleet is not None:
+            fleet.join(self)
 
-    async def async_update_interval(self, new_seconds: float) -> None:
+    async def async_update_interval(
+        self, new_seconds: float, floor_seconds: float | None = None
+    ) -> None:
         """Update the polling interval."""
-        new_interval = timedelta(seconds=new_seconds)
-
         _LOGGER.debug("Updating polling interval to %s seconds", new_seconds)
 
-        # Update the interval
-        self.update_interval = new_interval
+        # Update the scheduler limits, the idle rate is the configured interval
+        self.interval_ceiling = new_seconds
+        if floor_seconds is not None:
+            self.interval_floor = floor_seconds
+        self.interval_floor = min(self.interval_floor, self.interval_ceiling)
+        self._update_energy_gap()
 
-        # Force an immediate update and reschedule
-        # Cancel any existing update task
-        if self._unsub_refresh:
-            self._unsub_refresh()
-            self._unsub_refresh = None
-        # Restart the update task with the new interval
-        self._unsub_refresh = self._schedule_refresh()
+        self._reschedule(new_seconds)
 
         # trigger a refresh data
         await self.async_refresh()
 
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll in the slot of this device in the fleet."""
+        if self.fleet is None:
+            super()._schedule_refresh()
+            return
+        if self.update_interval is None or self.config_entry.pref_disable_polling:
+            return
+
+        self._async_unsub_refresh()
+        when = self.fleet.next_refresh(self, self.update_interval.total_seconds())
+        self._unsub_refresh = self.hass.loop.call_at(
+            when, self._handle_fleet_refresh
+        ).cancel
+
+    @callback
+    def _handle_fleet_refresh(self) -> None:
+        """Start a scheduled poll."""
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._handle_refresh_interval(),
+            f"{self.name} - {self.config_entry.title} - refresh",
+        )
+
+    def _update_energy_gap(self) -> None:
+        """Integrate across any interval the scheduler can produce."""
+        self.energy.set_max_gap(
+            max(ENERGY_MAX_GAP, 2 * self.interval_ceiling + CYCLE_TIMEOUT)
+        )
+
+    def _reschedule(self, seconds: float) -> None:
+        """Apply a new polling interval and restart the refresh timer."""
+        self.update_interval = timedelta(seconds=seconds)
+
+        # Cancel any existing update task and restart it with the new interval
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        if self._listeners:
+            self._schedule_refresh()
+
+    def _is_device_active(self) -> bool:
+        """Check if the heater is charging or hot water is flowing."""
+        if time.monotonic() < self._boost_until:
+            return True
+        if self.snapshot is None:
+            return False
+        return self.snapshot.power_heater > 0 or self.snapshot.flow_dhw > 0
+
+    def _next_interval(self) -> float:
+        """Pick the polling interval for the next cycle based on activity."""
+        if self._is_device_active():
+            return self.interval_floor
+
+        # back off gradually towards the idle rate
+        current = self.update_interval.total_seconds()
+        return min(
+            self.interval_ceiling,
+            max(self.interval_floor, current * IDLE_BACKOFF_FACTOR),
+        )
+
     def get_polling_interval(self):
         return self.update_interval
 
+    def get_effective_interval(self) -> float:
+        """Get the current effective polling interval in seconds."""
+        return self.update_interval.total_seconds()
+
+    async def _async_fetch_endpoints(self) -> dict[str, Any]:
+        """Fetch all cycle endpoints concurrently under one shared deadline."""
+
+        async def _timed_query(name: str, api_key: str):
+            start = time.monotonic()
+            try:
+                with self.tracer.span(f"fetch {name}", CAT_REQUEST):
+                    return await self.client.async_query_data(
+                        api_key, fields=ENDPOINT_FIELDS.get(api_key)
+                    )
+            finally:
+                self.fetch_timings[name] = round(time.monotonic() - start, 3)
+
+        tasks = {
+            name: asyncio.create_task(
+                _timed_query(name, api_key), name=f"nestore fetch {name}"
+            )
+            for name, api_key in self.cycle_endpoints.items()
+        }
+        _, pending = await asyncio.wait(tasks.values(), timeout=CYCLE_TIMEOUT)
+
+        # cancel whatever did not make the deadline, keep the rest
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = {}
+        for name, task in tasks.items():
+            if task in pending:
+                _LOGGER.debug("Endpoint %s missed the cycle deadline", name)
+                results[name] = None
+            elif task.exception() is not None:
+                _LOGGER.debug("Endpoint %s failed: %s", name, task.exception())
+                results[name] = None
+            else:
+                results[name] = task.result()
+
+        _LOGGER.debug("Endpoint fetch timings: %s", self.fetch_timings)
+        return results
+
     # Triggered by HA to refresh the data
     async def _async_update_data(self) -> dict:
         """Get the latest data from NEStore."""
         _LOGGER.info("Nestore DataUpdateCoordinator data update")
 
-        data = await self.client.async_query_data(self.api_keys["DATA"])
-        data_control = await self.client.async_query_data(self.api_keys["CONTROL"])
-
-        returnStates = {}
-
-        if data is not None:
-            self.data_base = data["PAYLOAD"]["BASE"]
-            self.data_counters = data["PAYLOAD"]["COUNTERS"]
-            self.data_derived = data["PAYLOAD"]["DERIVED"]
+        if self.resolver is not None:
+            # picks up a new address once the cached one expires
+            self._set_host(await self.resolver.async_resolve())
+
+        with self.tracer.span("fetch"):
+            results = await self._async_fetch_endpoints()
+        data = results["DATA"]
+        data_control = results["CONTROL"]
+
+        if data is None and data_control is None:
+            self.failed_cycles += 1
+            if (
+                self.resolver is not None
+                and self.failed_cycles % RESOLVE_AFTER_FAILURES == 0
+            ):
+                # the device may have received a new address from DHCP
+                self._set_host(await self.resolver.async_resolve(force=True))
+            if self.client.breaker.state != self._circuit_state:
+                # listeners are not called again for repeated failures
+                self._circuit_state = self.client.breaker.state
+                self.async_update_listeners()
+            raise UpdateFailed("No endpoint returned data this cycle")
+        self.failed_cycles = 0
+
+        if data is not None and data is self.snapshot:
+            # identical body, only the integrated totals move on
+            seen = self.client.last_seen[self.cycle_endpoints["DATA"]]
+            self.energy.add(data, seen)
+            self.logger.debug("Unchanged DATA log")
+        elif data is not None:
+            with self.tracer.span("process snapshot"):
+                self.snapshot = data
+                self.energy.add(data)
+                self._update_stratification(data)
+                self.history.append_snapshot(data)
+                await self._async_store_snapshot(data)
             self.logger.debug("Parsed DATA log")
-            returnStates["Data"] = True
 
         if data_control is not None:
-            self.device_state = data_control["PAYLOAD"]["NAME"]
+            self.control_state = data_control
             self.logger.debug("Parsed CONTROL log")
-            returnStates["Control"] = True
 
         # update switch states
 
-        return returnStates
+        # the coordinator schedules the next refresh after this returns
+        next_interval = self._next_interval()
+        if next_interval != self.get_effective_interval():
+            _LOGGER.debug("Adapting polling interval to %s seconds", next_interval)
+            self.update_interval = timedelta(seconds=next_interval)
+
+        # compared with the previous result to decide on notifying entities
+        return {"Data": self.snapshot, "Control": self.control_state}
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh the data, traced as one update cycle."""
+        with self.tracer.span("update cycle"):
+            self._listeners_notified = False
+            await super()._async_refresh(*args, **kwargs)
+            if not self._listeners_notified:
+                self._async_update_unchanged_listeners()
+        if self.capture is not None:
+            await self._async_flush_capture()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Push the data to the entities, traced as the entity fan-out."""
+        self._listeners_notified = True
+        with self.tracer.span("entity fan-out", CAT_ENTITY):
+            super().async_update_listeners()
+
+    @callback
+    def async_add_unchanged_listener(
+        self, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for polls that left the data unchanged."""
+        self._unchanged_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._unchanged_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_update_unchanged_listeners(self) -> None:
+        """Update counters, totals and heartbeats after an unchanged poll."""
+        with self.tracer.span("unchanged fan-out", CAT_ENTITY):
+            for update_callback in list(self._unchanged_listeners):
+                update_callback()
+
+    async def async_export_trace(self) -> dict[str, Any]:
+        """Write the buffered spans as a Chrome trace in the config dir."""
+        path = self.hass.config.path(
+            f"{DOMAIN}_trace_{self.config_entry.entry_id}_"
+            f"{dt_util.now():%Y%m%d_%H%M%S}.json"
+        )
+        trace = self.tracer.export(self.config_entry.title)
+        await self.hass.async_add_executor_job(write_trace, path, trace)
+        spans = len(trace["traceEvents"])
+        _LOGGER.info("Wrote %s trace events to %s", spans, path)
+        return {"path": path, "events": spans}
+
+    async def async_prepare(self) -> None:
+        """Load persisted state and modules before the first refresh."""
+        await self.energy.async_load()
+        await self.client.async_load_token()
+        await self.hass.async_add_executor_job(analytics.load)
+        await self._async_open_store()
+
+    async def async_release(self) -> None:
+        """Save persisted state and close the history store."""
+        self.setpoints.async_cancel()
+        await self.commands.async_stop()
+        if self.fleet is not None:
+            await self.fleet.async_leave(self)
+        await self.energy.async_save()
+        if self.store is not None:
+            await self.hass.async_add_executor_job(self.store.close)
+        if self.capture is not None:
+            await self._async_flush_capture()
+            await self.hass.async_add_executor_job(self.capture.close)
+
+    async def _async_open_store(self) -> None:
+        """Open the history store, recovering from an interrupted write."""
+        if self.store is None:
+            return
+        try:
+            await self.hass.async_add_executor_job(self.store.open)
+        except OSError as err:
+            _LOGGER.error("Unable to open history store, disabling it: %s", err)
+            self.store = None
+
+    async def _async_flush_capture(self) -> None:
+        """Write the bodies captured since the last flush."""
+        try:
+            await self.capture.async_flush(self.hass)
+        except OSError as err:
+            _LOGGER.warning("Unable to write the payload capture: %s", err)
+
+    async def _async_store_snapshot(self, snapshot: NestoreSnapshot) -> None:
+        """Append a snapshot to the history store."""
+        if self.store is None:
+            return
+        try:
+            await self.hass.async_add_executor_job(
+                self.store.append, snapshot.received, snapshot.as_row()
+            )
+        except OSError as err:
+            _LOGGER.warning("Unable to write history: %s", err)
+
+    def _update_stratification(self, snapshot: NestoreSnapshot) -> None:
+        """Compute the stratification of the vessel for a new snapshot."""
+        result = analytics.stratification(
+            snapshot.temp_vessel, self.hot_water_temp, self.vessel_volume
+        )
+        self.stratification = {
+            name: analytics.column_values(values)[0] for name, values in result.items()
+        }
 
-    async def async_post_state(self, settings):
+    async def async_get_values(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        stratification: bool = False,
+    ) -> dict[str, list[float]]:
+        """Get the history between start and end as columns."""
+        start_ts = None if start is None else dt_util.as_timestamp(start)
+        end_ts = None if end is None else dt_util.as_timestamp(end)
+
+        # older than the buffer reaches, read it from disk
+        oldest = self.history.oldest
+        if self.store is not None and (
+            oldest is None or start_ts is None or start_ts < oldest
+        ):
+            return await self.hass.async_add_executor_job(
+                self._stored_values, start_ts, end_ts, stratification
+            )
+
+        columns = self.history.query(start_ts, end_ts)
+        values = {name: column.tolist() for name, column in columns.items()}
+        if stratification:
+            values.update(
+                await self.hass.async_add_executor_job(
+                    self._stratification_values, columns
+                )
+            )
+        return values
+
+    def _stored_values(
+        self, start: float | None, end: float | None, stratification: bool
+    ) -> dict[str, list[float | None]]:
+        """Read history columns from disk as lists, in the executor."""
+        columns = self.store.query(start, end)
+        values = {name: column.tolist() for name, column in columns.items()}
+        if stratification:
+            values.update(self._stratification_values(columns))
+        return values
+
+    def _stratification_values(
+        self, columns: dict[str, Any]
+    ) -> dict[str, list[float | None]]:
+        """Compute the stratification of history columns, in the executor."""
+        result = analytics.stratification_columns(
+            columns, self.hot_water_temp, self.vessel_volume
+        )
+        return {
+            name: analytics.column_values(values) for name, values in result.items()
+        }
+
+    def get_history_memory(self) -> float:
+        """Get the memory held by the history buffer in kB."""
+        return round(self.history.nbytes / 1024, 1)
+
+    def get_history_diagnostics(self) -> dict[str, Any]:
+        """Get the history buffer usage."""
+        return {
+            "samples": len(self.history),
+            "capacity": self.history.capacity,
+            "oldest": self.history.oldest,
+            "newest": self.history.newest,
+            "store_bytes": None if self.store is None else self.store.nbytes,
+        }
+
+    def _set_host(self, host: str) -> None:
+        """Point the client at a new device address."""
+        if host == self.host:
+            return
+        _LOGGER.info("Nestore device address changed from %s to %s", self.host, host)
+        self.host = host
+        self.api_keys["HOST"] = host
+        self.client.host = host
+        # the old address being down says nothing about the new one
+        self.client.breaker.reset()
+
+    def get_resolve_latency(self) -> float | None:
+        """Get the duration of the last hostname resolution in ms."""
+        if self.resolver is None or self.resolver.latency is None:
+            return None
+        return round(self.resolver.latency * 1000, 1)
+
+    def get_resolver_diagnostics(self) -> dict[str, Any]:
+        """Get the hostname resolver state."""
+        if self.resolver is None:
+            return {}
+        return self.resolver.get_diagnostics()
+
+    def get_circuit_state(self) -> str:
+        """Get the state of the circuit breaker of the client."""
+        return self.client.breaker.state
+
+    def get_retry_total(self) -> int:
+        """Get the number of retried requests."""
+        return self.client.retries.total()
+
+    def get_resilience_diagnostics(self) -> dict[str, Any]:
+        """Get the circuit breaker state and retries per endpoint."""
+        return {
+            **self.client.get_resilience_diagnostics(),
+            "fleet": self.get_fleet_diagnostics(),
+        }
+
+    def get_response_time(self, name: str) -> float | None:
+        """Get the usual response time of a polled endpoint in ms."""
+        seconds = self.client.instrumentation.get_quantile(
+            self.cycle_endpoints[name], LATENCY_QUANTILE
+        )
+        return None if seconds is None else round(seconds * 1000, 1)
+
+    def get_response_histogram(self, name: str) -> dict[str, Any]:
+        """Get the response times and failures of a polled endpoint."""
+        endpoint = self.client.instrumentation.endpoints.get(self.cycle_endpoints[name])
+        return {} if endpoint is None else endpoint.get_diagnostics()
+
+    def get_request_diagnostics(self) -> dict[str, Any]:
+        """Get the response times and failures of every endpoint."""
+        return self.client.instrumentation.get_diagnostics()
+
+    def get_request_errors(self, kind: str) -> int:
+        """Get the failed requests of a kind over all endpoints."""
+        return self.client.instrumentation.get_error_total(kind)
+
+    def get_request_error_diagnostics(self, kind: str) -> dict[str, Any]:
+        """Get the failed requests of a kind per endpoint."""
+        return self.client.instrumentation.get_errors(kind)
+
+    def get_unchanged_payloads(self) -> int:
+        """Get the number of bodies that matched the previous one."""
+        return self.client.fingerprint_hits.total()
+
+    def get_fingerprint_statistics(self) -> dict[str, Any]:
+        """Get unchanged and changed bodies and last response per endpoint."""
+        statistics = {}
+        for name, api_key in self.cycle_endpoints.items():
+            last_seen = self.client.last_seen.get(api_key)
+            statistics[name] = {
+                "unchanged": self.client.fingerprint_hits[api_key],
+                "changed": self.client.fingerprint_misses[api_key],
+                "last_seen": None
+                if last_seen is None
+                else dt_util.utc_from_timestamp(last_seen).isoformat(),
+            }
+        return statistics
+
+    def get_fleet_diagnostics(self) -> dict[str, Any]:
+        """Get the place of this device in the fleet."""
+        if self.fleet is None:
+            return {}
+        return self.fleet.get_diagnostics(self)
+
+    def get_fetch_timings(self) -> dict[str, float]:
+        """Get the duration in seconds of each endpoint in the last cycle."""
+        return self.fetch_timings
+
+    async def async_post_state(self, settings) -> bool:
         """Post state using api routine."""
-        await self.client.async_post_request(self.api_keys["FLAGS"], settings)
+        if not await self.client.async_post_request(self.api_keys["FLAGS"], settings):
+            return False
+        self.active_task = charge_task_key(settings)
+
+        # follow the device closely while it reacts to the command
+        self._boost_until = time.monotonic() + CONTROL_BOOST_WINDOW
+        self._reschedule(self.interval_floor)
+        return True
+
+    @callback
+    def async_submit_command(self, settings, expect=None, on_done=None) -> None:
+        """Queue a control command, posted and confirmed in the background."""
+        self.commands.submit(NestoreCommand(dict(settings), expect, on_done))
+
+    async def async_poll_control_state(self) -> str | None:
+        """Fetch only the control state, used to confirm commands."""
+        state = await self.client.async_query_data(self.cycle_endpoints["CONTROL"])
+        if state is not None:
+            self.control_state = state
+        return self.get_device_state()
+
+    def get_command_latency(self) -> float | None:
+        """Get how long the device took to confirm the last command."""
+        return self.commands.get_last_latency()
+
+    def get_command_diagnostics(self) -> dict[str, Any]:
+        """Get the state of the control command pipeline."""
+        return {**self.commands.get_diagnostics(), **self.setpoints.get_diagnostics()}
+
+    def build_charge_settings(self) -> dict[str, Any]:
+        """Build the start task for the current setpoints."""
+        return {
+            "task": TASK_CHARGE_START,
+            "power_level": self.get_target_power_level(),
+            "soc_level": self.get_target_soc_level(),
+            "duration": self.get_target_duration(),
+            "spin": True,
+        }
+
+    def is_valid_charge(self, settings: dict[str, Any]) -> bool:
+        """Check a start task against the charge limits."""
+        return (
+            settings["power_level"] >= MIN_POWER_LEVEL
+            and settings["soc_level"] > self.get_current_soc()
+            and settings["duration"] > MIN_DURATION
+        )
 
     async def async_refresh_token(self):
         """get a new token"""
-
-        self.control_token = await self.client.async_get_token(
-            DEFAULT_LOC_TOKEN, self.control_username, self.control_password
-        )
-        _LOGGER.debug("Obtained a new token: %s", self.control_token)
-
-        _LOGGER.debug("Updating token in API client")
-        self.client.set_token(self.control_token)
-
-        self.hass.config_entries.async_update_entry(
-            self.config_entry,
-            data={**self.config_entry.data, "token": self.control_token},
-        )
+        if not await self.client.async_refresh_token():
+            raise UpdateFailed("Unable to refresh the token")
+        self.control_token = self.client.token
+
+    def record_state_write(self, key: str, written: bool) -> None:
+        """Count a sensor state write, or a write skipped by its deadband."""
+        if written:
+            self.written_states[key] += 1
+        else:
+            self.suppressed_writes[key] += 1
+
+    def get_suppressed_writes_total(self) -> int:
+        """Get the number of state writes skipped by sensor deadbands."""
+        return self.suppressed_writes.total()
+
+    def get_write_statistics(self) -> dict[str, Any]:
+        """Get written and suppressed state writes per sensor."""
+        return {
+            key: {
+                "written": self.written_states[key],
+                "suppressed": self.suppressed_writes[key],
+            }
+            for key in sorted(self.written_states | self.suppressed_writes)
+        }
 
     # storing switch entity
 
@@ -168,35 +758,35 @@ class NestoreCoordinator(DataUpdateCoordinator):
 
     def get_current_soc(self):
         """Get current state of charge."""
-        return self.data_derived["SOC_VES"]
+        return self.snapshot.soc
 
     def get_current_soc_total(self):
         """Get current total state of charge."""
-        return self.data_derived["SOC_VES_TOTAL"]
+        return self.snapshot.soc_total
 
     def get_heater_temp(self):
         """Get current heater temperature."""
-        return self.data_base["TEMP_HTR_OUT"]
+        return self.snapshot.temp_heater_out
 
     def get_flow(self):
         """Get water flow."""
-        return self.data_derived["FLOW_DHW"]
+        return self.snapshot.flow_dhw
 
     def get_current_pressure(self):
         """Get current pressure."""
-        return self.data_base["PRES_SYS"]
+        return self.snapshot.pressure
 
     def get_temp_vessel(self, id):
         """Get internal temperature of specified zone."""
-        return self.data_base[f"TEMP_VES_INT_{id}"]
+        return self.snapshot.temp_vessel[id - 1]
 
     def get_power_heater(self):
         """Get heater electrical power."""
-        return self.data_derived["POWER_HEATER"]
+        return self.snapshot.power_heater
 
     def get_device_state(self):
         """Get current device state."""
-        return self.device_state
+        return self.control_state.name if self.control_state else None
 
     def set_target_power_level(self, value):
         """Set target power level."""
@@ -216,16 +806,33 @@ class NestoreCoordinator(DataUpdateCoordinator):
 
     def get_total_energy_dhw(self):
         """Get total energy DHW in kWh"""
-        return self.data_counters["ENERGY_DHW_THERMAL_THEORETICAL"] / 1000.0
+        return self.snapshot.energy_dhw_total / 1000.0
 
     def get_current_energy_dhw(self):
         """Get current stored energy DHW in kWh"""
-        return self.data_derived["TE"] / 1000.0
+        return self.snapshot.energy_stored / 1000.0
 
     def get_total_electrical(self):
         """Get total electrical energy input in kWh"""
-        return self.data_counters["ENERGY_CRG_ELECTRICAL"] / 1000.0
+        return self.snapshot.energy_electrical_total / 1000.0
+
+    def get_integrated_heater_energy(self):
+        """Get heater energy integrated from the power samples in kWh"""
+        return self.energy.heater.total
+
+    def get_integrated_dhw_volume(self):
+        """Get hot water volume integrated from the flow samples in L"""
+        return self.energy.dhw.total
+
+    def get_stratification(self, name: str) -> float | None:
+        """Get a stratification quantity of the last snapshot."""
+        return self.stratification[name]
+
+    def get_thermocline_position(self) -> float | None:
+        """Get the thermocline height in percent, None for a mixed vessel."""
+        thermocline = self.stratification["thermocline"]
+        return None if thermocline is None else 100 * thermocline
 
     def get_total_dhw(self):
         """Get total water volume provided in"""
-        return self.data_counters["VOL_DHW_THEORETICAL"] / 1000.0
+        return self.snapshot.volume_dhw_total / 1000.0
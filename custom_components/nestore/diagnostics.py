@@ -0,0 +1,48 @@
+"""Diagnostics support for Nestore."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME, DOMAIN
+from .coordinator import NestoreCoordinator
+
+TO_REDACT = {CONF_TOKEN, CONF_USERNAME, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: NestoreCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "device_state": coordinator.get_device_state(),
+        "last_update_success": coordinator.last_update_success,
+        "polling": {
+            "interval": coordinator.get_effective_interval(),
+            "fetch_timings": coordinator.fetch_timings,
+            "failed_cycles": coordinator.failed_cycles,
+        },
+        "requests": coordinator.get_request_diagnostics(),
+        "resilience": coordinator.get_resilience_diagnostics(),
+        "payloads": coordinator.get_fingerprint_statistics(),
+        "token": {
+            "expiry": coordinator.client.token_expiry,
+            "refreshes": coordinator.client.token_refreshes,
+        },
+        "commands": coordinator.get_command_diagnostics(),
+        "history": coordinator.get_history_diagnostics(),
+        "resolver": coordinator.get_resolver_diagnostics(),
+        "capture": None
+        if coordinator.capture is None
+        else coordinator.capture.get_diagnostics(),
+        "tracing": {
+            "enabled": coordinator.tracer.enabled,
+            "spans": len(coordinator.tracer.spans),
+        },
+    }
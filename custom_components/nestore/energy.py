@@ -0,0 +1,102 @@
+"""Energy and volume totals integrated from the sampled rates."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, ENERGY_MAX_GAP, ENERGY_SAVE_DELAY
+from .snapshot import NestoreSnapshot
+
+STORAGE_VERSION = 1
+
+# rate units to total units per second
+WATT_TO_KWH = 1 / 3_600_000
+LITER_PER_MINUTE_TO_LITER = 1 / 60
+
+
+class TrapezoidIntegrator:
+    """Running trapezoidal integral of a rate sampled at irregular times."""
+
+    __slots__ = ("scale", "max_gap", "total", "last_time", "last_value")
+
+    def __init__(self, scale: float = 1.0, max_gap: float = ENERGY_MAX_GAP) -> None:
+        """Init the integrator, scale converts the rate to total units per second."""
+        self.scale = scale
+        self.max_gap = max_gap
+        self.total = 0.0
+        self.last_time: float | None = None
+        self.last_value = 0.0
+
+    def add(self, timestamp: float, value: float) -> float:
+        """Add a sample and return the running total."""
+        if self.last_time is not None:
+            elapsed = timestamp - self.last_time
+            if elapsed <= 0:
+                return self.total
+            # do not guess what happened while the device was not polled
+            if elapsed <= self.max_gap:
+                self.total += (value + self.last_value) * elapsed * self.scale / 2
+        self.last_time = timestamp
+        self.last_value = value
+        return self.total
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {
+            "total": self.total,
+            "last_time": self.last_time,
+            "last_value": self.last_value,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore a persisted state."""
+        self.total = data["total"]
+        self.last_time = data["last_time"]
+        self.last_value = data["last_value"]
+
+
+class NestoreEnergy:
+    """Heater energy and hot water volume integrated from every snapshot."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Init the totals and their storage."""
+        self.heater = TrapezoidIntegrator(WATT_TO_KWH)
+        self.dhw = TrapezoidIntegrator(LITER_PER_MINUTE_TO_LITER)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.energy"
+        )
+
+    def set_max_gap(self, seconds: float) -> None:
+        """Set the longest interval that is still integrated."""
+        self.heater.max_gap = seconds
+        self.dhw.max_gap = seconds
+
+    async def async_load(self) -> None:
+        """Restore the totals saved before the last restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self.heater.restore(data["heater"])
+        self.dhw.restore(data["dhw"])
+
+    def add(self, snapshot: NestoreSnapshot, timestamp: float | None = None) -> None:
+        """Integrate the rates of a snapshot and schedule a save.
+
+        The timestamp defaults to the receive time of the snapshot, it is
+        given when an unchanged snapshot was seen again.
+        """
+        if timestamp is None:
+            timestamp = snapshot.received
+        self.heater.add(timestamp, snapshot.power_heater)
+        self.dhw.add(timestamp, snapshot.flow_dhw)
+        self._store.async_delay_save(self._data_to_save, ENERGY_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the totals now."""
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {"heater": self.heater.as_dict(), "dhw": self.dhw.as_dict()}
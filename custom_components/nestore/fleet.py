@@ -0,0 +1,119 @@
+"""Shared scheduling and connections for several Nestore devices."""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .aggregate import NestoreAggregateCoordinator
+from .const import DOMAIN, FLEET_CONNECTION_LIMIT, FLEET_CONNECTIONS_PER_DEVICE
+
+if TYPE_CHECKING:
+    from .coordinator import NestoreCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+FLEET_KEY = f"{DOMAIN}_fleet"
+
+
+class NestoreFleet:
+    """Devices of all config entries, polled in turn over one connection pool.
+
+    Every member gets a phase within its polling interval, evenly spread
+    over the members, so the devices are not all polled at the same
+    moment. All clients share one session with a bounded connector, and
+    the site totals follow the snapshots of all members.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init an empty fleet."""
+        self.hass = hass
+        self.members: list[NestoreCoordinator] = []
+        self._session: aiohttp.ClientSession | None = None
+        self._unsub_close = None
+        self.aggregate = NestoreAggregateCoordinator(hass)
+
+    @classmethod
+    @callback
+    def async_get(cls, hass: HomeAssistant) -> NestoreFleet:
+        """Get the fleet, created for the first device."""
+        if (fleet := hass.data.get(FLEET_KEY)) is None:
+            fleet = hass.data[FLEET_KEY] = cls(hass)
+        return fleet
+
+    @callback
+    def join(self, coordinator: NestoreCoordinator) -> None:
+        """Add a device to the fleet."""
+        self.members.append(coordinator)
+        self.aggregate.async_track(coordinator)
+        _LOGGER.debug("Fleet has %s devices", len(self.members))
+
+    async def async_leave(self, coordinator: NestoreCoordinator) -> None:
+        """Remove a device, the last one closes the connection pool."""
+        if coordinator in self.members:
+            self.members.remove(coordinator)
+        self.aggregate.async_untrack(coordinator)
+        if self.members:
+            return
+        self.hass.data.pop(FLEET_KEY, None)
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        await self._async_close_session()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Get the session shared by all clients."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=FLEET_CONNECTION_LIMIT,
+                limit_per_host=FLEET_CONNECTIONS_PER_DEVICE,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._unsub_close = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_CLOSE, self._async_handle_close
+            )
+        return self._session
+
+    async def _async_handle_close(self, event: Event) -> None:
+        """Close the connection pool when Home Assistant stops."""
+        self._unsub_close = None
+        await self._async_close_session()
+
+    async def _async_close_session(self) -> None:
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def next_refresh(self, coordinator: NestoreCoordinator, interval: float) -> float:
+        """Get the loop time of the next poll of a device.
+
+        Polls fall on a grid of the interval, shifted by the phase of the
+        device, and are at least half an interval away so a new phase
+        does not cause a burst of polls.
+        """
+        loop_time = self.hass.loop.time()
+        if coordinator not in self.members or interval <= 0:
+            return loop_time + interval
+        phase = interval * self.members.index(coordinator) / len(self.members)
+        earliest = loop_time + interval / 2
+        return math.ceil((earliest - phase) / interval) * interval + phase
+
+    def get_diagnostics(self, coordinator: NestoreCoordinator) -> dict[str, Any]:
+        """Get the place of a device in the fleet."""
+        return {
+            "devices": len(self.members),
+            "slot": self.members.index(coordinator)
+            if coordinator in self.members
+            else None,
+            "connection_limit": FLEET_CONNECTION_LIMIT,
+            "connections_per_device": FLEET_CONNECTIONS_PER_DEVICE,
+        }
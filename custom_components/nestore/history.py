@@ -0,0 +1,104 @@
+"""In-memory history of recent Nestore snapshots."""
+
+from __future__ import annotations
+
+import math
+from array import array
+
+from .snapshot import SNAPSHOT_COLUMNS, NestoreSnapshot
+
+HISTORY_MAX_SAMPLES = 500_000
+
+
+class NestoreHistory:
+    """Fixed size ring buffer of snapshots, stored as one array per column."""
+
+    def __init__(self, capacity: int, columns: tuple[str, ...] = SNAPSHOT_COLUMNS):
+        """Allocate the buffer for capacity samples."""
+        self.capacity = max(1, min(capacity, HISTORY_MAX_SAMPLES))
+        self.columns = columns
+        self._time = array("d", bytes(8 * self.capacity))
+        self._data = tuple(array("d", bytes(8 * self.capacity)) for _ in columns)
+        self._start = 0
+        self._size = 0
+
+    @classmethod
+    def from_hours(cls, hours: float, interval: float) -> NestoreHistory:
+        """Size the buffer to cover hours of polling at the given interval."""
+        return cls(math.ceil(hours * 3600 / interval))
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the buffer columns."""
+        return self._time.itemsize * self.capacity * (len(self.columns) + 1)
+
+    @property
+    def oldest(self) -> float | None:
+        """Return the timestamp of the oldest sample."""
+        return self._time[self._start] if self._size else None
+
+    @property
+    def newest(self) -> float | None:
+        """Return the timestamp of the newest sample."""
+        if not self._size:
+            return None
+        return self._time[(self._start + self._size - 1) % self.capacity]
+
+    def append_snapshot(self, snapshot: NestoreSnapshot) -> None:
+        """Store a snapshot at its receive time."""
+        self.append(snapshot.received, snapshot.as_row())
+
+    def append(self, timestamp: float, row: tuple[float, ...]) -> None:
+        """Store a row, overwriting the oldest sample when full."""
+        newest = self.newest
+        if newest is not None and timestamp <= newest:
+            # keep the time column sorted for the binary search
+            return
+
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._time[index] = timestamp
+        for column, value in zip(self._data, row, strict=True):
+            column[index] = value
+
+    def _bisect(self, timestamp: float, right: bool) -> int:
+        """Find the logical position of timestamp in the time column."""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self._time[(self._start + mid) % self.capacity]
+            if value < timestamp or (right and value == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _slice(self, column: array, lo: int, hi: int) -> array:
+        """Copy logical positions lo..hi out of a column."""
+        first = (self._start + lo) % self.capacity
+        count = hi - lo
+        if first + count <= self.capacity:
+            return column[first : first + count]
+        return column[first:] + column[: first + count - self.capacity]
+
+    def query(
+        self, start: float | None = None, end: float | None = None
+    ) -> dict[str, array]:
+        """Get the columns of the samples with start <= time <= end."""
+        lo = 0 if start is None else self._bisect(start, right=False)
+        hi = self._size if end is None else self._bisect(end, right=True)
+        hi = max(lo, hi)
+
+        result = {"timestamp": self._slice(self._time, lo, hi)}
+        for name, column in zip(self.columns, self._data, strict=True):
+            result[name] = self._slice(column, lo, hi)
+        return result
@@ -0,0 +1,159 @@
+"""Latency and error statistics of the requests to the Nestore device."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+from collections import Counter
+from datetime import UTC, datetime
+from typing import Any
+
+import aiohttp
+
+from .const import LATENCY_BUCKETS
+
+ERROR_TIMEOUT = "timeout"
+ERROR_HTTP = "http"
+ERROR_CONNECTION = "connection"
+
+
+def classify_error(err: BaseException) -> str | None:
+    """Return the kind of a failed request, None when it was not a failure."""
+    # checked first, aiohttp timeouts are client errors as well
+    if isinstance(err, asyncio.TimeoutError):
+        return ERROR_TIMEOUT
+    if isinstance(err, aiohttp.ClientResponseError):
+        return ERROR_HTTP
+    if isinstance(err, aiohttp.ClientError):
+        return ERROR_CONNECTION
+    return None
+
+
+class LatencyHistogram:
+    """Count response times in fixed buckets.
+
+    The buckets are upper bounds in seconds, with a last bucket for
+    everything slower. Quantiles are estimated as the upper bound of the
+    bucket they fall in, which keeps recording a single bisect.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Init an empty histogram."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Count one response time."""
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, share: float) -> float | None:
+        """Estimate the response time below which share of the responses fall."""
+        if not self.count:
+            return None
+        rank = share * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the bucket counts with the bounds in ms."""
+        buckets = {
+            f"le_{round(bound * 1000)}ms": count
+            for bound, count in zip(self.bounds, self.counts)
+        }
+        buckets["slower"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.total / self.count, 1) if self.count else None,
+            "max_ms": round(1000 * self.max, 1),
+            "buckets": buckets,
+        }
+
+
+class EndpointStatistics:
+    """Response times and failures of one endpoint."""
+
+    def __init__(self) -> None:
+        """Init without requests."""
+        self.latency = LatencyHistogram()
+        self.errors: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self.last_error: str | None = None
+        self.last_error_at: str | None = None
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the histogram and error counts."""
+        return {
+            "latency": self.latency.as_dict(),
+            "timeouts": self.errors[ERROR_TIMEOUT],
+            "http_errors": self.errors[ERROR_HTTP],
+            "http_statuses": dict(self.statuses),
+            "connection_errors": self.errors[ERROR_CONNECTION],
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
+class RequestInstrumentation:
+    """Statistics of every request sent by a client, per endpoint path.
+
+    Every attempt counts on its own, so a retried request shows up once
+    for each time it was sent. Only answered requests go in the latency
+    histogram, failures are counted by kind.
+    """
+
+    def __init__(self) -> None:
+        """Init without endpoints."""
+        self.endpoints: dict[str, EndpointStatistics] = {}
+
+    def _endpoint(self, path: str) -> EndpointStatistics:
+        if (endpoint := self.endpoints.get(path)) is None:
+            endpoint = self.endpoints[path] = EndpointStatistics()
+        return endpoint
+
+    def record(self, path: str, seconds: float) -> None:
+        """Count a request that was answered."""
+        self._endpoint(path).latency.observe(seconds)
+
+    def record_error(self, path: str, err: BaseException) -> None:
+        """Count a failed request, when it was a failure at all."""
+        if (kind := classify_error(err)) is None:
+            return
+        endpoint = self._endpoint(path)
+        endpoint.errors[kind] += 1
+        if kind == ERROR_HTTP:
+            endpoint.statuses[err.status] += 1
+        endpoint.last_error = f"{type(err).__name__}: {err}"
+        endpoint.last_error_at = datetime.now(UTC).isoformat()
+
+    def get_quantile(self, path: str, share: float) -> float | None:
+        """Get a response time quantile of an endpoint in seconds."""
+        if (endpoint := self.endpoints.get(path)) is None:
+            return None
+        return endpoint.latency.quantile(share)
+
+    def get_error_total(self, kind: str) -> int:
+        """Get the failures of a kind over all endpoints."""
+        return sum(endpoint.errors[kind] for endpoint in self.endpoints.values())
+
+    def get_errors(self, kind: str) -> dict[str, int]:
+        """Get the failures of a kind per endpoint."""
+        return {
+            path: endpoint.errors[kind] for path, endpoint in self.endpoints.items()
+        }
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the statistics of every endpoint."""
+        return {
+            path: endpoint.get_diagnostics()
+            for path, endpoint in self.endpoints.items()
+        }
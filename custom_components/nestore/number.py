@@ -13,7 +13,7 @@ from homeassistant.helpers.device_registry import DeviceEntryType
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 
-from .const import DOMAIN, DEFAULT_LOC_FLAG, MIN_DURATION, MAX_DURATION
+from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,6 +64,8 @@ async def async_setup_entry(
 
 
 class NestoreNumber1(CoordinatorEntity, NumberEntity):
+    _attr_has_entity_name = True
+
     def __init__(
         self,
         coordinator: NestoreCoordinator,
@@ -81,7 +83,7 @@ class NestoreNumber1(CoordinatorEntity, NumberEntity):
 
     @property
     def unique_id(self):
-        return f"nestore_number_{self._attr_name}"
+        return f"{self._coordinator.config_entry.entry_id}_nestore_number_{self._attr_name}"
 
     @property
     def native_value(self):
@@ -101,6 +103,7 @@ class NestoreNumber1(CoordinatorEntity, NumberEntity):
         self._attr_native_value = int(value)
         self._coordinator.set_target_power_level(self._attr_native_value)
         self.async_write_ha_state()
+        self._coordinator.setpoints.async_changed()
         _LOGGER.debug(f"Set target power level to {self._attr_native_value}")
 
     @property
@@ -112,11 +115,13 @@ class NestoreNumber1(CoordinatorEntity, NumberEntity):
             },
             manufacturer="Nestore",
             model="",
-            name="Nestore",
+            name=self._coordinator.config_entry.title,
         )
 
 
 class NestoreNumber2(CoordinatorEntity, NumberEntity):
+    _attr_has_entity_name = True
+
     def __init__(self, coordinator: NestoreCoordinator, input_name: str):
         super().__init__(coordinator)
         self._coordinator = coordinator
@@ -129,7 +134,7 @@ class NestoreNumber2(CoordinatorEntity, NumberEntity):
 
     @property
     def unique_id(self):
-        return f"nestore_number_{self._attr_name}"
+        return f"{self._coordinator.config_entry.entry_id}_nestore_number_{self._attr_name}"
 
     @property
     def native_value(self):
@@ -149,6 +154,7 @@ class NestoreNumber2(CoordinatorEntity, NumberEntity):
         self._attr_native_value = value
         self._coordinator.set_target_soc_level(value)
         self.async_write_ha_state()
+        self._coordinator.setpoints.async_changed()
         # Optionally, update your coordinator data or trigger any other actions
         _LOGGER.debug(f"Set target SoC level to {value}")
 
@@ -161,11 +167,13 @@ class NestoreNumber2(CoordinatorEntity, NumberEntity):
             },
             manufacturer="Nestore",
             model="",
-            name="Nestore",
+            name=self._coordinator.config_entry.title,
         )
 
 
 class NestoreNumber3(CoordinatorEntity, NumberEntity):
+    _attr_has_entity_name = True
+
     def __init__(self, coordinator: NestoreCoordinator, input_name: str):
         super().__init__(coordinator)
         self._coordinator = coordinator
@@ -177,7 +185,7 @@ class NestoreNumber3(CoordinatorEntity, NumberEntity):
 
     @property
     def unique_id(self):
-        return f"nestore_number_{self._attr_name}"
+        return f"{self._coordinator.config_entry.entry_id}_nestore_number_{self._attr_name}"
 
     @property
     def native_value(self):
@@ -198,6 +206,7 @@ class NestoreNumber3(CoordinatorEntity, NumberEntity):
         value_sec = int(value * 3600)
         self._coordinator.set_target_duration(value_sec)
         self.async_write_ha_state()
+        self._coordinator.setpoints.async_changed()
         # Optionally, update your coordinator data or trigger any other actions
         _LOGGER.debug(f"Set target duration level to {value_sec} seconds")
 
@@ -210,5 +219,5 @@ class NestoreNumber3(CoordinatorEntity, NumberEntity):
             },
             manufacturer="Nestore",
             model="",
-            name="Nestore",
+            name=self._coordinator.config_entry.title,
         )
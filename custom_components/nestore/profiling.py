@@ -0,0 +1,87 @@
+"""On-demand profiling of the integration in a running Home Assistant."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import re
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PROFILE_REPORT_LINES
+
+if TYPE_CHECKING:
+    from .coordinator import NestoreCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_LOCK_KEY = f"{DOMAIN}_profile_lock"
+# functions of this package, matched against the pstats file names
+PACKAGE_PATTERN = re.escape(os.path.dirname(__file__))
+
+
+def is_profiling(hass: HomeAssistant) -> bool:
+    """Return whether a profile is being recorded."""
+    lock: asyncio.Lock | None = hass.data.get(PROFILE_LOCK_KEY)
+    return lock is not None and lock.locked()
+
+
+def write_profile(profile: cProfile.Profile, path: str) -> None:
+    """Write the raw stats and a report limited to the integration."""
+    profile.dump_stats(f"{path}.prof")
+    with open(f"{path}.txt", "w", encoding="utf-8") as file:
+        stats = pstats.Stats(profile, stream=file)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(PACKAGE_PATTERN, PROFILE_REPORT_LINES)
+        stats.sort_stats(pstats.SortKey.TIME)
+        stats.print_stats(PACKAGE_PATTERN, PROFILE_REPORT_LINES)
+
+
+async def async_profile(
+    hass: HomeAssistant,
+    coordinator: NestoreCoordinator,
+    seconds: float | None = None,
+    cycles: int | None = None,
+) -> dict[str, Any]:
+    """Profile the event loop for a number of seconds or update cycles.
+
+    For seconds, the regular polling, entity updates and commands are
+    profiled as they happen. For cycles, the coordinator refreshes that
+    many times back to back. Only the event loop thread is profiled; the
+    report lists the functions of the integration and the raw stats
+    hold everything, e.g. for snakeviz.
+    """
+    lock = hass.data.setdefault(PROFILE_LOCK_KEY, asyncio.Lock())
+    async with lock:
+        profile = cProfile.Profile()
+        start = time.monotonic()
+        profile.enable()
+        try:
+            if cycles is None:
+                await asyncio.sleep(seconds)
+            else:
+                for _ in range(cycles):
+                    await coordinator.async_refresh()
+        finally:
+            profile.disable()
+        elapsed = time.monotonic() - start
+
+        path = hass.config.path(
+            f"{DOMAIN}_profile_{coordinator.config_entry.entry_id}_"
+            f"{dt_util.now():%Y%m%d_%H%M%S}"
+        )
+        await hass.async_add_executor_job(write_profile, profile, path)
+
+    _LOGGER.info("Profiled %.1f seconds, written to %s.prof", elapsed, path)
+    return {
+        "profile": f"{path}.prof",
+        "report": f"{path}.txt",
+        "seconds": round(elapsed, 1),
+        "cycles": cycles,
+    }
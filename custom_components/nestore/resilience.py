@@ -0,0 +1,136 @@
+"""Retry and circuit breaker policy for requests to the Nestore device."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request while the device is down."""
+
+
+def backoff_delay(
+    attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY
+) -> float:
+    """Return the delay before a retry, exponential with full jitter."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def is_transient(err: BaseException) -> bool:
+    """Return whether a failed request is worth retrying."""
+    if isinstance(err, CircuitOpenError):
+        return False
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status >= 500
+    return isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Fail fast while the device is down and probe it to recover.
+
+    After failure_threshold consecutive failures the breaker opens and
+    requests are rejected. Once reset_timeout has passed a single probe is
+    let through; its result closes the breaker or opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Init a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            _LOGGER.debug("Circuit half open, probing the device")
+            self.state = STATE_HALF_OPEN
+        if self._probing:
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    @property
+    def is_probing(self) -> bool:
+        """Return whether the request in flight is the recovery probe."""
+        return self._probing
+
+    def record_success(self) -> None:
+        """Close the breaker after a request reached the device."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Nestore device reachable again, closing circuit")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the breaker past the threshold."""
+        self.failures += 1
+        self._probing = False
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED and self.failures >= self.failure_threshold
+        ):
+            if self.state == STATE_CLOSED:
+                _LOGGER.warning(
+                    "Nestore device not reachable after %s failures, "
+                    "pausing requests for %s seconds",
+                    self.failures,
+                    self.reset_timeout,
+                )
+                self.opened += 1
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        """Close the breaker, e.g. after the device address changed."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the breaker state."""
+        retry_in = None
+        if self.state == STATE_OPEN:
+            retry_in = max(
+                0.0, round(self._opened_at + self.reset_timeout - time.monotonic(), 1)
+            )
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "rejected_requests": self.rejected,
+            "probe_in": retry_in,
+        }
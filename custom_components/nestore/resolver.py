@@ -0,0 +1,84 @@
+"""Hostname resolution for the Nestore device."""
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+import socket
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import RESOLVE_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class NestoreResolver:
+    """Resolve the device hostname off the event loop and cache the result."""
+
+    def __init__(self, hass: HomeAssistant, hostname: str, ttl: float = RESOLVE_TTL):
+        """Init the resolver for a hostname or fixed IP address."""
+        self.hass = hass
+        self.hostname = hostname
+        self.ttl = ttl
+        self.address: str | None = None
+        self.latency: float | None = None
+        self.resolutions = 0
+        self.failures = 0
+        self._resolved_at = 0.0
+
+        try:
+            ipaddress.ip_address(hostname)
+        except ValueError:
+            self.is_fixed = False
+        else:
+            self.is_fixed = True
+            self.address = hostname
+
+    async def async_resolve(self, force: bool = False) -> str:
+        """Get the device address, resolving when the cache expired or forced."""
+        if self.is_fixed:
+            return self.address
+        if (
+            not force
+            and self.address is not None
+            and time.monotonic() - self._resolved_at < self.ttl
+        ):
+            return self.address
+
+        start = time.monotonic()
+        try:
+            infos = await self.hass.loop.getaddrinfo(
+                self.hostname, None, family=socket.AF_INET, type=socket.SOCK_STREAM
+            )
+        except (socket.gaierror, OSError) as err:
+            self.latency = time.monotonic() - start
+            self.failures += 1
+            _LOGGER.error("Unable to resolve hostname %s: %s", self.hostname, err)
+            # keep using the last known address, or let aiohttp try the name
+            return self.address or self.hostname
+
+        self.latency = time.monotonic() - start
+        self.resolutions += 1
+        self._resolved_at = time.monotonic()
+
+        address = infos[0][4][0]
+        if address != self.address:
+            _LOGGER.info("The IP address of %s is %s", self.hostname, address)
+        self.address = address
+        return address
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Get the resolver state."""
+        return {
+            "hostname": self.hostname,
+            "address": self.address,
+            "fixed": self.is_fixed,
+            "resolutions": self.resolutions,
+            "failures": self.failures,
+            "age": None
+            if self.is_fixed or not self._resolved_at
+            else round(time.monotonic() - self._resolved_at),
+        }
@@ -3,22 +3,19 @@
 from __future__ import annotations
 
 import logging
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import timedelta
 from typing import Any
 
 from homeassistant.components.sensor import (
-    DOMAIN,
     RestoreSensor,
     SensorDeviceClass,
+    SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-
-from homeassistant.components.number import (
-    NumberDeviceClass,
-)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
@@ -28,25 +25,26 @@ from homeassistant.const import (
     UnitOfEnergy,
     UnitOfVolume,
     UnitOfPressure,
+    UnitOfTime,
+    UnitOfInformation,
+    EntityCategory,
 )
-from homeassistant.core import HassJob, HomeAssistant
-from homeassistant.helpers import event
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import utcnow
-
-from datetime import timedelta
-from homeassistant.helpers.event import async_track_time_interval
 
 from .const import (
     ATTRIBUTION,
-    CONF_ENTITY_NAME,
     DOMAIN,
 )
 
+from .aggregate import NestoreAggregateCoordinator
 from .coordinator import NestoreCoordinator
+from .instrumentation import ERROR_CONNECTION, ERROR_HTTP, ERROR_TIMEOUT
+from .resilience import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from .tracing import CAT_ENTITY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,6 +54,18 @@ class NestoreEntityDescription(SensorEntityDescription):
     """Describes Nestore sensor entity."""
 
     value_fn: Callable[[dict], StateType] = None
+    attr_fn: Callable[[NestoreCoordinator], dict[str, Any]] | None = None
+    # only write a new state when the value leaves the band around the last
+    # written value, or when the sensor was silent for max_silence
+    deadband: float | None = None
+    deadband_pct: float | None = None
+    max_silence: timedelta | None = None
+    # also updated after polls that left the payloads unchanged, for values
+    # that move on without a new snapshot
+    every_cycle: bool = False
+
+
+SENSOR_HEARTBEAT = timedelta(minutes=15)
 
 
 def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
@@ -69,6 +79,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:percent",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_current_soc(),
+            deadband=0.5,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="vessel_soc",
@@ -78,6 +90,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:percent",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_current_soc_total(),
+            deadband=0.5,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="heater_power",
@@ -87,6 +101,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:heating-coil",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_power_heater(),
+            deadband=10,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="vessel_temp_int1",
@@ -96,6 +112,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:temperature-celsius",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_temp_vessel(id=1),
+            deadband=0.1,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="vessel_temp_int2",
@@ -105,6 +123,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:temperature-celsius",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_temp_vessel(id=2),
+            deadband=0.1,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="vessel_temp_int3",
@@ -114,6 +134,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:temperature-celsius",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_temp_vessel(id=3),
+            deadband=0.1,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="vessel_temp_int4",
@@ -123,6 +145,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:temperature-celsius",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_temp_vessel(id=4),
+            deadband=0.1,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="vessel_temp_int5",
@@ -132,6 +156,54 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:temperature-celsius",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_temp_vessel(id=5),
+            deadband=0.1,
+            max_silence=SENSOR_HEARTBEAT,
+        ),
+        NestoreEntityDescription(
+            key="vessel gradient",
+            name="vessel temperature gradient",
+            native_unit_of_measurement=f"{UnitOfTemperature.KELVIN}",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:thermometer-lines",
+            suggested_display_precision=1,
+            value_fn=lambda coordinator: coordinator.get_stratification("gradient"),
+            deadband=0.2,
+            max_silence=SENSOR_HEARTBEAT,
+        ),
+        NestoreEntityDescription(
+            key="thermocline position",
+            name="thermocline position",
+            native_unit_of_measurement=f"{PERCENTAGE}",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:arrow-expand-vertical",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_thermocline_position(),
+            deadband=1,
+            max_silence=SENSOR_HEARTBEAT,
+        ),
+        NestoreEntityDescription(
+            key="mixing index",
+            name="mixing index",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:blender-outline",
+            suggested_display_precision=2,
+            value_fn=lambda coordinator: coordinator.get_stratification("mixing_index"),
+            deadband=0.01,
+            max_silence=SENSOR_HEARTBEAT,
+        ),
+        NestoreEntityDescription(
+            key="usable hot water",
+            name="usable hot water",
+            native_unit_of_measurement=f"{UnitOfVolume.LITERS}",
+            device_class=SensorDeviceClass.VOLUME_STORAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:water-thermometer",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_stratification(
+                "usable_volume"
+            ),
+            deadband=1,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="pressure",
@@ -141,6 +213,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:water",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_current_pressure(),
+            deadband=0.01,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="flow_dwh",
@@ -150,6 +224,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:water",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_flow(),
+            deadband=0.1,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="device_state",
@@ -175,6 +251,8 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             icon="mdi:temperature-celsius",
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_current_energy_dhw(),
+            deadband_pct=0.5,
+            max_silence=SENSOR_HEARTBEAT,
         ),
         NestoreEntityDescription(
             key="total heater energy",
@@ -194,6 +272,234 @@ def sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
             suggested_display_precision=1,
             value_fn=lambda coordinator: coordinator.get_total_dhw(),
         ),
+        NestoreEntityDescription(
+            key="integrated heater energy",
+            name="integrated heater energy",
+            native_unit_of_measurement=f"{UnitOfEnergy.KILO_WATT_HOUR}",
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:heating-coil",
+            suggested_display_precision=2,
+            value_fn=lambda coordinator: coordinator.get_integrated_heater_energy(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="integrated water volume",
+            name="integrated water volume",
+            native_unit_of_measurement=f"{UnitOfVolume.LITERS}",
+            device_class=SensorDeviceClass.WATER,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:water",
+            suggested_display_precision=1,
+            value_fn=lambda coordinator: coordinator.get_integrated_dhw_volume(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="polling interval",
+            name="polling interval",
+            native_unit_of_measurement=f"{UnitOfTime.SECONDS}",
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:timer-sync-outline",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_effective_interval(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="suppressed writes",
+            name="suppressed writes",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:filter-outline",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_suppressed_writes_total(),
+            attr_fn=lambda coordinator: coordinator.get_write_statistics(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="circuit breaker",
+            name="connection circuit",
+            device_class=SensorDeviceClass.ENUM,
+            options=[STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN],
+            entity_category=EntityCategory.DIAGNOSTIC,
+            icon="mdi:electric-switch",
+            value_fn=lambda coordinator: coordinator.get_circuit_state(),
+            attr_fn=lambda coordinator: coordinator.get_resilience_diagnostics(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="request retries",
+            name="request retries",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:restart",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_retry_total(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="data response time",
+            name="data response time",
+            native_unit_of_measurement=f"{UnitOfTime.MILLISECONDS}",
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:timer-outline",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_response_time("DATA"),
+            attr_fn=lambda coordinator: coordinator.get_response_histogram("DATA"),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="control response time",
+            name="control state response time",
+            native_unit_of_measurement=f"{UnitOfTime.MILLISECONDS}",
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:timer-outline",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_response_time("CONTROL"),
+            attr_fn=lambda coordinator: coordinator.get_response_histogram("CONTROL"),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="request timeouts",
+            name="request timeouts",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:timer-alert-outline",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_request_errors(ERROR_TIMEOUT),
+            attr_fn=lambda coordinator: coordinator.get_request_error_diagnostics(
+                ERROR_TIMEOUT
+            ),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="request http errors",
+            name="request HTTP errors",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:alert-circle-outline",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_request_errors(ERROR_HTTP),
+            attr_fn=lambda coordinator: coordinator.get_request_error_diagnostics(
+                ERROR_HTTP
+            ),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="request connection errors",
+            name="request connection errors",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:lan-disconnect",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_request_errors(
+                ERROR_CONNECTION
+            ),
+            attr_fn=lambda coordinator: coordinator.get_request_error_diagnostics(
+                ERROR_CONNECTION
+            ),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="unchanged payloads",
+            name="unchanged payloads",
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:content-duplicate",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_unchanged_payloads(),
+            attr_fn=lambda coordinator: coordinator.get_fingerprint_statistics(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="command confirmation",
+            name="command confirmation time",
+            native_unit_of_measurement=f"{UnitOfTime.SECONDS}",
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:timer-check-outline",
+            suggested_display_precision=1,
+            value_fn=lambda coordinator: coordinator.get_command_latency(),
+            attr_fn=lambda coordinator: coordinator.get_command_diagnostics(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="host resolution",
+            name="host resolution latency",
+            native_unit_of_measurement=f"{UnitOfTime.MILLISECONDS}",
+            device_class=SensorDeviceClass.DURATION,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:dns-outline",
+            suggested_display_precision=1,
+            value_fn=lambda coordinator: coordinator.get_resolve_latency(),
+            attr_fn=lambda coordinator: coordinator.get_resolver_diagnostics(),
+            every_cycle=True,
+        ),
+        NestoreEntityDescription(
+            key="history memory",
+            name="history memory",
+            native_unit_of_measurement=f"{UnitOfInformation.KILOBYTES}",
+            device_class=SensorDeviceClass.DATA_SIZE,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:memory",
+            suggested_display_precision=0,
+            value_fn=lambda coordinator: coordinator.get_history_memory(),
+            attr_fn=lambda coordinator: coordinator.get_history_diagnostics(),
+        ),
+    )
+
+
+def site_sensor_descriptions() -> tuple[NestoreEntityDescription, ...]:
+    """Construct NestoreEntityDescription for the site totals."""
+    return (
+        NestoreEntityDescription(
+            key="site stored energy",
+            name="site stored energy",
+            native_unit_of_measurement=f"{UnitOfEnergy.KILO_WATT_HOUR}",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:home-battery",
+            suggested_display_precision=1,
+            value_fn=lambda aggregate: aggregate.get_site_energy_stored(),
+            attr_fn=lambda aggregate: aggregate.get_site_attributes(),
+        ),
+        NestoreEntityDescription(
+            key="site heater power",
+            name="site heater power",
+            native_unit_of_measurement=f"{UnitOfPower.WATT}",
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:heating-coil",
+            suggested_display_precision=0,
+            value_fn=lambda aggregate: aggregate.get_site_power_heater(),
+        ),
+        NestoreEntityDescription(
+            key="site state of charge",
+            name="site state of charge",
+            native_unit_of_measurement=f"{PERCENTAGE}",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:percent",
+            suggested_display_precision=1,
+            value_fn=lambda aggregate: aggregate.get_site_soc(),
+        ),
+        NestoreEntityDescription(
+            key="site lowest pressure",
+            name="site lowest pressure",
+            native_unit_of_measurement=f"{UnitOfPressure.BAR}",
+            device_class=SensorDeviceClass.PRESSURE,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:gauge",
+            suggested_display_precision=2,
+            value_fn=lambda aggregate: aggregate.get_site_pressure_min(),
+            attr_fn=lambda aggregate: aggregate.get_site_attributes(),
+        ),
     )
 
 
@@ -211,23 +517,29 @@ async def async_setup_entry(
         entity = description
         entities.append(NestoreSensor(nestore_coordinator, entity))
 
-    # Add an entity for each sensor type
-    async_add_entities(entities, True)
+    # Add an entity for each sensor type, state is pushed by the coordinator
+    async_add_entities(entities)
 
-    # ensure updating
-    async def update_entities(event_time):
-        for entity in entities:
-            await entity.async_update_ha_state(True)
+    # site totals over all devices, added by one entry at a time
+    aggregate = nestore_coordinator.fleet.aggregate
 
-    poll_interval = nestore_coordinator.get_polling_interval()
+    @callback
+    def _add_site_entities() -> None:
+        async_add_entities(
+            [
+                NestoreSiteSensor(aggregate, description)
+                for description in site_sensor_descriptions()
+            ]
+        )
 
-    async_track_time_interval(hass, update_entities, poll_interval)
+    aggregate.async_offer(config_entry.entry_id, _add_site_entities)
 
 
 class NestoreSensor(CoordinatorEntity, RestoreSensor):
     """Representation of a Nestore sensor."""
 
     _attr_attribution = ATTRIBUTION
+    _attr_has_entity_name = True
 
     def __init__(
         self,
@@ -239,15 +551,13 @@ class NestoreSensor(CoordinatorEntity, RestoreSensor):
         self.description = description
         self.last_update_success = True
 
+        # unique id in .storage file for ui configuration, per device
+        entry_id = coordinator.config_entry.entry_id
         if name not in (None, ""):
-            # The Id used for addressing the entity in the ui, recorder history etc.
-            self.entity_id = f"{DOMAIN}.{name}_{description.name}"
-            # unique id in .storage file for ui configuration.
-            self._attr_unique_id = f"nestore.{name}_{description.key}"
+            self._attr_unique_id = f"{entry_id}_nestore.{name}_{description.key}"
             self._attr_name = f"{description.name} ({name})"
         else:
-            self.entity_id = f"{DOMAIN}.nestore_{description.name}"
-            self._attr_unique_id = f"nestore.{description.key}"
+            self._attr_unique_id = f"{entry_id}_nestore.{description.key}"
             self._attr_name = f"{description.name}"
 
         self.entity_description: NestoreEntityDescription = description
@@ -269,28 +579,98 @@ class NestoreSensor(CoordinatorEntity, RestoreSensor):
             },
             manufacturer="nestore",
             model="",
-            name="Nestore",
+            name=coordinator.config_entry.title,
         )
 
-        self._update_job = HassJob(self.async_schedule_update_ha_state)
-        self._unsub_update = None
+        # deadband state, last value and time a state was written
+        self._last_written_value: Any = None
+        self._last_written_available: bool | None = None
+        self._last_write = 0.0
 
         super().__init__(coordinator)
 
-    async def async_update(self) -> None:
-        """Get the latest data and updates the states."""
-        _LOGGER.debug(f"update function for '{self.entity_id} called.'")
+    async def async_added_to_hass(self) -> None:
+        """Take the current coordinator data when added."""
+        await super().async_added_to_hass()
+        self._update_from_coordinator()
+        description = self.entity_description
+        if description.every_cycle or description.max_silence is not None:
+            self.async_on_remove(
+                self.coordinator.async_add_unchanged_listener(
+                    self._handle_unchanged_cycle
+                )
+            )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle a new snapshot pushed by the coordinator."""
+        key = self.entity_description.key
+        with self.coordinator.tracer.span(key, CAT_ENTITY) as span:
+            self._update_from_coordinator()
+            if not self._should_write():
+                self.coordinator.record_state_write(key, False)
+                span.set(written=False)
+                return
+            self.coordinator.record_state_write(key, True)
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_unchanged_cycle(self) -> None:
+        """Handle a poll that left the snapshot unchanged."""
+        if self.entity_description.every_cycle:
+            self._handle_coordinator_update()
+        elif self._heartbeat_due():
+            self.coordinator.record_state_write(self.entity_description.key, True)
+            self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember it as the deadband reference."""
+        self._last_written_value = self._attr_native_value
+        self._last_written_available = self.available
+        self._last_write = time.monotonic()
+        super().async_write_ha_state()
+
+    def _should_write(self) -> bool:
+        """Check if the new value falls outside the deadband or heartbeat."""
+        description = self.entity_description
+        if description.deadband is None and description.deadband_pct is None:
+            return True
+
+        value = self._attr_native_value
+        last = self._last_written_value
+        if self.available != self._last_written_available:
+            return True
+        if not isinstance(value, (int, float)) or not isinstance(last, (int, float)):
+            return value != last
+        if self._heartbeat_due():
+            return True
+
+        band = description.deadband or 0.0
+        if description.deadband_pct is not None:
+            band = max(band, abs(last) * description.deadband_pct / 100)
+        return abs(value - last) > band
+
+    def _heartbeat_due(self) -> bool:
+        """Check if the sensor was silent for longer than max_silence."""
+        max_silence = self.entity_description.max_silence
+        return (
+            max_silence is not None
+            and time.monotonic() - self._last_write >= max_silence.total_seconds()
+        )
 
+    def _update_from_coordinator(self) -> None:
+        """Get the latest data from the coordinator."""
         value: Any = None
         try:
-            # _LOGGER.debug(f"current coordinator.data value: {self.coordinator.data}")
             value = self.entity_description.value_fn(self.coordinator)
 
             self._attr_native_value = value
+            if self.entity_description.attr_fn is not None:
+                self._attr_extra_state_attributes = self.entity_description.attr_fn(
+                    self.coordinator
+                )
             self.last_update_success = True
-            # _LOGGER.debug(f"updated '{self.entity_id}' to value: {value}")
-            # force updae
-            # self.async_write_ha_state()
         except Exception as exc:
             # No data available
             self.last_update_success = False
@@ -303,6 +683,45 @@ class NestoreSensor(CoordinatorEntity, RestoreSensor):
         """Return if entity is available."""
         return self.last_update_success
 
+
+class NestoreSiteSensor(CoordinatorEntity, SensorEntity):
+    """Total over all Nestore devices of the site."""
+
+    _attr_attribution = ATTRIBUTION
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        aggregate: NestoreAggregateCoordinator,
+        description: NestoreEntityDescription,
+    ) -> None:
+        """Initialize the site sensor."""
+        super().__init__(aggregate)
+        self.entity_description: NestoreEntityDescription = description
+        self._attr_unique_id = f"{DOMAIN}_site.{description.key}"
+        self._attr_name = f"{description.name}"
+        self._attr_icon = description.icon
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, "site")},
+            manufacturer="nestore",
+            model="",
+            name="Nestore site",
+        )
+
     @property
-    def native_value(self):
+    def available(self) -> bool:
+        """Return if any device reported a snapshot."""
+        return self.coordinator.data is not None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the site total."""
         return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the attributes of the site total."""
+        if self.entity_description.attr_fn is None or self.coordinator.data is None:
+            return None
+        return self.entity_description.attr_fn(self.coordinator)
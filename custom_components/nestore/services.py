@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import date, datetime
+from datetime import datetime
 from functools import partial
 from typing import Final
 
@@ -20,16 +20,22 @@ from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import selector
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import DOMAIN, PROFILE_DEFAULT_SECONDS
 from .coordinator import NestoreCoordinator
+from .profiling import async_profile, is_profiling
 
 _LOGGER = logging.getLogger(__name__)
 
 ATTR_CONFIG_ENTRY: Final = "config_entry"
 ATTR_START: Final = "start"
 ATTR_END: Final = "end"
+ATTR_STRATIFICATION: Final = "stratification"
+ATTR_SECONDS: Final = "seconds"
+ATTR_CYCLES: Final = "cycles"
 
 ENERGY_SERVICE_NAME: Final = "get_nestore_values"
+TRACE_SERVICE_NAME: Final = "export_trace"
+PROFILE_SERVICE_NAME: Final = "profile"
 
 SERVICE_SCHEMA: Final = vol.Schema(
     {
@@ -40,6 +46,33 @@ SERVICE_SCHEMA: Final = vol.Schema(
         ),
         vol.Optional(ATTR_START): str,
         vol.Optional(ATTR_END): str,
+        vol.Optional(ATTR_STRATIFICATION, default=False): bool,
+    }
+)
+
+TRACE_SERVICE_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY): selector.ConfigEntrySelector(
+            {
+                "integration": DOMAIN,
+            }
+        ),
+    }
+)
+
+PROFILE_SERVICE_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY): selector.ConfigEntrySelector(
+            {
+                "integration": DOMAIN,
+            }
+        ),
+        vol.Exclusive(ATTR_SECONDS, "window"): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Exclusive(ATTR_CYCLES, "window"): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
     }
 )
 
@@ -70,6 +103,22 @@ def __get_coordinator(hass: HomeAssistant, call: ServiceCall) -> NestoreCoordina
     return coordinator
 
 
+def __get_datetime(call: ServiceCall, key: str) -> datetime | None:
+    """Parse an optional date and time field of the call."""
+    if (value := call.data.get(key)) is None:
+        return None
+    if (parsed := dt_util.parse_datetime(value)) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="invalid_datetime",
+            translation_placeholders={
+                "field": key,
+                "value": value,
+            },
+        )
+    return parsed
+
+
 async def __get_values(
     call: ServiceCall,
     *,
@@ -77,12 +126,52 @@ async def __get_values(
 ) -> ServiceResponse:
     coordinator = __get_coordinator(hass, call)
 
-    # TODO define get values
-    data = await coordinator.get_values()
+    start = __get_datetime(call, ATTR_START)
+    end = __get_datetime(call, ATTR_END)
+    data = await coordinator.async_get_values(
+        start, end, stratification=call.data[ATTR_STRATIFICATION]
+    )
 
     return data
 
 
+async def __export_trace(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    coordinator = __get_coordinator(hass, call)
+
+    if not coordinator.tracer.enabled:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="tracing_disabled",
+            translation_placeholders={
+                "config_entry": coordinator.config_entry.title,
+            },
+        )
+    return await coordinator.async_export_trace()
+
+
+async def __profile(
+    call: ServiceCall,
+    *,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    coordinator = __get_coordinator(hass, call)
+
+    if is_profiling(hass):
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="profile_running",
+        )
+    cycles = call.data.get(ATTR_CYCLES)
+    seconds = call.data.get(ATTR_SECONDS)
+    if cycles is None and seconds is None:
+        seconds = PROFILE_DEFAULT_SECONDS
+    return await async_profile(hass, coordinator, seconds=seconds, cycles=cycles)
+
+
 @callback
 def async_setup_services(hass: HomeAssistant) -> None:
     """Set up Nestore services."""
@@ -94,3 +183,19 @@ def async_setup_services(hass: HomeAssistant) -> None:
         schema=SERVICE_SCHEMA,
         supports_response=SupportsResponse.ONLY,
     )
+
+    hass.services.async_register(
+        DOMAIN,
+        TRACE_SERVICE_NAME,
+        partial(__export_trace, hass=hass),
+        schema=TRACE_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        PROFILE_SERVICE_NAME,
+        partial(__profile, hass=hass),
+        schema=PROFILE_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,181 @@
+"""Compact snapshots of the Nestore API payloads."""
+
+from __future__ import annotations
+
+import time
+from array import array
+from collections.abc import Iterable
+from typing import Any
+
+from .const import DEFAULT_LOC_CONTROLLER, DEFAULT_LOC_DATA
+
+VESSEL_ZONES = 5
+
+# snapshot attribute -> (payload section, key) of the engineering payload
+SNAPSHOT_FIELDS: dict[str, tuple[str, str]] = {
+    "soc": ("DERIVED", "SOC_VES"),
+    "soc_total": ("DERIVED", "SOC_VES_TOTAL"),
+    "flow_dhw": ("DERIVED", "FLOW_DHW"),
+    "power_heater": ("DERIVED", "POWER_HEATER"),
+    "energy_stored": ("DERIVED", "TE"),
+    "temp_heater_out": ("BASE", "TEMP_HTR_OUT"),
+    "pressure": ("BASE", "PRES_SYS"),
+    "energy_dhw_total": ("COUNTERS", "ENERGY_DHW_THERMAL_THEORETICAL"),
+    "energy_electrical_total": ("COUNTERS", "ENERGY_CRG_ELECTRICAL"),
+    "volume_dhw_total": ("COUNTERS", "VOL_DHW_THEORETICAL"),
+}
+
+# vessel zone temperatures, stored together in one array
+VESSEL_ZONE_FIELDS: tuple[tuple[str, str], ...] = tuple(
+    ("BASE", f"TEMP_VES_INT_{zone}") for zone in range(1, VESSEL_ZONES + 1)
+)
+
+# numeric columns of a snapshot, in the order of NestoreSnapshot.as_row
+SNAPSHOT_COLUMNS: tuple[str, ...] = (
+    *SNAPSHOT_FIELDS,
+    *(f"temp_vessel_{zone}" for zone in range(1, VESSEL_ZONES + 1)),
+)
+
+# payload paths each endpoint's snapshot reads, everything else is skipped
+ENDPOINT_FIELDS: dict[str, tuple[tuple[str, ...], ...]] = {
+    DEFAULT_LOC_DATA: (*SNAPSHOT_FIELDS.values(), *VESSEL_ZONE_FIELDS),
+    DEFAULT_LOC_CONTROLLER: (("NAME",),),
+}
+
+
+def select_fields(
+    data: dict[str, Any], paths: Iterable[tuple[str, ...]]
+) -> dict[str, Any]:
+    """Keep only the given paths below PAYLOAD of a decoded payload."""
+    payload = data["PAYLOAD"]
+    selected: dict[str, Any] = {}
+    for path in paths:
+        source = payload
+        target = selected
+        for key in path[:-1]:
+            source = source[key]
+            target = target.setdefault(key, {})
+        target[path[-1]] = source[path[-1]]
+    return {"PAYLOAD": selected}
+
+
+class _Immutable:
+    """Block attribute assignment after construction."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class NestoreSnapshot(_Immutable):
+    """Engineering data of one poll, holding only the fields in use."""
+
+    __slots__ = ("received", "temp_vessel", *SNAPSHOT_FIELDS)
+
+    received: float
+    temp_vessel: memoryview
+    soc: float
+    soc_total: float
+    flow_dhw: float
+    power_heater: float
+    energy_stored: float
+    temp_heater_out: float
+    pressure: float
+    energy_dhw_total: float
+    energy_electrical_total: float
+    volume_dhw_total: float
+
+    def __init__(
+        self, received: float, temp_vessel: Iterable[float], **fields: float
+    ) -> None:
+        """Initialize the snapshot from already extracted values."""
+        init = object.__setattr__
+        init(self, "received", received)
+        init(self, "temp_vessel", memoryview(array("d", temp_vessel)).toreadonly())
+        for name in SNAPSHOT_FIELDS:
+            init(self, name, float(fields[name]))
+
+    @classmethod
+    def from_payload(
+        cls, data: dict[str, Any], received: float | None = None
+    ) -> NestoreSnapshot:
+        """Create a snapshot from a decoded engineering payload."""
+        payload = data["PAYLOAD"]
+        return cls(
+            time.time() if received is None else received,
+            (payload[section][key] for section, key in VESSEL_ZONE_FIELDS),
+            **{
+                name: payload[section][key]
+                for name, (section, key) in SNAPSHOT_FIELDS.items()
+            },
+        )
+
+    def as_row(self) -> tuple[float, ...]:
+        """Return the numeric values in SNAPSHOT_COLUMNS order."""
+        return (*(getattr(self, name) for name in SNAPSHOT_FIELDS), *self.temp_vessel)
+
+    def _values(self) -> tuple:
+        """Return the measured values, without the receive time."""
+        return (
+            self.temp_vessel.tobytes(),
+            *(getattr(self, name) for name in SNAPSHOT_FIELDS),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the measured values of two snapshots."""
+        if not isinstance(other, NestoreSnapshot):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        """Hash the measured values."""
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        """Return the representation of the snapshot."""
+        fields = ", ".join(f"{name}={getattr(self, name)}" for name in SNAPSHOT_FIELDS)
+        return (
+            f"NestoreSnapshot(received={self.received}, "
+            f"temp_vessel={self.temp_vessel.tolist()}, {fields})"
+        )
+
+
+class NestoreControlState(_Immutable):
+    """Control state of the device at one poll."""
+
+    __slots__ = ("received", "name")
+
+    received: float
+    name: str
+
+    def __init__(self, received: float, name: str) -> None:
+        """Initialize the control state."""
+        object.__setattr__(self, "received", received)
+        object.__setattr__(self, "name", name)
+
+    @classmethod
+    def from_payload(
+        cls, data: dict[str, Any], received: float | None = None
+    ) -> NestoreControlState:
+        """Create a control state from a decoded control_state payload."""
+        return cls(
+            time.time() if received is None else received, data["PAYLOAD"]["NAME"]
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the control state names."""
+        if not isinstance(other, NestoreControlState):
+            return NotImplemented
+        return self.name == other.name
+
+    def __hash__(self) -> int:
+        """Hash the control state name."""
+        return hash(self.name)
+
+    def __repr__(self) -> str:
+        """Return the representation of the control state."""
+        return f"NestoreControlState(received={self.received}, name={self.name!r})"
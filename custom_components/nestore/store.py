@@ -0,0 +1,327 @@
+"""Persistent history of Nestore snapshots in fixed-size record files."""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .const import STORE_RAW_MONTHS
+from .snapshot import SNAPSHOT_COLUMNS
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"NSTR"
+VERSION = 2
+HEADER = struct.Struct("<4sHHI4x")
+
+RAW_SUFFIX = ".bin"
+HOURLY_SUFFIX = ".hourly.bin"
+TMP_SUFFIX = ".tmp"
+
+
+def _month_key(timestamp: float) -> int:
+    """Return the UTC year and month of a timestamp as YYYYMM."""
+    moment = datetime.fromtimestamp(timestamp, UTC)
+    return moment.year * 100 + moment.month
+
+
+def _months_before(key: int, months: int) -> int:
+    """Return the YYYYMM key the given number of months before key."""
+    index = (key // 100) * 12 + key % 100 - 1 - months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def _upgrade_segment(path: Path, record: struct.Struct) -> None:
+    """Rewrite a version 1 segment, which stored the columns as float32."""
+    with path.open("rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version, columns, record_size = HEADER.unpack(header)
+        old = struct.Struct("<d" + "f" * columns)
+        if (magic, version, record_size) != (MAGIC, 1, old.size):
+            return
+        if record.size != struct.calcsize("<d" + "d" * columns):
+            return
+        body = file.read()
+
+    tmp = path.with_name(path.name + TMP_SUFFIX)
+    with tmp.open("wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, columns, record.size))
+        body = body[: len(body) - len(body) % old.size]
+        file.write(b"".join(record.pack(*row) for row in old.iter_unpack(body)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp, path)
+    _LOGGER.info("Upgraded history segment %s", path)
+
+
+class _Segment:
+    """One month of records, raw or downsampled to hourly means."""
+
+    def __init__(self, path: Path, record: struct.Struct) -> None:
+        """Open the segment, repairing a partial write at the end."""
+        self.path = path
+        self.record = record
+        self.first: float | None = None
+        self.last: float | None = None
+
+        size = path.stat().st_size if path.exists() else 0
+        if size < HEADER.size:
+            # a new segment, or a crash while creating the file
+            self._write_header()
+            size = HEADER.size
+        else:
+            with path.open("rb") as file:
+                magic, version, columns, record_size = HEADER.unpack(
+                    file.read(HEADER.size)
+                )
+            if (magic, version, record_size) != (MAGIC, VERSION, record.size):
+                raise ValueError(f"Incompatible history segment {path}")
+
+        # drop a record that was only partly written before a crash
+        extra = (size - HEADER.size) % record.size
+        if extra:
+            _LOGGER.warning("Truncating partial record at the end of %s", path)
+            os.truncate(path, size - extra)
+            size -= extra
+
+        self.count = (size - HEADER.size) // record.size
+        if self.count:
+            with path.open("rb") as file:
+                self.first = self._read_time(file, 0)
+                self.last = self._read_time(file, self.count - 1)
+
+    def _write_header(self) -> None:
+        """Start the file with the format header."""
+        with self.path.open("wb") as file:
+            file.write(
+                HEADER.pack(
+                    MAGIC, VERSION, (self.record.size - 8) // 8, self.record.size
+                )
+            )
+
+    def _read_time(self, file, index: int) -> float:
+        """Read the timestamp of a record."""
+        file.seek(HEADER.size + index * self.record.size)
+        return struct.unpack("<d", file.read(8))[0]
+
+    def append(self, rows: list[tuple[float, ...]]) -> None:
+        """Append records to the end of the segment."""
+        with self.path.open("ab") as file:
+            file.write(b"".join(self.record.pack(*row) for row in rows))
+        if self.first is None:
+            self.first = rows[0][0]
+        self.last = rows[-1][0]
+        self.count += len(rows)
+
+    def _bisect(self, view: mmap.mmap, timestamp: float, right: bool) -> int:
+        """Binary search the time field of the records."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * self.record.size
+            value = struct.unpack_from("<d", view, offset)[0]
+            if value < timestamp or (right and value == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def rows(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[tuple[float, ...]]:
+        """Read the records between start and end through a memory map."""
+        if not self.count:
+            return
+        with (
+            self.path.open("rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view,
+        ):
+            lo = 0 if start is None else self._bisect(view, start, right=False)
+            hi = self.count if end is None else self._bisect(view, end, right=True)
+            if lo >= hi:
+                return
+            first = HEADER.size + lo * self.record.size
+            last = HEADER.size + hi * self.record.size
+            yield from self.record.iter_unpack(view[first:last])
+
+    def records(
+        self, dtype: np.dtype, start: float | None = None, end: float | None = None
+    ) -> np.ndarray:
+        """Read the records between start and end as a structured array."""
+        import numpy as np
+
+        if not self.count:
+            return np.empty(0, dtype)
+        with (
+            self.path.open("rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view,
+        ):
+            records = np.frombuffer(view, dtype, self.count, HEADER.size)
+            times = records["timestamp"]
+            lo = 0 if start is None else times.searchsorted(start, "left")
+            hi = self.count if end is None else times.searchsorted(end, "right")
+            selected = records[lo:hi].copy()
+            # the map cannot be closed while arrays still point into it
+            del records, times
+        return selected
+
+
+class NestoreStore:
+    """Append-only history on disk with one segment file per month.
+
+    Segments older than STORE_RAW_MONTHS are downsampled to hourly means.
+    All methods block and are run in the executor.
+    """
+
+    def __init__(self, path: str, columns: tuple[str, ...] = SNAPSHOT_COLUMNS) -> None:
+        """Init the store in the given directory."""
+        self.path = Path(path)
+        self.columns = columns
+        self.record = struct.Struct("<d" + "d" * len(columns))
+        self._segments: dict[tuple[int, bool], _Segment] = {}
+        self._lock = threading.RLock()
+
+    @cached_property
+    def dtype(self) -> np.dtype:
+        """Return the numpy layout of a record."""
+        import numpy as np
+
+        return np.dtype(
+            [("timestamp", "<f8"), *((name, "<f8") for name in self.columns)]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of all segments on disk."""
+        return sum(
+            HEADER.size + segment.count * self.record.size
+            for segment in self._segments.values()
+        )
+
+    def open(self) -> None:
+        """Load the segment index and finish interrupted maintenance."""
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for tmp in self.path.glob(f"*{TMP_SUFFIX}"):
+                tmp.unlink()
+
+            for file in sorted(self.path.glob(f"*{RAW_SUFFIX}")):
+                hourly = file.name.endswith(HOURLY_SUFFIX)
+                try:
+                    key = int(file.name.split(".", 1)[0])
+                    _upgrade_segment(file, self.record)
+                    self._segments[(key, hourly)] = _Segment(file, self.record)
+                except ValueError as err:
+                    _LOGGER.warning("Skipping history file %s: %s", file, err)
+
+            # a crash between writing the hourly file and removing the raw one
+            for key, hourly in list(self._segments):
+                if not hourly and (key, True) in self._segments:
+                    self._segments.pop((key, False)).path.unlink()
+
+            self.downsample(_months_before(_month_key(time.time()), STORE_RAW_MONTHS))
+
+    def close(self) -> None:
+        """Forget the open segments."""
+        with self._lock:
+            self._segments.clear()
+
+    def append(self, timestamp: float, row: tuple[float, ...]) -> None:
+        """Append a snapshot row, rolling over to a new segment each month."""
+        key = _month_key(timestamp)
+        with self._lock:
+            segment = self._segments.get((key, False))
+            if segment is None:
+                segment = _Segment(self.path / f"{key}{RAW_SUFFIX}", self.record)
+                self._segments[(key, False)] = segment
+                rolled_over = True
+            else:
+                rolled_over = False
+
+            if segment.last is not None and timestamp <= segment.last:
+                return
+            segment.append([(timestamp, *row)])
+
+        if rolled_over:
+            self.downsample(_months_before(key, STORE_RAW_MONTHS))
+
+    def downsample(self, before: int) -> None:
+        """Replace raw segments older than the given month with hourly means."""
+        with self._lock:
+            old = sorted(
+                key for key, hourly in self._segments if not hourly and key < before
+            )
+            for key in old:
+                raw = self._segments[(key, False)]
+                target = self.path / f"{key}{HOURLY_SUFFIX}"
+                tmp = target.with_name(target.name + TMP_SUFFIX)
+
+                with tmp.open("wb") as file:
+                    file.write(
+                        HEADER.pack(MAGIC, VERSION, len(self.columns), self.record.size)
+                    )
+                    file.write(
+                        b"".join(
+                            self.record.pack(*row) for row in self._hourly(raw.rows())
+                        )
+                    )
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp, target)
+
+                self._segments[(key, True)] = _Segment(target, self.record)
+                del self._segments[(key, False)]
+                raw.path.unlink()
+                _LOGGER.debug("Downsampled history segment %s", key)
+
+    def _hourly(self, rows: Iterator[tuple[float, ...]]) -> Iterator[tuple[float, ...]]:
+        """Average rows per hour, stamped at the middle of the hour."""
+        hour = None
+        sums: list[float] = []
+        count = 0
+        for timestamp, *values in rows:
+            bucket = int(timestamp // 3600)
+            if bucket != hour:
+                if count:
+                    yield (hour * 3600 + 1800.0, *(total / count for total in sums))
+                hour, sums, count = bucket, [0.0] * len(values), 0
+            sums = [total + value for total, value in zip(sums, values, strict=True)]
+            count += 1
+        if count:
+            yield (hour * 3600 + 1800.0, *(total / count for total in sums))
+
+    def query(
+        self, start: float | None = None, end: float | None = None
+    ) -> dict[str, np.ndarray]:
+        """Get the stored columns with start <= time <= end."""
+        import numpy as np
+
+        with self._lock:
+            segments = sorted(
+                (
+                    segment
+                    for segment in self._segments.values()
+                    if segment.count
+                    and (start is None or segment.last >= start)
+                    and (end is None or segment.first <= end)
+                ),
+                key=lambda segment: segment.first,
+            )
+            records = [segment.records(self.dtype, start, end) for segment in segments]
+
+        records = np.concatenate(records) if records else np.empty(0, self.dtype)
+        return {name: records[name] for name in self.dtype.names}
@@ -1,6 +1,5 @@
 # custom_components/my_custom_integration/switch.py
 import logging
-import asyncio
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -10,19 +9,41 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.device_registry import DeviceEntryType
 
 
+from .commands import (
+    OUTCOME_CONFIRMED,
+    OUTCOME_FAILED,
+    OUTCOME_POSTED,
+    OUTCOME_TIMEOUT,
+    NestoreCommand,
+    expect_state,
+)
 from .coordinator import NestoreCoordinator
-from .api_client import NestoreClient
 
 from .const import (
     DOMAIN,
-    MIN_POWER_LEVEL,
-    MIN_DURATION,
-    UPDATE_DELAY,
+    STATE_CHARGING,
+    TASK_CHARGE_START,
+    TASK_CHARGE_STOP,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _command_state(command: NestoreCommand) -> bool | None:
+    """Return whether the switch of a settled command is on, None if unknown.
+
+    A spinning task turns its switch on. A confirmed or posted command took
+    effect, a failed or unconfirmed one left the switch as it was, and a
+    superseded one is settled by the command that replaced it.
+    """
+    requested = bool(command.settings.get("spin"))
+    if command.outcome in (OUTCOME_CONFIRMED, OUTCOME_POSTED):
+        return requested
+    if command.outcome in (OUTCOME_FAILED, OUTCOME_TIMEOUT):
+        return not requested
+    return None
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
@@ -43,6 +64,8 @@ async def async_setup_entry(
 
 
 class NestoreSwitchEntity1(SwitchEntity):
+    _attr_has_entity_name = True
+
     def __init__(
         self,
         coordinator: NestoreCoordinator,
@@ -58,7 +81,7 @@ class NestoreSwitchEntity1(SwitchEntity):
         self._data = None
         self._type = input_type
         self._settings = {}
-        self._settings["task"] = "ControlTask_ChargingElectrical_Start"
+        self._settings["task"] = TASK_CHARGE_START
 
     @property
     def name(self):
@@ -66,7 +89,7 @@ class NestoreSwitchEntity1(SwitchEntity):
 
     @property
     def unique_id(self):
-        return f"nestore_switch_{self._name}"
+        return f"{self._coordinator.config_entry.entry_id}_nestore_switch_{self._name}"
 
     @property
     def is_on(self):
@@ -76,36 +99,22 @@ class NestoreSwitchEntity1(SwitchEntity):
         _LOGGER.debug(f"SWITCH {self._name} turning ON")
 
         # get settings and store locally
-        self._settings["power_level"] = self._coordinator.get_target_power_level()
-        self._settings["soc_level"] = self._coordinator.get_target_soc_level()
-        self._settings["duration"] = self._coordinator.get_target_duration()
-        self._settings["spin"] = True
+        self._settings = self._coordinator.build_charge_settings()
 
-        if (
-            self._settings["power_level"] >= MIN_POWER_LEVEL
-            and self._settings["soc_level"] > self._coordinator.get_current_soc()
-            and self._settings["duration"] > MIN_DURATION
-        ):
+        if self._coordinator.is_valid_charge(self._settings):
             _LOGGER.debug(f"Settings set to {self._settings}")
-            try:
-                await self._coordinator.async_post_state(self._settings)
-                self._state = True
-                self._coordinator.set_operation_mode("MANUAL_HEATER")
-            except Exception as e:
-                _LOGGER.error(f"Error posting state to coordinator: {e}")
+            # posted and confirmed in the background, the call returns at once
+            self._coordinator.async_submit_command(
+                self._settings,
+                expect_state(STATE_CHARGING),
+                self._async_command_done,
+            )
+            self._state = True
+            self._coordinator.set_operation_mode("MANUAL_HEATER")
         else:
             _LOGGER.debug(f"Power level set too low")
 
-        self.schedule_update_ha_state()
-
-        # Introduce a delay before updating the state
-        _LOGGER.debug("Waiting %s seconds before refreshing coordinator", UPDATE_DELAY)
-        await asyncio.sleep(UPDATE_DELAY)
-
-        # force update of integration
-        await self._coordinator.async_request_refresh()
-        # update all switches in entity
-        await self._update_all_switches()
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """turn off heater via spin down"""
@@ -116,33 +125,47 @@ class NestoreSwitchEntity1(SwitchEntity):
             _LOGGER.debug(f"Heater still on, so disabling heater")
             # removing previous task by spinning down, this will stop the heater
             self._settings["spin"] = False
-            try:
-                await self._coordinator.async_post_state(self._settings)
-                self._coordinator.set_operation_mode("AUTO")
-                self._state = False
-            except Exception as e:
-                _LOGGER.error(f"Error posting state to coordinator: {e}")
+            self._coordinator.async_submit_command(
+                self._settings,
+                expect_state(STATE_CHARGING, present=False),
+                self._async_command_done,
+            )
+            self._coordinator.set_operation_mode("AUTO")
+            self._state = False
         else:
             _LOGGER.debug(f"Power already off, no action needed, return to AUTO mode")
             self._coordinator.set_operation_mode("AUTO")
             self._state = False
 
-        self.schedule_update_ha_state()
-
-        # Introduce a delay before updating the state
-        _LOGGER.debug("Waiting %s seconds before refreshing coordinator", UPDATE_DELAY)
-        await asyncio.sleep(UPDATE_DELAY)
-
-        # force update of integration
-        await self._coordinator.async_request_refresh()
+        self.async_write_ha_state()
+
+    async def _async_command_done(self, command: NestoreCommand) -> None:
+        """Set the switch and operation mode from the outcome of a command."""
+        _LOGGER.debug("Command %s %s", command.settings["task"], command.outcome)
+        if command.outcome == OUTCOME_FAILED:
+            _LOGGER.error("Error posting %s to Nestore", command.settings["task"])
+        # the data snapshot may lag behind the device, so trust the outcome
+        if (state := _command_state(command)) is not None:
+            self._state = state
+            self._coordinator.set_operation_mode("MANUAL_HEATER" if state else "AUTO")
+        self.async_write_ha_state()
         if self._type > 0:
-            await self._update_all_switches()
-
-    async def _update_all_switches(self):
-        for entity in self.hass.data[DOMAIN]:
-            if isinstance(entity, NestoreSwitchEntity1):
-                await entity.async_update()
-                entity.async_schedule_update_ha_state()
+            self._update_all_switches()
+
+    @callback
+    def _update_all_switches(self) -> None:
+        """Sync the other switches of this entry with the operation mode."""
+        for entity in self.platform.entities.values():
+            if entity is not self and isinstance(
+                entity, (NestoreSwitchEntity1, NestoreSwitchEntity2)
+            ):
+                entity.sync_operation_mode()
+
+    @callback
+    def sync_operation_mode(self) -> None:
+        """Show the switch on while the operation mode is MANUAL_HEATER."""
+        self._state = self._coordinator.get_operation_mode() == "MANUAL_HEATER"
+        self.async_write_ha_state()
 
     async def async_update(self):
         # Fetch data from the coordinator
@@ -159,9 +182,9 @@ class NestoreSwitchEntity1(SwitchEntity):
             self._state = False
             self._coordinator.set_operation_mode("AUTO")
             # force update of integration
-            await self.async_write_ha_state()
+            self.async_write_ha_state()
             await self._coordinator.async_request_refresh()
-            await self._update_all_switches()
+            self._update_all_switches()
 
     @property
     def should_poll(self) -> bool:
@@ -176,11 +199,13 @@ class NestoreSwitchEntity1(SwitchEntity):
             },
             manufacturer="Nestore",
             model="",
-            name="Nestore",
+            name=self._coordinator.config_entry.title,
         )
 
 
 class NestoreSwitchEntity2(SwitchEntity):
+    _attr_has_entity_name = True
+
     def __init__(
         self,
         coordinator: NestoreCoordinator,
@@ -196,7 +221,7 @@ class NestoreSwitchEntity2(SwitchEntity):
         self._data = None
         self._type = input_type
         self._settings = {}
-        self._settings["task"] = "ControlTask_ChargingElectrical_Stop"
+        self._settings["task"] = TASK_CHARGE_STOP
         self._settings["spin"] = True
 
     @property
@@ -205,7 +230,7 @@ class NestoreSwitchEntity2(SwitchEntity):
 
     @property
     def unique_id(self):
-        return f"nestore_switch_{self._name}"
+        return f"{self._coordinator.config_entry.entry_id}_nestore_switch_{self._name}"
 
     @property
     def is_on(self):
@@ -219,55 +244,60 @@ class NestoreSwitchEntity2(SwitchEntity):
         if mode == "Charging Electrical Main":
             _LOGGER.debug(f"Current operation mode is {mode}")
             self._settings["duration"] = self._coordinator.get_target_duration()
-            try:
-                await self._coordinator.async_post_state(self._settings)
-                self._state = True
-                self._coordinator.set_operation_mode("MANUAL_STOP")
-            except Exception as e:
-                _LOGGER.error(f"Error posting state to coordinator: {e}")
+            self._coordinator.async_submit_command(
+                self._settings,
+                expect_state(STATE_CHARGING, present=False),
+                self._async_command_done,
+            )
+            self._state = True
+            self._coordinator.set_operation_mode("MANUAL_STOP")
         else:
             _LOGGER.debug(f"Power level set too low")
 
-        self.schedule_update_ha_state()
-
-        # Introduce a delay before updating the state
-        _LOGGER.debug("Waiting %s seconds before refreshing coordinator", UPDATE_DELAY)
-        await asyncio.sleep(UPDATE_DELAY)
-
-        # force update of integration
-        await self._coordinator.async_request_refresh()
-        # update all switches in entity
-        await self._update_all_switches()
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """turn off heater via spin down"""
         # turn off the switch anyway
         _LOGGER.debug(f"SWITCH {self._name} turning OFF")
 
-        try:
-            # removing previous task by spinning down, this will stop the heater
-            self._settings["spin"] = False
-            await self._coordinator.async_post_state(self._settings)
-            self._state = False
-        except Exception as e:
-            _LOGGER.error(f"Error posting state to coordinator: {e}")
-
-        self.schedule_update_ha_state()
-
-        # Introduce a delay before updating the state
-        _LOGGER.debug("Waiting %s seconds before refreshing coordinator", UPDATE_DELAY)
-        await asyncio.sleep(UPDATE_DELAY)
-
-        # force update of integration
-        await self._coordinator.async_request_refresh()
+        # removing previous task by spinning down, the device picks its own
+        # state again so there is no state to confirm
+        self._settings["spin"] = False
+        self._coordinator.async_submit_command(
+            self._settings, on_done=self._async_command_done
+        )
+        self._state = False
+
+        self.async_write_ha_state()
+
+    async def _async_command_done(self, command: NestoreCommand) -> None:
+        """Set the switch and operation mode from the outcome of a command."""
+        _LOGGER.debug("Command %s %s", command.settings["task"], command.outcome)
+        if command.outcome == OUTCOME_FAILED:
+            _LOGGER.error("Error posting %s to Nestore", command.settings["task"])
+        # the data snapshot may lag behind the device, so trust the outcome
+        if (state := _command_state(command)) is not None:
+            self._state = state
+            self._coordinator.set_operation_mode("MANUAL_STOP" if state else "AUTO")
+        self.async_write_ha_state()
         if self._type > 0:
-            await self._update_all_switches()
-
-    async def _update_all_switches(self):
-        for entity in self.hass.data[DOMAIN]:
-            if isinstance(entity, NestoreSwitchEntity1):
-                await entity.async_update()
-                entity.async_schedule_update_ha_state()
+            self._update_all_switches()
+
+    @callback
+    def _update_all_switches(self) -> None:
+        """Sync the other switches of this entry with the operation mode."""
+        for entity in self.platform.entities.values():
+            if entity is not self and isinstance(
+                entity, (NestoreSwitchEntity1, NestoreSwitchEntity2)
+            ):
+                entity.sync_operation_mode()
+
+    @callback
+    def sync_operation_mode(self) -> None:
+        """Show the switch on while the operation mode is MANUAL_STOP."""
+        self._state = self._coordinator.get_operation_mode() == "MANUAL_STOP"
+        self.async_write_ha_state()
 
     async def async_update(self):
         # Fetch data from the coordinator
@@ -279,9 +309,9 @@ class NestoreSwitchEntity2(SwitchEntity):
         if current_operation_mode != "MANUAL_STOP":
             # force update of integration
             self._state = False
-            await self.async_write_ha_state()
+            self.async_write_ha_state()
             await self._coordinator.async_request_refresh()
-            await self._update_all_switches()
+            self._update_all_switches()
 
     @property
     def should_poll(self) -> bool:
@@ -296,5 +326,5 @@ class NestoreSwitchEntity2(SwitchEntity):
             },
             manufacturer="Nestore",
             model="",
-            name="Nestore",
+            name=self._coordinator.config_entry.title,
         )
@@ -0,0 +1,147 @@
+"""Opt-in span tracing of the update cycle, exported as a Chrome trace."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any
+
+from .const import TRACE_BUFFER_SIZE
+
+CAT_CYCLE = "cycle"
+CAT_REQUEST = "request"
+CAT_ENTITY = "entity"
+CAT_COMMAND = "command"
+
+
+class _NullSpan:
+    """Span handed out while tracing is off, shared and doing nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        """Ignore the arguments."""
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed step, recorded in the buffer of its tracer when it ends."""
+
+    __slots__ = ("_tracer", "name", "cat", "args", "_start", "_task")
+
+    def __init__(
+        self, tracer: NestoreTracer, name: str, cat: str, args: dict[str, Any]
+    ) -> None:
+        """Init a span that starts when entered."""
+        self._tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self._start = 0
+        self._task: asyncio.Task | None = None
+
+    def __enter__(self) -> Span:
+        try:
+            self._task = asyncio.current_task()
+        except RuntimeError:
+            self._task = None
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        task = self._task
+        self._tracer.spans.append(
+            (
+                self.name,
+                self.cat,
+                self._start,
+                end - self._start,
+                0 if task is None else id(task),
+                "main" if task is None else task.get_name(),
+                self.args,
+            )
+        )
+
+    def set(self, **args: Any) -> None:
+        """Add arguments shown with the span."""
+        self.args.update(args)
+
+
+class NestoreTracer:
+    """Record spans of the integration's work in a ring buffer.
+
+    Every asyncio task gets its own track in the trace, so concurrent
+    requests show up next to each other. While tracing is off span()
+    returns a shared no-op span and nothing is timed or stored.
+    """
+
+    def __init__(self, enabled: bool = False, size: int = TRACE_BUFFER_SIZE) -> None:
+        """Init an empty buffer."""
+        self.enabled = enabled
+        self.spans: deque[tuple] = deque(maxlen=size)
+
+    def span(self, name: str, cat: str = CAT_CYCLE, **args: Any) -> Span | _NullSpan:
+        """Get a context manager timing a step."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, cat, args)
+
+    def export(self, process_name: str) -> dict[str, Any]:
+        """Get the buffered spans in the Chrome trace event format.
+
+        Called in the event loop, the buffer may not change while it is
+        copied.
+        """
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": 1,
+                "args": {"name": process_name},
+            }
+        ]
+        tracks: dict[int, str] = {}
+        for name, cat, start, duration, track, task_name, args in list(self.spans):
+            tracks[track] = task_name
+            events.append(
+                {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": duration / 1000,
+                    "pid": 1,
+                    "tid": track,
+                    "args": args,
+                }
+            )
+        events.extend(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": track,
+                "args": {"name": name},
+            }
+            for track, name in tracks.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_trace(path: str, trace: dict[str, Any]) -> None:
+    """Write an exported trace to a file."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(trace, file, default=str)
@@ -0,0 +1,19 @@
+"""Simulated Nestore devices serving the api/v3 endpoints.
+
+Used to exercise the client and the integration without a device on the
+LAN, and to generate load from many devices on separate ports.
+"""
+
+from .model import VesselModel
+from .process import SimulatorProcess
+from .server import Faults, NestoreSimulator, SimulatorFleet, SimulatorThread, Stats
+
+__all__ = [
+    "Faults",
+    "NestoreSimulator",
+    "SimulatorFleet",
+    "SimulatorProcess",
+    "SimulatorThread",
+    "Stats",
+    "VesselModel",
+]
@@ -0,0 +1,59 @@
+"""Run simulated Nestore devices.
+
+python -m simulator --devices 3 --port 4805 --password secret --speed 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from custom_components.nestore.const import DEFAULT_PORT
+
+from .server import Faults, SimulatorFleet
+
+
+async def _async_main(args) -> None:
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+    )
+    fleet = SimulatorFleet(
+        args.devices,
+        host=args.host,
+        port=args.port,
+        password=args.password,
+        faults=faults,
+        speed=args.speed,
+        token_lifetime=args.token_lifetime,
+        extra_fields=args.extra_fields,
+    )
+    await fleet.async_start()
+    for port in fleet.ports:
+        print(f"Nestore simulator on http://{args.host}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fleet.async_stop()
+        print(f"{fleet.stats.requests} requests, {fleet.stats.by_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run simulated Nestore devices.")
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="first port")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--speed", type=float, default=1.0, help="model time factor")
+    parser.add_argument("--token-lifetime", type=float, default=3600)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--extra-fields", type=int, default=0, help="payload size")
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,221 @@
+"""Thermal model of a Nestore vessel and its charge controller."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+
+from custom_components.nestore.const import (
+    MAX_POWER_LEVEL,
+    STATE_CHARGING,
+    TASK_CHARGE_START,
+    TASK_CHARGE_STOP,
+)
+
+STATE_IDLE = "Idle"
+STATE_STOPPED = "Charging Stopped"
+
+WATER_HEAT_CAPACITY = 4186.0  # J/(kg K)
+ZONES = 5
+T_COLD = 10.0  # mains water
+T_AMBIENT = 20.0
+T_MAX = 85.0
+LOSS_TIME_CONSTANT = 48 * 3600.0  # s
+
+
+@dataclass
+class ChargeTask:
+    """A task posted to control/task."""
+
+    name: str
+    spin: bool
+    expires: float
+    power: float = 0.0
+    soc: float = 100.0
+
+
+@dataclass
+class VesselModel:
+    """Five stacked water zones, zone 1 at the top.
+
+    The heater charges the vessel from the top down, hot water is drawn
+    from the top and replaced by cold mains water at the bottom, and every
+    zone slowly loses heat to the room.
+    """
+
+    volume: float = 200.0
+    seed: int = 0
+    draw_probability: float = 8 / 86400  # tapping events started per second
+    extra_fields: int = 0  # unused engineering channels, to grow the payload
+    temps: list[float] = field(default_factory=lambda: [55, 50, 42, 30, 18])
+    power_heater: float = 0.0
+    flow_dhw: float = 0.0
+    energy_charged: float = 0.0  # Wh
+    energy_dhw: float = 0.0  # Wh
+    volume_dhw: float = 0.0  # L
+    task: ChargeTask | None = None
+    stop: ChargeTask | None = None
+    clock: float = 0.0
+    _draw_left: float = 0.0
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def zone_mass(self) -> float:
+        """Return the water mass of one zone in kg."""
+        return self.volume / ZONES
+
+    @property
+    def soc(self) -> float:
+        """Return the share of the vessel that is charged, in %."""
+        charged = sum(
+            min(max((t - T_COLD) / (T_MAX - T_COLD), 0.0), 1.0) for t in self.temps
+        )
+        return 100 * charged / ZONES
+
+    @property
+    def soc_total(self) -> float:
+        """Return the stored heat relative to a fully charged vessel, in %."""
+        return 100 * self.energy_stored / self._energy_full
+
+    @property
+    def energy_stored(self) -> float:
+        """Return the heat above mains temperature in Wh."""
+        return sum(
+            self.zone_mass * WATER_HEAT_CAPACITY * (t - T_COLD) / 3600
+            for t in self.temps
+        )
+
+    @property
+    def _energy_full(self) -> float:
+        return self.volume * WATER_HEAT_CAPACITY * (T_MAX - T_COLD) / 3600
+
+    @property
+    def pressure(self) -> float:
+        """Return the system pressure in bar, rising with the mean temperature."""
+        mean = sum(self.temps) / ZONES
+        return 1.6 + 0.015 * (mean - T_COLD) + self._rng.gauss(0, 0.005)
+
+    @property
+    def state(self) -> str:
+        """Return the name reported by control_state."""
+        if self.power_heater > 0:
+            return STATE_CHARGING
+        if self.stop is not None:
+            return STATE_STOPPED
+        return STATE_IDLE
+
+    def post_task(self, data: dict) -> None:
+        """Apply a task posted to control/task."""
+        name = data["TASK"]
+        expires = self.clock + float(data.get("lifetime", 0))
+        if name == TASK_CHARGE_START:
+            if not data.get("spin", True):
+                self.task = None
+                return
+            power = float(data["power"])
+            if not 0 < power <= MAX_POWER_LEVEL:
+                raise ValueError(f"power out of range: {power}")
+            self.task = ChargeTask(name, True, expires, power, float(data["soc"]))
+        elif name == TASK_CHARGE_STOP:
+            self.stop = ChargeTask(name, True, expires) if data["spin"] else None
+        else:
+            raise ValueError(f"unknown task: {name}")
+
+    def advance(self, seconds: float, step: float = 10.0) -> None:
+        """Advance the model by a number of seconds."""
+        while seconds > 0:
+            dt = min(step, seconds)
+            self._step(dt)
+            seconds -= dt
+
+    def _step(self, dt: float) -> None:
+        self.clock += dt
+        for attr in ("task", "stop"):
+            task = getattr(self, attr)
+            if task is not None and self.clock >= task.expires:
+                setattr(self, attr, None)
+
+        # heater, blocked by a stop task and done at the target state of charge
+        task = self.task
+        if task is not None and self.stop is None and self.soc < task.soc:
+            self.power_heater = task.power
+            self._heat(task.power * dt)
+            self.energy_charged += task.power * dt / 3600
+        else:
+            self.power_heater = 0.0
+
+        self._draw(dt)
+
+        # losses to the room
+        decay = dt / LOSS_TIME_CONSTANT
+        self.temps = [t - (t - T_AMBIENT) * decay for t in self.temps]
+
+    def _heat(self, joules: float) -> None:
+        """Heat the highest zone that is not at the maximum temperature."""
+        for index, temp in enumerate(self.temps):
+            if temp >= T_MAX:
+                continue
+            room = (T_MAX - temp) * self.zone_mass * WATER_HEAT_CAPACITY
+            used = min(room, joules)
+            self.temps[index] += used / (self.zone_mass * WATER_HEAT_CAPACITY)
+            joules -= used
+            if joules <= 0:
+                return
+
+    def _draw(self, dt: float) -> None:
+        """Draw hot water from the top during random tapping events."""
+        if self._draw_left <= 0 and self._rng.random() < self.draw_probability * dt:
+            self._draw_left = self._rng.uniform(3, 40)  # L
+            self.flow_dhw = self._rng.uniform(4, 12)  # L/min
+        if self._draw_left <= 0:
+            self.flow_dhw = 0.0
+            return
+
+        liters = min(self.flow_dhw * dt / 60, self._draw_left)
+        self._draw_left -= liters
+        self.volume_dhw += liters
+        self.energy_dhw += (
+            liters * WATER_HEAT_CAPACITY * (self.temps[0] - T_COLD) / 3600
+        )
+        # plug flow, every zone takes water from the one below
+        share = min(liters / self.zone_mass, 1.0)
+        below = [*self.temps[1:], T_COLD]
+        self.temps = [t + (b - t) * share for t, b in zip(self.temps, below)]
+
+    def engineering_payload(self) -> dict:
+        """Return the data/engineering payload."""
+        base = {
+            "TEMP_HTR_OUT": round(self.temps[0] + (8 if self.power_heater else 0), 2),
+            "PRES_SYS": round(self.pressure, 3),
+        }
+        for zone, temp in enumerate(self.temps, start=1):
+            base[f"TEMP_VES_INT_{zone}"] = round(temp, 2)
+        for idx in range(self.extra_fields):
+            base[f"AUX_{idx:04d}"] = round(self._rng.uniform(-100, 100), 3)
+        return {
+            "HEADER": {"VERSION": 3, "TYPE": "ENGINEERING"},
+            "PAYLOAD": {
+                "BASE": base,
+                "DERIVED": {
+                    "SOC_VES": round(self.soc, 1),
+                    "SOC_VES_TOTAL": round(self.soc_total, 1),
+                    "FLOW_DHW": round(self.flow_dhw, 2),
+                    "POWER_HEATER": self.power_heater,
+                    "TE": round(self.energy_stored, 1),
+                },
+                "COUNTERS": {
+                    "ENERGY_DHW_THERMAL_THEORETICAL": round(self.energy_dhw, 1),
+                    "ENERGY_CRG_ELECTRICAL": round(self.energy_charged, 1),
+                    "VOL_DHW_THEORETICAL": round(self.volume_dhw, 1),
+                },
+            },
+        }
+
+    def control_payload(self) -> dict:
+        """Return the data/control_state payload."""
+        return {
+            "HEADER": {"VERSION": 3, "TYPE": "CONTROL_STATE"},
+            "PAYLOAD": {"NAME": self.state},
+        }
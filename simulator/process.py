@@ -0,0 +1,51 @@
+"""Run simulated devices in a child process."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+class SimulatorProcess:
+    """Serve simulated devices from a separate Python process.
+
+    Unlike SimulatorThread the devices use no CPU time or memory of the
+    measuring process, so process_time and tracemalloc only see the
+    integration. Options are passed on as command line flags.
+    """
+
+    def __init__(self, count: int, **options) -> None:
+        self.args = [
+            sys.executable,
+            "-m",
+            "simulator",
+            "--devices",
+            str(count),
+            "--port",
+            "0",
+        ]
+        for name, value in options.items():
+            self.args += [f"--{name.replace('_', '-')}", str(value)]
+        self.count = count
+        self.ports: list[int] = []
+        self._process: subprocess.Popen | None = None
+
+    def __enter__(self) -> SimulatorProcess:
+        self._process = subprocess.Popen(  # noqa: S603
+            self.args,
+            cwd=Path(__file__).parent.parent,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        # the simulator prints one line per device once it is listening
+        while len(self.ports) < self.count:
+            line = self._process.stdout.readline()
+            if not line:
+                raise RuntimeError("Simulator exited before it was serving")
+            self.ports.append(int(line.rsplit(":", 1)[1]))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._process.terminate()
+        self._process.communicate(timeout=10)
@@ -0,0 +1,227 @@
+"""HTTP server that serves the Nestore api/v3 endpoints from the model."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import secrets
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+from custom_components.nestore.const import (
+    DEFAULT_LOC_ACTIVE,
+    DEFAULT_LOC_CONTROLLER,
+    DEFAULT_LOC_DATA,
+    DEFAULT_LOC_FLAG,
+    DEFAULT_LOC_INPUT,
+    DEFAULT_LOC_MEAS,
+    DEFAULT_LOC_TOKEN,
+)
+
+from .model import VesselModel
+
+
+@dataclass
+class Faults:
+    """Latency and failures injected into every response."""
+
+    latency: float = 0.0  # s
+    jitter: float = 0.0  # s, uniform on top of latency
+    error_rate: float = 0.0  # share of requests answered with 500
+    timeout_rate: float = 0.0  # share of requests that hang
+    hang: float = 30.0  # s a hanging request waits before it answers
+
+
+@dataclass
+class Stats:
+    """Requests seen by one or more simulators."""
+
+    requests: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    by_path: dict[str, int] = field(default_factory=dict)
+
+    def reset_peak(self) -> None:
+        """Start a new peak measurement."""
+        self.peak_in_flight = self.in_flight
+
+
+class NestoreSimulator:
+    """One simulated Nestore device.
+
+    The model runs speed times faster than the wall clock, so charge
+    tasks and tapping events show up in a short test run.
+    """
+
+    def __init__(
+        self,
+        password: str = "",
+        faults: Faults | None = None,
+        speed: float = 1.0,
+        token_lifetime: float = 3600,
+        seed: int = 0,
+        stats: Stats | None = None,
+        extra_fields: int = 0,
+    ) -> None:
+        self.model = VesselModel(seed=seed, extra_fields=extra_fields)
+        self.password_hash = hashlib.sha256(password.encode()).hexdigest()
+        self.faults = faults or Faults()
+        self.speed = speed
+        self.token_lifetime = token_lifetime
+        self.stats = stats or Stats()
+        self.tokens: dict[str, float] = {}
+        self._rng = random.Random(seed)
+        self._updated = time.monotonic()
+
+    def create_app(self) -> web.Application:
+        """Create the web application with the device endpoints."""
+        app = web.Application(middlewares=[self._faults_middleware])
+        app.router.add_get(f"/{DEFAULT_LOC_DATA}", self._handle_engineering)
+        app.router.add_get(f"/{DEFAULT_LOC_MEAS}", self._handle_engineering)
+        app.router.add_get(f"/{DEFAULT_LOC_CONTROLLER}", self._handle_control_state)
+        app.router.add_get(f"/{DEFAULT_LOC_CONTROLLER}/", self._handle_control_state)
+        app.router.add_get(f"/{DEFAULT_LOC_ACTIVE}", self._handle_configuration)
+        app.router.add_get(f"/{DEFAULT_LOC_INPUT}", self._handle_configuration)
+        app.router.add_post(f"/{DEFAULT_LOC_TOKEN}", self._handle_token)
+        app.router.add_post(f"/{DEFAULT_LOC_FLAG}", self._handle_task)
+        return app
+
+    def _advance(self) -> None:
+        now = time.monotonic()
+        self.model.advance((now - self._updated) * self.speed)
+        self._updated = now
+
+    @web.middleware
+    async def _faults_middleware(self, request: web.Request, handler):
+        stats = self.stats
+        stats.requests += 1
+        stats.by_path[request.path] = stats.by_path.get(request.path, 0) + 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            faults = self.faults
+            delay = faults.latency + self._rng.uniform(0, faults.jitter)
+            draw = self._rng.random()
+            if draw < faults.timeout_rate:
+                stats.timeouts += 1
+                delay = faults.hang
+            if delay:
+                await asyncio.sleep(delay)
+            if faults.timeout_rate <= draw < faults.timeout_rate + faults.error_rate:
+                stats.errors += 1
+                raise web.HTTPInternalServerError(text="simulated failure")
+            self._advance()
+            return await handler(request)
+        finally:
+            stats.in_flight -= 1
+
+    async def _handle_engineering(self, request: web.Request) -> web.Response:
+        return web.json_response(self.model.engineering_payload())
+
+    async def _handle_control_state(self, request: web.Request) -> web.Response:
+        return web.json_response(self.model.control_payload())
+
+    async def _handle_configuration(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"HEADER": {"VERSION": 3}, "PAYLOAD": {"VOLUME": self.model.volume}}
+        )
+
+    async def _handle_token(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        if data.get("password") != self.password_hash:
+            raise web.HTTPUnauthorized(text="wrong password")
+        token = secrets.token_hex(16)
+        self.tokens[token] = time.time() + self.token_lifetime
+        return web.json_response({"token": token, "expires_in": self.token_lifetime})
+
+    async def _handle_task(self, request: web.Request) -> web.Response:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme != "Bearer" or self.tokens.get(token, 0) < time.time():
+            raise web.HTTPUnauthorized(text="token missing or expired")
+        try:
+            self.model.post_task(await request.json())
+        except (KeyError, TypeError, ValueError, json.JSONDecodeError) as err:
+            raise web.HTTPBadRequest(text=str(err)) from err
+        return web.json_response({"STATUS": "OK"})
+
+
+class SimulatorFleet:
+    """Several simulators on consecutive or free ports."""
+
+    def __init__(
+        self,
+        count: int,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        stats: Stats | None = None,
+        **kwargs,
+    ) -> None:
+        self.host = host
+        self.stats = stats or Stats()
+        self.devices = [
+            NestoreSimulator(seed=index, stats=self.stats, **kwargs)
+            for index in range(count)
+        ]
+        self.ports: list[int] = []
+        self._first_port = port
+        self._runners: list[web.AppRunner] = []
+
+    async def async_start(self) -> None:
+        """Serve every simulator, port 0 picks free ports."""
+        for index, device in enumerate(self.devices):
+            runner = web.AppRunner(device.create_app(), access_log=None)
+            await runner.setup()
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self._first_port + index if self._first_port else 0))
+            self.ports.append(sock.getsockname()[1])
+            await web.SockSite(runner, sock).start()
+            self._runners.append(runner)
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+
+class SimulatorThread:
+    """Run a simulator fleet on its own event loop, for benchmarks.
+
+    Serving from another thread keeps the simulated devices out of the
+    event loop that is being measured.
+    """
+
+    def __init__(self, count: int, **kwargs) -> None:
+        self.fleet = SimulatorFleet(count, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def ports(self) -> list[int]:
+        return self.fleet.ports
+
+    @property
+    def stats(self) -> Stats:
+        return self.fleet.stats
+
+    def __enter__(self) -> SimulatorThread:
+        self._thread.start()
+        self._run(self.fleet.async_start())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._run(self.fleet.async_stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
@@ -0,0 +1,117 @@
+"""Tests for the site totals over the devices of the fleet."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.nestore.aggregate import NestoreAggregateCoordinator, aggregate
+from custom_components.nestore.const import CONF_VESSEL_VOLUME
+
+
+class FakeDevice:
+    """Device coordinator with a snapshot and its listeners."""
+
+    def __init__(self, entry_id: str, volume: float = 200) -> None:
+        self.config_entry = SimpleNamespace(
+            entry_id=entry_id, options={CONF_VESSEL_VOLUME: volume}
+        )
+        self.host = f"{entry_id}.local"
+        self.snapshot = None
+        self.listeners = []
+
+    def async_add_listener(self, update_callback):
+        self.listeners.append(update_callback)
+        return lambda: self.listeners.remove(update_callback)
+
+    def update(self, energy: float, power: float, soc: float, pressure: float):
+        self.snapshot = SimpleNamespace(
+            energy_stored=energy, power_heater=power, soc=soc, pressure=pressure
+        )
+        for update_callback in self.listeners:
+            update_callback()
+
+
+class Adder:
+    """Add-entities callback of an entry, counting the calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self) -> None:
+        self.calls += 1
+
+
+@pytest.fixture
+def site() -> NestoreAggregateCoordinator:
+    return NestoreAggregateCoordinator(None)
+
+
+def test_totals_and_weighted_soc() -> None:
+    totals = aggregate(
+        [(2000.0, 1000.0, 50.0, 2.0), (4000.0, 0.0, 80.0, 1.5)], [100, 200]
+    )
+    assert totals == {
+        "energy_stored": 6.0,
+        "power_heater": 1000.0,
+        "soc": 70.0,
+        "pressure_min": 1.5,
+        "pressure_min_device": 1,
+    }
+
+
+def test_totals_follow_the_device_snapshots(site) -> None:
+    first, second = FakeDevice("a"), FakeDevice("b")
+    site.async_track(first)
+    site.async_track(second)
+    assert site.data is None
+
+    first.update(2000.0, 500.0, 40.0, 2.0)
+    assert site.data["devices"] == 1
+    second.update(1000.0, 0.0, 60.0, 1.0)
+    assert site.get_site_energy_stored() == 3.0
+    assert site.get_site_soc() == 50.0
+    assert site.get_site_attributes() == {
+        "devices": 2,
+        "lowest_pressure_device": "b.local",
+    }
+
+    site.async_untrack(second)
+    assert site.get_site_attributes()["devices"] == 1
+    assert not second.listeners
+
+
+def test_totals_are_cleared_without_snapshots(site) -> None:
+    device = FakeDevice("a")
+    site.async_track(device)
+    device.update(2000.0, 500.0, 40.0, 2.0)
+    assert site.data is not None
+
+    site.async_untrack(device)
+    assert site.data is None
+
+
+def test_first_offer_owns_the_site_entities(site) -> None:
+    first, second = Adder(), Adder()
+    site.async_offer("a", first)
+    site.async_offer("b", second)
+    assert site.owner == "a"
+    assert (first.calls, second.calls) == (1, 0)
+
+
+def test_site_entities_move_when_the_owner_leaves(site) -> None:
+    devices = [FakeDevice(entry_id) for entry_id in "abc"]
+    adders = [Adder() for _ in devices]
+    for device, adder in zip(devices, adders, strict=True):
+        site.async_track(device)
+        site.async_offer(device.config_entry.entry_id, adder)
+
+    site.async_untrack(devices[1])
+    assert site.owner == "a"
+    site.async_untrack(devices[0])
+    assert site.owner == "c"
+    assert [adder.calls for adder in adders] == [1, 0, 1]
+
+    site.async_untrack(devices[2])
+    assert site.owner is None
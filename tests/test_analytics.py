@@ -0,0 +1,79 @@
+"""Tests for the stratification analytics of the vessel."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from custom_components.nestore.analytics import (
+    STRATIFICATION_COLUMNS,
+    column_values,
+    stratification,
+    stratification_columns,
+)
+
+HOT_WATER_TEMP = 45
+VESSEL_VOLUME = 200
+
+
+def _single(temps: list[float]) -> dict[str, float | None]:
+    result = stratification(temps, HOT_WATER_TEMP, VESSEL_VOLUME)
+    return {name: column_values(values)[0] for name, values in result.items()}
+
+
+def test_fully_mixed_vessel_has_no_thermocline() -> None:
+    result = _single([60, 60, 60, 60, 60])
+    assert result["gradient"] == 0
+    assert result["thermocline"] is None
+    assert result["mixing_index"] == 1
+    assert result["usable_volume"] == VESSEL_VOLUME
+
+
+def test_cold_vessel_has_no_usable_water() -> None:
+    result = _single([30, 30, 30, 30, 30])
+    assert result["thermocline"] is None
+    assert result["usable_volume"] == 0
+
+
+def test_two_layers_are_perfectly_stratified() -> None:
+    result = _single([60, 60, 30, 30, 30])
+    assert result["gradient"] == pytest.approx(37.5)
+    assert result["thermocline"] == pytest.approx(0.6)
+    assert result["mixing_index"] == pytest.approx(0)
+
+
+def test_usable_volume_follows_the_linear_profile() -> None:
+    # 45 degrees is reached halfway between the zones at 0.7 and 0.5
+    result = _single([60, 50, 40, 30, 20])
+    assert result["usable_volume"] == pytest.approx(0.4 * VESSEL_VOLUME)
+    assert 0 < result["mixing_index"] < 1
+
+
+def test_inverted_vessel_is_fully_mixed() -> None:
+    result = _single([20, 30, 40, 50, 60])
+    assert result["gradient"] < 0
+    assert result["mixing_index"] == 1
+
+
+def test_samples_are_computed_independently() -> None:
+    samples = [[60] * 5, [60, 60, 30, 30, 30], [60, 50, 40, 30, 20]]
+    columns = {
+        f"temp_vessel_{zone}": [sample[zone - 1] for sample in samples]
+        for zone in range(1, 6)
+    }
+    result = stratification_columns(columns, HOT_WATER_TEMP, VESSEL_VOLUME)
+    for index, sample in enumerate(samples):
+        single = stratification(sample, HOT_WATER_TEMP, VESSEL_VOLUME)
+        for name in STRATIFICATION_COLUMNS:
+            np.testing.assert_allclose(result[name][index], single[name][0])
+
+
+def test_empty_history() -> None:
+    columns = {f"temp_vessel_{zone}": [] for zone in range(1, 6)}
+    result = stratification_columns(columns, HOT_WATER_TEMP, VESSEL_VOLUME)
+    assert set(result) == set(STRATIFICATION_COLUMNS)
+    assert all(values.size == 0 for values in result.values())
+
+
+def test_column_values_replace_nan_with_none() -> None:
+    assert column_values(np.array([0.5, np.nan])) == [0.5, None]
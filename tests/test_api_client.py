@@ -0,0 +1,208 @@
+"""Tests for the fingerprint, retries and token handling of the API client."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from types import SimpleNamespace
+from typing import Self
+
+import aiohttp
+import pytest
+
+from custom_components.nestore import api_client
+from custom_components.nestore.api_client import NestoreClient, _endpoint
+from custom_components.nestore.const import DEFAULT_LOC_CONTROLLER, DEFAULT_LOC_TOKEN
+from custom_components.nestore.snapshot import NestoreControlState
+
+IDLE = b'{"PAYLOAD": {"NAME": "Idle"}}'
+CHARGING = b'{"PAYLOAD": {"NAME": "Charging Electrical Main"}}'
+
+
+class FakeResponse:
+    """Response answering with a fixed body and status."""
+
+    def __init__(self, body: bytes, status: int = 200) -> None:
+        self.body = body
+        self.status = status
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            request = SimpleNamespace(real_url="http://nestore.test")
+            raise aiohttp.ClientResponseError(request, (), status=self.status)
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+class FakeSession:
+    """Session answering every request with the current body."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.requests = 0
+
+    def request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        self.requests += 1
+        return FakeResponse(self.body)
+
+
+def _client(session: FakeSession) -> NestoreClient:
+    client = NestoreClient(None, "nestore.test", 80, "", session=session)
+    client.clock = itertools.count(1000.0, 10.0).__next__
+    return client
+
+
+def test_unchanged_body_returns_previous_result() -> None:
+    """An identical body is not parsed again, only last_seen moves."""
+    session = FakeSession(IDLE)
+    client = _client(session)
+
+    async def _poll_twice():
+        first = await client.async_query_data(DEFAULT_LOC_CONTROLLER)
+        second = await client.async_query_data(DEFAULT_LOC_CONTROLLER)
+        return first, second
+
+    first, second = asyncio.run(_poll_twice())
+
+    assert isinstance(first, NestoreControlState)
+    assert second is first
+    assert first.received == 1000.0
+    assert client.last_seen[DEFAULT_LOC_CONTROLLER] == 1010.0
+    assert client.fingerprint_hits[DEFAULT_LOC_CONTROLLER] == 1
+    assert client.fingerprint_misses[DEFAULT_LOC_CONTROLLER] == 1
+    assert session.requests == 2
+
+
+def test_changed_body_is_parsed() -> None:
+    """A different body gives a new result."""
+    session = FakeSession(IDLE)
+    client = _client(session)
+
+    async def _poll_change():
+        first = await client.async_query_data(DEFAULT_LOC_CONTROLLER)
+        session.body = CHARGING
+        return first, await client.async_query_data(DEFAULT_LOC_CONTROLLER)
+
+    first, second = asyncio.run(_poll_change())
+
+    assert second is not first
+    assert second.name == "Charging Electrical Main"
+    assert client.fingerprint_hits[DEFAULT_LOC_CONTROLLER] == 0
+    assert client.fingerprint_misses[DEFAULT_LOC_CONTROLLER] == 2
+
+
+def test_unparsable_body_is_not_remembered() -> None:
+    """A body that fails to parse is tried again on the next poll."""
+    session = FakeSession(b'{"PAYLOAD": {}}')
+    client = _client(session)
+
+    async def _poll_twice():
+        return [await client.async_query_data(DEFAULT_LOC_CONTROLLER) for _ in range(2)]
+
+    assert asyncio.run(_poll_twice()) == [None, None]
+    assert client.fingerprint_hits[DEFAULT_LOC_CONTROLLER] == 0
+    assert client.fingerprint_misses[DEFAULT_LOC_CONTROLLER] == 2
+
+
+class DownSession:
+    """Unreachable device, every request takes some seconds to fail."""
+
+    def __init__(self, clock: list[float], seconds: float) -> None:
+        self.clock = clock
+        self.seconds = seconds
+        self.requests = 0
+
+    def request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        self.requests += 1
+        self.clock[0] += self.seconds
+        raise aiohttp.ClientConnectionError
+
+
+def test_retries_stop_at_the_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A retry that could not finish within the budget is not started."""
+    monkeypatch.setattr(api_client, "RETRY_ATTEMPTS", 10)
+    monkeypatch.setattr(api_client, "RETRY_BUDGET", 12)
+    monkeypatch.setattr(api_client, "REQUEST_TIMEOUT", 5)
+    monkeypatch.setattr(api_client, "backoff_delay", lambda _: 0)
+    clock = [0.0]
+    session = DownSession(clock, 4.0)
+    client = _client(session)
+
+    async def _call():
+        # the loop clock follows the failing requests
+        asyncio.get_running_loop().time = lambda: clock[0]
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await client._async_call("GET", "http://nestore.test/api/data")
+
+    asyncio.run(_call())
+
+    # the second failure at 8 s leaves no room for another 5 s request
+    assert session.requests == 2
+    assert client.retries["api/data"] == 1
+    assert client.breaker.failures == 1
+
+
+class TokenSession:
+    """Device that issues tokens and only accepts the newest one."""
+
+    def __init__(self) -> None:
+        self.issued = 0
+        self.authorizations: list[str] = []
+
+    def request(self, method: str, url: str, headers=None, **kwargs) -> FakeResponse:
+        if _endpoint(url) == DEFAULT_LOC_TOKEN:
+            self.issued += 1
+            body = {"token": f"token{self.issued}", "expires_in": 3600}
+            return SlowResponse(json.dumps(body).encode())
+        self.authorizations.append(headers["Authorization"])
+        if headers["Authorization"] != f"Bearer token{self.issued}":
+            return FakeResponse(b"", status=401)
+        return FakeResponse(IDLE)
+
+
+class SlowResponse(FakeResponse):
+    """Response that takes a moment, so callers overlap."""
+
+    async def read(self) -> bytes:
+        await asyncio.sleep(0.01)
+        return self.body
+
+
+def _token_client(session: TokenSession) -> NestoreClient:
+    client = _client(session)
+    client.set_credentials("", "secret")
+    client.set_token("stale", time.time() + 3600)
+    return client
+
+
+def test_concurrent_refreshes_share_one_request() -> None:
+    session = TokenSession()
+    client = _token_client(session)
+
+    async def _refresh_together():
+        return await asyncio.gather(*(client.async_refresh_token() for _ in range(3)))
+
+    assert asyncio.run(_refresh_together()) == [True, True, True]
+    assert session.issued == 1
+    assert client.header["Authorization"] == "Bearer token1"
+    assert client.token_refreshes == 1
+
+
+def test_rejected_token_is_refreshed_and_request_retried() -> None:
+    session = TokenSession()
+    client = _token_client(session)
+
+    result = asyncio.run(client.async_query_data(DEFAULT_LOC_CONTROLLER))
+
+    assert isinstance(result, NestoreControlState)
+    assert session.issued == 1
+    assert session.authorizations == ["Bearer stale", "Bearer token1"]
@@ -0,0 +1,101 @@
+"""Tests for the payload capture files."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+from typing import TYPE_CHECKING
+
+from custom_components.nestore.capture import (
+    NestoreCapture,
+    capture_files,
+    read_capture,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+BODY = b'{"PAYLOAD": {"NAME": "Idle"}}'
+
+
+class FakeHass:
+    """Run executor jobs right away."""
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+def _capture(capture: NestoreCapture, records) -> None:
+    for record in records:
+        capture.add(*record)
+    asyncio.run(capture.async_flush(FakeHass()))
+
+
+def test_bodies_are_read_back_unchanged(tmp_path: Path) -> None:
+    records = [
+        (1000.0, "api/v3/data/engineering", b'{"A": 1}'),
+        (1000.5, "api/v3/data/control_state", b"line\nbreaks\n\n"),
+        (1010.25, "api/v3/data/engineering", b""),
+    ]
+    capture = NestoreCapture(tmp_path)
+    _capture(capture, records[:2])
+    _capture(capture, records[2:])
+    capture.close()
+
+    assert capture_files(tmp_path) == [capture.path]
+    assert list(read_capture(capture_files(tmp_path))) == records
+    assert capture.get_diagnostics()["records"] == 3
+
+
+def test_capture_continues_after_reopening(tmp_path: Path) -> None:
+    first = NestoreCapture(tmp_path)
+    _capture(first, [(1.0, "a", BODY)])
+    first.close()
+    second = NestoreCapture(tmp_path)
+    _capture(second, [(2.0, "a", BODY)])
+    second.close()
+
+    assert [r[0] for r in read_capture(capture_files(tmp_path))] == [1.0, 2.0]
+
+
+def test_rotation_keeps_the_newest_files(tmp_path: Path) -> None:
+    capture = NestoreCapture(tmp_path, max_bytes=1, backups=2)
+    for received in range(5):
+        _capture(capture, [(float(received), "a", BODY)])
+    capture.close()
+
+    files = capture_files(tmp_path)
+    assert [path.name for path in files] == ["payloads.2.gz", "payloads.1.gz"]
+    assert [r[0] for r in read_capture(files)] == [3.0, 4.0]
+    assert capture.rotations == 5
+
+
+def test_rotation_without_backups(tmp_path: Path) -> None:
+    capture = NestoreCapture(tmp_path, max_bytes=1, backups=0)
+    _capture(capture, [(1.0, "a", BODY)])
+    capture.close()
+    assert capture_files(tmp_path) == []
+
+
+def test_partial_record_ends_the_file(tmp_path: Path) -> None:
+    path = tmp_path / "payloads.gz"
+    with gzip.open(path, "wb") as file:
+        file.write(b"1.000 a 3\nabc\n2.000 a 10\nabc")
+    assert list(read_capture([path])) == [(1.0, "a", b"abc")]
+
+
+def test_file_cut_off_by_a_crash(tmp_path: Path) -> None:
+    capture = NestoreCapture(tmp_path)
+    _capture(capture, [(1.0, "a", BODY)])
+    first_batch = capture.path.stat().st_size
+    _capture(capture, [(2.0, "a", BODY * 100)])
+    capture.close()
+    data = capture.path.read_bytes()
+
+    # every batch is flushed, only the end of the gzip stream is missing
+    capture.path.write_bytes(data[:-8])
+    assert [r[0] for r in read_capture([capture.path])] == [1.0, 2.0]
+
+    # cut in the middle of the second batch
+    capture.path.write_bytes(data[: (first_batch + len(data)) // 2])
+    assert [r[0] for r in read_capture([capture.path])] == [1.0]
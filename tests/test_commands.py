@@ -0,0 +1,238 @@
+"""Tests for the control command pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.nestore import commands
+from custom_components.nestore.commands import (
+    OUTCOME_CONFIRMED,
+    OUTCOME_FAILED,
+    OUTCOME_POSTED,
+    OUTCOME_SUPERSEDED,
+    OUTCOME_TIMEOUT,
+    NestoreCommand,
+    NestoreCommandPipeline,
+    NestoreSetpoints,
+    expect_state,
+)
+from custom_components.nestore.const import STATE_CHARGING
+from custom_components.nestore.tracing import NestoreTracer
+
+
+@pytest.fixture(autouse=True)
+def fast_confirmation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Poll every 10 ms and give up after 200 ms."""
+    monkeypatch.setattr(commands, "CONFIRM_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(commands, "CONFIRM_TIMEOUT", 0.2)
+
+
+class FakeEntry:
+    title = "Nestore"
+
+    def async_create_background_task(self, hass, target, name):
+        return asyncio.create_task(target, name=name)
+
+
+class FakeCoordinator:
+    """Device that enters charging after a number of polls."""
+
+    def __init__(self, polls_to_charge: int | None = 2) -> None:
+        self.config_entry = FakeEntry()
+        self.hass = None
+        self.tracer = NestoreTracer()
+        self.polls_to_charge = polls_to_charge
+        self.accept = True
+        self.blocked: asyncio.Event | None = None
+        self.post_delay = 0.0
+        self.posted: list[str] = []
+        self.polls = 0
+        self.refreshes = 0
+
+    async def async_post_state(self, settings):
+        if self.blocked is not None:
+            await self.blocked.wait()
+        await asyncio.sleep(self.post_delay)
+        self.posted.append(settings["task"])
+        return self.accept
+
+    async def async_poll_control_state(self):
+        self.polls += 1
+        if self.polls_to_charge is not None and self.polls >= self.polls_to_charge:
+            return STATE_CHARGING
+        return "Idle"
+
+    async def async_request_refresh(self):
+        self.refreshes += 1
+
+
+class Settled:
+    """Done callback collecting the settled commands."""
+
+    def __init__(self) -> None:
+        self.commands: list[NestoreCommand] = []
+        self._changed = asyncio.Event()
+
+    async def __call__(self, command: NestoreCommand) -> None:
+        self.commands.append(command)
+        self._changed.set()
+
+    async def wait(self, count: int) -> list[NestoreCommand]:
+        """Wait until count commands settled."""
+        async with asyncio.timeout(2):
+            while len(self.commands) < count:
+                self._changed.clear()
+                await self._changed.wait()
+        return self.commands
+
+
+async def _run(pipeline: NestoreCommandPipeline, *tasks, expect=None) -> list:
+    """Submit commands and wait until all of them settled."""
+    settled = Settled()
+    for task in tasks:
+        pipeline.submit(NestoreCommand({"task": task}, expect, settled))
+    return await settled.wait(len(tasks))
+
+
+def test_command_is_confirmed_by_the_device_state() -> None:
+    coordinator = FakeCoordinator(polls_to_charge=3)
+    pipeline = NestoreCommandPipeline(coordinator)
+
+    (command,) = asyncio.run(
+        _run(pipeline, "start", expect=expect_state(STATE_CHARGING))
+    )
+
+    assert command.outcome == OUTCOME_CONFIRMED
+    assert command.latency is not None
+    assert pipeline.get_last_latency() == command.latency
+    assert coordinator.polls == 3
+    assert coordinator.refreshes == 1
+    assert pipeline.outcomes[OUTCOME_CONFIRMED] == 1
+
+
+def test_command_without_expected_state_is_posted() -> None:
+    coordinator = FakeCoordinator()
+    (command,) = asyncio.run(_run(NestoreCommandPipeline(coordinator), "stop"))
+    assert command.outcome == OUTCOME_POSTED
+    assert coordinator.polls == 0
+
+
+def test_rejected_command_fails() -> None:
+    coordinator = FakeCoordinator()
+    coordinator.accept = False
+    (command,) = asyncio.run(
+        _run(
+            NestoreCommandPipeline(coordinator),
+            "start",
+            expect=expect_state(STATE_CHARGING),
+        )
+    )
+    assert command.outcome == OUTCOME_FAILED
+
+
+def test_unconfirmed_command_times_out() -> None:
+    coordinator = FakeCoordinator(polls_to_charge=None)
+    (command,) = asyncio.run(
+        _run(
+            NestoreCommandPipeline(coordinator),
+            "start",
+            expect=expect_state(STATE_CHARGING),
+        )
+    )
+    assert command.outcome == OUTCOME_TIMEOUT
+    assert command.latency is None
+
+
+def test_confirmation_time_starts_after_the_post() -> None:
+    coordinator = FakeCoordinator(polls_to_charge=2)
+    coordinator.post_delay = 0.3
+    (command,) = asyncio.run(
+        _run(
+            NestoreCommandPipeline(coordinator),
+            "start",
+            expect=expect_state(STATE_CHARGING),
+        )
+    )
+    assert command.outcome == OUTCOME_CONFIRMED
+    assert coordinator.polls == 2
+
+
+def test_newer_command_supersedes_the_confirmation() -> None:
+    coordinator = FakeCoordinator(polls_to_charge=None)
+    pipeline = NestoreCommandPipeline(coordinator)
+
+    first, second = asyncio.run(
+        _run(pipeline, "start", "stop", expect=expect_state("Idle", present=False))
+    )
+
+    assert first.outcome == OUTCOME_SUPERSEDED
+    assert second.outcome == OUTCOME_TIMEOUT
+    assert coordinator.posted == ["start", "stop"]
+
+
+def test_stop_fails_current_and_queued_commands() -> None:
+    coordinator = FakeCoordinator()
+    pipeline = NestoreCommandPipeline(coordinator)
+
+    async def _stop_while_posting() -> list[NestoreCommand]:
+        settled = Settled()
+        coordinator.blocked = asyncio.Event()
+        for task in ("start", "stop"):
+            pipeline.submit(NestoreCommand({"task": task}, on_done=settled))
+        await asyncio.sleep(0.05)
+        await pipeline.async_stop()
+
+        # nothing dropped is sent once the pipeline runs again
+        coordinator.blocked = None
+        pipeline.submit(NestoreCommand({"task": "again"}, on_done=settled))
+        return await settled.wait(3)
+
+    done = asyncio.run(_stop_while_posting())
+
+    assert [(c.settings["task"], c.outcome) for c in done] == [
+        ("start", OUTCOME_FAILED),
+        ("stop", OUTCOME_FAILED),
+        ("again", OUTCOME_POSTED),
+    ]
+    assert coordinator.posted == ["again"]
+    assert pipeline.get_diagnostics()["pending"] == 0
+
+
+class FakeTimers:
+    """async_call_later that keeps the scheduled actions."""
+
+    def __init__(self) -> None:
+        self.pending: list = []
+
+    def __call__(self, hass, delay, action):
+        self.pending.append(action)
+
+        def _cancel() -> None:
+            self.pending.remove(action)
+
+        return _cancel
+
+
+def test_setpoint_changes_restart_the_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    timers = FakeTimers()
+    monkeypatch.setattr(commands, "async_call_later", timers)
+    setpoints = NestoreSetpoints(FakeCoordinator())
+    applied = []
+
+    async def _apply() -> None:
+        applied.append(setpoints.changes)
+
+    monkeypatch.setattr(setpoints, "_async_apply", _apply)
+
+    for _ in range(3):
+        setpoints.async_changed()
+    assert len(timers.pending) == 1
+
+    asyncio.run(timers.pending.pop()(None))
+    assert applied == [3]
+
+    setpoints.async_changed()
+    setpoints.async_cancel()
+    assert not timers.pending
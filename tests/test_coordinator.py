@@ -0,0 +1,79 @@
+"""Tests for fetching the cycle endpoints under a shared deadline."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.nestore import coordinator
+from custom_components.nestore.coordinator import NestoreCoordinator
+from custom_components.nestore.tracing import NestoreTracer
+
+
+@pytest.fixture(autouse=True)
+def short_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    """End the cycle after 200 ms."""
+    monkeypatch.setattr(coordinator, "CYCLE_TIMEOUT", 0.2)
+
+
+class FakeClient:
+    """Client answering each endpoint after a delay, or failing."""
+
+    def __init__(self, **answers) -> None:
+        self.answers = answers
+        self.cancelled: list[str] = []
+
+    async def async_query_data(self, api_key, fields=None):
+        delay, answer = self.answers[api_key]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(api_key)
+            raise
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def _coordinator(client: FakeClient) -> NestoreCoordinator:
+    """Coordinator with only what fetching the endpoints uses."""
+    instance = NestoreCoordinator.__new__(NestoreCoordinator)
+    instance.client = client
+    instance.tracer = NestoreTracer()
+    instance.cycle_endpoints = {"DATA": "data", "CONTROL": "control"}
+    instance.fetch_timings = {}
+    return instance
+
+
+def test_endpoints_are_fetched_concurrently() -> None:
+    instance = _coordinator(FakeClient(data=(0.12, "data"), control=(0.12, "control")))
+    results = asyncio.run(instance._async_fetch_endpoints())
+    assert results == {"DATA": "data", "CONTROL": "control"}
+    assert set(instance.fetch_timings) == {"DATA", "CONTROL"}
+
+
+def test_endpoint_missing_the_deadline_is_dropped() -> None:
+    client = FakeClient(data=(0, "data"), control=(10, "control"))
+    instance = _coordinator(client)
+
+    async def _fetch():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await instance._async_fetch_endpoints()
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(_fetch())
+
+    assert results == {"DATA": "data", "CONTROL": None}
+    assert client.cancelled == ["control"]
+    assert elapsed < 1
+    assert instance.fetch_timings["CONTROL"] >= 0.19
+
+
+def test_failed_endpoint_keeps_the_others() -> None:
+    instance = _coordinator(
+        FakeClient(data=(0, "data"), control=(0, TimeoutError("no answer")))
+    )
+    results = asyncio.run(instance._async_fetch_endpoints())
+    assert results == {"DATA": "data", "CONTROL": None}
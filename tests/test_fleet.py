@@ -0,0 +1,96 @@
+"""Tests for the polling phases of the devices in a fleet."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.nestore.fleet import FLEET_KEY, NestoreFleet
+
+
+class FakeLoop:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeHass:
+    def __init__(self) -> None:
+        self.loop = FakeLoop()
+        self.data = {}
+
+
+class FakeDevice:
+    """Device coordinator, only the parts the fleet uses."""
+
+    def __init__(self, entry_id: str) -> None:
+        self.config_entry = SimpleNamespace(entry_id=entry_id)
+        self.snapshot = None
+
+    def async_add_listener(self, update_callback):
+        return lambda: None
+
+
+@pytest.fixture
+def hass() -> FakeHass:
+    return FakeHass()
+
+
+def _fleet(hass: FakeHass, count: int) -> tuple[NestoreFleet, list[FakeDevice]]:
+    fleet = NestoreFleet.async_get(hass)
+    devices = [FakeDevice(f"entry{index}") for index in range(count)]
+    for device in devices:
+        fleet.join(device)
+    return fleet, devices
+
+
+def test_devices_are_spread_over_the_interval(hass: FakeHass) -> None:
+    fleet, devices = _fleet(hass, 3)
+    assert [fleet.next_refresh(device, 30) for device in devices] == [
+        120.0,
+        130.0,
+        140.0,
+    ]
+
+
+def test_next_poll_is_at_least_half_an_interval_away(hass: FakeHass) -> None:
+    fleet, devices = _fleet(hass, 2)
+    # the second device polls at 5, 15, 25, ... and skips a slot that is
+    # less than half an interval away
+    hass.loop.now = 100.0
+    assert fleet.next_refresh(devices[1], 10) == 105.0
+    hass.loop.now = 101.0
+    assert fleet.next_refresh(devices[1], 10) == 115.0
+
+
+def test_phases_are_spread_again_when_a_device_leaves(hass: FakeHass) -> None:
+    fleet, devices = _fleet(hass, 3)
+    asyncio.run(fleet.async_leave(devices[0]))
+
+    assert fleet.members == devices[1:]
+    assert [fleet.next_refresh(device, 30) for device in devices[1:]] == [
+        120.0,
+        135.0,
+    ]
+    assert fleet.get_diagnostics(devices[2])["slot"] == 1
+
+
+def test_device_outside_the_fleet_polls_after_the_interval(hass: FakeHass) -> None:
+    fleet, _ = _fleet(hass, 2)
+    assert fleet.next_refresh(FakeDevice("other"), 30) == 130.0
+    assert fleet.get_diagnostics(FakeDevice("other"))["slot"] is None
+
+
+def test_last_device_leaving_removes_the_fleet(hass: FakeHass) -> None:
+    fleet, devices = _fleet(hass, 2)
+    assert NestoreFleet.async_get(hass) is fleet
+
+    for device in devices:
+        asyncio.run(fleet.async_leave(device))
+
+    assert FLEET_KEY not in hass.data
+    assert NestoreFleet.async_get(hass) is not fleet
@@ -0,0 +1,127 @@
+"""Tests for the retry policy and the circuit breaker."""
+
+from __future__ import annotations
+
+import aiohttp
+import pytest
+
+from custom_components.nestore import resilience
+from custom_components.nestore.resilience import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    backoff_delay,
+    is_transient,
+)
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Control the monotonic clock of the breaker."""
+    clock = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def _opened() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+@pytest.mark.usefixtures("now")
+def test_breaker_opens_after_the_threshold() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+@pytest.mark.usefixtures("now")
+def test_success_resets_the_failure_count() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 1
+
+
+def test_single_probe_after_the_reset_timeout(now) -> None:
+    breaker = _opened()
+    now[0] += 59
+    assert not breaker.allow()
+
+    now[0] += 1
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.is_probing
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_breaker(now) -> None:
+    breaker = _opened()
+    now[0] += 60
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert not breaker.is_probing
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_the_breaker_again(now) -> None:
+    breaker = _opened()
+    now[0] += 60
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow()
+    assert breaker.get_diagnostics()["probe_in"] == 60
+
+    now[0] += 60
+    assert breaker.allow()
+
+
+def test_backoff_is_capped_full_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(resilience.random, "uniform", lambda _, high: high)
+    assert [backoff_delay(attempt, 0.5, 4) for attempt in range(5)] == [
+        0.5,
+        1.0,
+        2.0,
+        4.0,
+        4.0,
+    ]
+
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, _: low)
+    assert backoff_delay(3, 0.5, 4) == 0
+
+
+@pytest.mark.parametrize(
+    ("err", "transient"),
+    [
+        (TimeoutError(), True),
+        (aiohttp.ClientConnectionError(), True),
+        (aiohttp.ClientResponseError(None, (), status=503), True),
+        (aiohttp.ClientResponseError(None, (), status=404), False),
+        (CircuitOpenError(), False),
+        (ValueError(), False),
+    ],
+)
+def test_transient_errors(err: BaseException, *, transient: bool) -> None:
+    assert is_transient(err) is transient
@@ -0,0 +1,97 @@
+"""Tests for the deadband and heartbeat of the sensor state writes."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.nestore import sensor
+from custom_components.nestore.sensor import NestoreEntityDescription, NestoreSensor
+
+HEARTBEAT = timedelta(minutes=15)
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Control the monotonic clock of the sensors."""
+    clock = [1000.0]
+    monkeypatch.setattr(sensor.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def _sensor(**deadband) -> NestoreSensor:
+    coordinator = SimpleNamespace(
+        config_entry=SimpleNamespace(entry_id="entry", title="Nestore")
+    )
+    description = NestoreEntityDescription(
+        key="pressure", name="pressure", value_fn=lambda _: None, **deadband
+    )
+    return NestoreSensor(coordinator, description)
+
+
+def _written(entity: NestoreSensor, value, at: float) -> None:
+    """Set the state last written, as async_write_ha_state does."""
+    entity._attr_native_value = value
+    entity._last_written_value = value
+    entity._last_written_available = True
+    entity._last_write = at
+
+
+def _should_write(entity: NestoreSensor, value) -> bool:
+    entity._attr_native_value = value
+    return entity._should_write()
+
+
+def test_without_deadband_every_value_is_written(now) -> None:
+    entity = _sensor()
+    _written(entity, 2.0, now[0])
+    assert _should_write(entity, 2.0)
+
+
+def test_absolute_deadband(now) -> None:
+    entity = _sensor(deadband=0.1)
+    _written(entity, 2.0, now[0])
+    assert not _should_write(entity, 2.05)
+    assert not _should_write(entity, 1.95)
+    assert _should_write(entity, 2.15)
+    assert _should_write(entity, 1.85)
+
+
+def test_relative_deadband_follows_the_last_value(now) -> None:
+    entity = _sensor(deadband_pct=5)
+    _written(entity, 100.0, now[0])
+    assert not _should_write(entity, 104.0)
+    assert _should_write(entity, 106.0)
+
+    _written(entity, 10.0, now[0])
+    assert _should_write(entity, 10.6)
+
+
+def test_heartbeat_writes_an_unchanged_value(now) -> None:
+    entity = _sensor(deadband=0.1, max_silence=HEARTBEAT)
+    _written(entity, 2.0, now[0])
+    now[0] += HEARTBEAT.total_seconds() - 1
+    assert not _should_write(entity, 2.0)
+    now[0] += 1
+    assert _should_write(entity, 2.0)
+    assert entity._heartbeat_due()
+
+
+def test_availability_change_is_written(now) -> None:
+    entity = _sensor(deadband=0.1)
+    _written(entity, 2.0, now[0])
+    entity.last_update_success = False
+    assert _should_write(entity, 2.0)
+
+
+def test_non_numeric_values_are_compared_directly(now) -> None:
+    entity = _sensor(deadband=1)
+    _written(entity, None, now[0])
+    assert not _should_write(entity, None)
+    assert _should_write(entity, 2.0)
+
+    _written(entity, "Idle", now[0])
+    assert not _should_write(entity, "Idle")
+    assert _should_write(entity, "Charging Electrical Main")
@@ -0,0 +1,160 @@
+"""Tests for the history store on disk."""
+
+from __future__ import annotations
+
+import struct
+import time
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.nestore.store import (
+    HEADER,
+    MAGIC,
+    RAW_SUFFIX,
+    TMP_SUFFIX,
+    NestoreStore,
+    _month_key,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+COLUMNS = ("power_heater", "flow_dhw")
+
+
+@pytest.fixture
+def start() -> float:
+    """Start of the current hour, so the records stay in raw segments."""
+    return float(int(time.time() // 3600 * 3600) - 3600)
+
+
+def _store(path: Path) -> NestoreStore:
+    store = NestoreStore(str(path), COLUMNS)
+    store.open()
+    return store
+
+
+def test_query_returns_columns_in_time_order(tmp_path: Path, start: float) -> None:
+    store = _store(tmp_path)
+    for index in range(10):
+        store.append(start + 60 * index, (float(index), 2.0 * index))
+
+    columns = store.query()
+    assert list(columns) == ["timestamp", *COLUMNS]
+    assert columns["timestamp"].tolist() == [start + 60 * i for i in range(10)]
+    assert columns["power_heater"].tolist() == [float(i) for i in range(10)]
+    assert columns["flow_dhw"].tolist() == [2.0 * i for i in range(10)]
+
+
+def test_query_range_includes_both_ends(tmp_path: Path, start: float) -> None:
+    store = _store(tmp_path)
+    for index in range(10):
+        store.append(start + 60 * index, (float(index), 0.0))
+
+    columns = store.query(start + 120, start + 300)
+    assert columns["power_heater"].tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert store.query(start + 601, start + 900)["timestamp"].size == 0
+
+
+def test_query_without_records(tmp_path: Path) -> None:
+    columns = _store(tmp_path).query()
+    assert all(column.size == 0 for column in columns.values())
+
+
+def test_older_or_repeated_timestamps_are_ignored(tmp_path: Path, start: float) -> None:
+    store = _store(tmp_path)
+    store.append(start, (1.0, 0.0))
+    store.append(start, (2.0, 0.0))
+    store.append(start - 60, (3.0, 0.0))
+    assert store.query()["power_heater"].tolist() == [1.0]
+
+
+def test_records_survive_reopening(tmp_path: Path, start: float) -> None:
+    store = _store(tmp_path)
+    store.append(start, (1.0, 0.5))
+    store.close()
+
+    columns = _store(tmp_path).query()
+    assert columns["timestamp"].tolist() == [start]
+    assert columns["flow_dhw"].tolist() == [0.5]
+
+
+def test_values_keep_full_precision(tmp_path: Path, start: float) -> None:
+    store = _store(tmp_path)
+    store.append(start, (1234567.891, 0.1))
+    columns = store.query()
+    assert columns["power_heater"].tolist() == [1234567.891]
+    assert columns["flow_dhw"].tolist() == [0.1]
+
+
+def test_version_1_segment_is_upgraded(tmp_path: Path, start: float) -> None:
+    old = struct.Struct("<d" + "f" * len(COLUMNS))
+    segment = tmp_path / f"{_month_key(start)}{RAW_SUFFIX}"
+    segment.write_bytes(
+        HEADER.pack(MAGIC, 1, len(COLUMNS), old.size)
+        + old.pack(start, 1.0, 0.5)
+        + old.pack(start + 60, 2.0, 0.25)
+    )
+
+    store = _store(tmp_path)
+    assert store.query()["power_heater"].tolist() == [1.0, 2.0]
+    assert segment.stat().st_size == HEADER.size + 2 * store.record.size
+    store.append(start + 120, (3.0, 0.125))
+    assert store.query()["flow_dhw"].tolist() == [0.5, 0.25, 0.125]
+
+
+def test_partial_record_is_dropped(tmp_path: Path, start: float) -> None:
+    store = _store(tmp_path)
+    store.append(start, (1.0, 0.0))
+    store.append(start + 60, (2.0, 0.0))
+    store.close()
+
+    # a crash halfway through writing a third record
+    segment = tmp_path / f"{_month_key(start)}{RAW_SUFFIX}"
+    with segment.open("ab") as file:
+        file.write(b"\x00" * 5)
+
+    store = _store(tmp_path)
+    assert store.query()["power_heater"].tolist() == [1.0, 2.0]
+    assert segment.stat().st_size == HEADER.size + 2 * store.record.size
+    store.append(start + 120, (3.0, 0.0))
+    assert store.query()["power_heater"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_interrupted_downsampling_is_finished(tmp_path: Path) -> None:
+    hour = datetime(2020, 1, 1, tzinfo=UTC).timestamp()
+    store = _store(tmp_path)
+    store.append(hour, (1.0, 0.0))
+    store.downsample(202002)
+    store.close()
+
+    # a crash after writing the hourly segment, before removing the raw one
+    raw = tmp_path / f"202001{RAW_SUFFIX}"
+    other = NestoreStore(str(tmp_path / "other"), COLUMNS)
+    other.open()
+    other.append(hour, (5.0, 0.0))
+    other.close()
+    (tmp_path / "other" / raw.name).rename(raw)
+    (tmp_path / f"202002.hourly.bin{TMP_SUFFIX}").write_bytes(b"partial")
+
+    store = _store(tmp_path)
+    assert not raw.exists()
+    assert not list(tmp_path.glob(f"*{TMP_SUFFIX}"))
+    assert store.query()["power_heater"].tolist() == [1.0]
+
+
+def test_old_months_are_downsampled_to_hourly_means(tmp_path: Path) -> None:
+    hour = datetime(2020, 1, 1, tzinfo=UTC).timestamp()
+    store = NestoreStore(str(tmp_path), COLUMNS)
+    store.open()
+    for minute, power in ((0, 1.0), (20, 2.0), (40, 3.0), (60, 7.0)):
+        store.append(hour + 60 * minute, (power, 0.0))
+
+    store.downsample(202002)
+
+    assert not (tmp_path / f"202001{RAW_SUFFIX}").exists()
+    columns = store.query()
+    assert columns["timestamp"].tolist() == [hour + 1800, hour + 3600 + 1800]
+    assert columns["power_heater"].tolist() == [2.0, 7.0]